@@ -0,0 +1,87 @@
+# Costo de la auditoría en REGISTRO al insertar en masa, contra la base de datos configurada en db.py.
+# Sobre una tabla de prueba (BENCH_AUDITORIA, se crea y se borra) compara:
+#   sin       sin trigger de auditoría
+#   anterior  trigger por sentencia como los de Triggers.sql (una fila en REGISTRO por sentencia)
+#   por_fila  compound trigger de V010 (una fila por fila cambiada, escritas con FORALL por sentencia)
+# Cada modo inserta por lotes (executemany, como la importación y la ingesta) y fila por fila.
+# Necesita V010 aplicada (CREAR_TRIGGER_AUDITORIA).
+#
+#   python bench/auditoria.py --filas 200000 --lote 1000 --por-fila 5000
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+from db import adquirir_conexion, liberar_conexion
+
+TABLA = "BENCH_AUDITORIA"
+
+TRIGGER_ANTERIOR = f"""
+CREATE OR REPLACE TRIGGER TR_INSERT_{TABLA}
+AFTER INSERT ON {TABLA}
+BEGIN
+    INSERT INTO REGISTRO (TABLA_ACTUALIZADA, ACCION_REALIZADA, FECHA_ACTUALIZACION)
+    VALUES('{TABLA}', 'INSERT', SYSDATE());
+END;"""
+
+
+def preparar(cursor, modo):
+    cursor.execute(f"CREATE TABLE {TABLA} (ID NUMBER PRIMARY KEY, VALOR VARCHAR2(100))")
+    if modo == "anterior":
+        cursor.execute(TRIGGER_ANTERIOR)
+    elif modo == "por_fila":
+        cursor.callproc("CREAR_TRIGGER_AUDITORIA", [TABLA, "ID"])
+
+
+def limpiar(cursor):
+    cursor.execute(f"""
+        BEGIN
+            EXECUTE IMMEDIATE 'DROP TABLE {TABLA} PURGE';
+        EXCEPTION
+            WHEN OTHERS THEN NULL;
+        END;""")
+    cursor.execute("DELETE FROM REGISTRO WHERE TABLA_ACTUALIZADA = :tabla", tabla=TABLA)
+
+
+def medir(connection, modo, args):
+    with connection.cursor() as cursor:
+        limpiar(cursor)
+        preparar(cursor, modo)
+        inicio = time.perf_counter()
+        for desde in range(0, args.filas, args.lote):
+            cursor.executemany(f"INSERT INTO {TABLA} VALUES (:1, :2)",
+                               [(i, f"valor {i}") for i in range(desde, min(desde + args.lote, args.filas))])
+        connection.commit()
+        lotes = time.perf_counter() - inicio
+        inicio = time.perf_counter()
+        for i in range(args.filas, args.filas + args.por_fila):
+            cursor.execute(f"INSERT INTO {TABLA} VALUES (:1, :2)", [i, f"valor {i}"])
+        connection.commit()
+        una_a_una = time.perf_counter() - inicio
+        cursor.execute("SELECT COUNT(*) FROM REGISTRO WHERE TABLA_ACTUALIZADA = :tabla", tabla=TABLA)
+        (registradas,) = cursor.fetchone()
+        limpiar(cursor)
+        connection.commit()
+    print(f"{modo:>9}: por lotes {args.filas / lotes:,.0f} filas/s, fila por fila {args.por_fila / una_a_una:,.0f} filas/s, "
+          f"{registradas} filas en REGISTRO")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--filas", type=int, default=200_000)
+    parser.add_argument("--lote", type=int, default=1000)
+    parser.add_argument("--por-fila", type=int, default=5000)
+    args = parser.parse_args()
+
+    connection = adquirir_conexion()
+    connection.client_identifier = "bench"
+    try:
+        for modo in ("sin", "anterior", "por_fila"):
+            medir(connection, modo, args)
+    finally:
+        liberar_conexion(connection)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+# Consultas del banco de preguntas antes y después de V009 (dueño en PREGUNTA.ID_PROFESOR) contra la
+# base de datos configurada en db.py: filas devueltas, preguntas distintas y latencia de cada una.
+# Antes la pregunta salía una vez por examen que la usa; después cada pregunta sale una vez.
+#
+#   python bench/banco_preguntas.py --profesor 2 --tema "Bases de datos" --repeticiones 50
+import argparse
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+from db import adquirir_conexion, liberar_conexion
+import main as app
+
+# Consultas de main.py antes de V009 (dueño deducido de EXAMEN_PREGUNTA y EXAMEN)
+ANTES = {
+    "/banco_preguntas": f"""
+        SELECT {app.COLUMNAS_BANCO}
+        FROM PREGUNTA P
+        INNER JOIN EXAMEN_PREGUNTA EP ON P.ID_PREGUNTA = EP.ID_PREGUNTA
+        INNER JOIN EXAMEN E ON EP.ID_EXAMEN = E.ID_EXAMEN
+        WHERE (P.TEMA = :tema AND P.PRIVACIDAD = 0)
+        OR (P.TEMA = :tema AND E.ID_PROFESOR = :id_profe )
+        ORDER BY P.TEXTO
+    """,
+    "/preguntas_privadas": f"""
+        SELECT {app.COLUMNAS_BANCO}
+        FROM PREGUNTA P
+        INNER JOIN EXAMEN_PREGUNTA EP ON P.ID_PREGUNTA = EP.ID_PREGUNTA
+        INNER JOIN EXAMEN E ON EP.ID_EXAMEN = E.ID_EXAMEN
+        WHERE (P.TEMA = :tema AND E.ID_PROFESOR = :id_profe )
+        ORDER BY P.TEXTO
+    """,
+    "/mis_preguntas": f"""
+        SELECT {app.COLUMNAS_BANCO}
+        FROM PREGUNTA P
+        INNER JOIN EXAMEN_PREGUNTA EP ON P.ID_PREGUNTA = EP.ID_PREGUNTA
+        INNER JOIN EXAMEN E ON EP.ID_EXAMEN = E.ID_EXAMEN
+        WHERE E.ID_PROFESOR = :id_profe
+        ORDER BY P.TEXTO
+    """,
+}
+
+DESPUES = {
+    "/banco_preguntas": app.CONSULTA_BANCO_PREGUNTAS.sql,
+    "/preguntas_privadas": app.CONSULTA_PREGUNTAS_PRIVADAS.sql,
+    "/mis_preguntas": app.CONSULTA_MIS_PREGUNTAS.sql,
+}
+
+
+def medir(connection, sql, parametros, repeticiones):
+    tiempos = []
+    with connection.cursor() as cursor:
+        for _ in range(repeticiones):
+            inicio = time.perf_counter()
+            cursor.execute(sql, parametros)
+            filas = cursor.fetchall()
+            tiempos.append((time.perf_counter() - inicio) * 1000)
+    tiempos.sort()
+    return len(filas), len({fila[0] for fila in filas}), statistics.median(tiempos), tiempos[int(len(tiempos) * 0.95)]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--profesor", type=int, required=True)
+    parser.add_argument("--tema", default="No definido")
+    parser.add_argument("--repeticiones", type=int, default=50)
+    args = parser.parse_args()
+
+    connection = adquirir_conexion()
+    try:
+        for nombre in DESPUES:
+            parametros = {"id_profe": args.profesor}
+            if ":tema" in DESPUES[nombre]:
+                parametros["tema"] = args.tema
+            for momento, sql in (("antes", ANTES[nombre]), ("después", DESPUES[nombre])):
+                filas, distintas, p50, p95 = medir(connection, sql, parametros, args.repeticiones)
+                print(f"{nombre:>20} {momento:>7}: {filas} filas, {distintas} preguntas, p50 {p50:.1f} ms, p95 {p95:.1f} ms")
+    finally:
+        liberar_conexion(connection)
+
+
+if __name__ == "__main__":
+    main()
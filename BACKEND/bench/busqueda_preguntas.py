@@ -0,0 +1,91 @@
+# Construcción del índice de busqueda.py sobre un banco sintético y latencia de /preguntas/buscar
+# (solo el índice, sin la lectura de las filas de la página). Oracle se reemplaza por filas en memoria.
+#
+#   python bench/busqueda_preguntas.py --preguntas 1000000 --consultas 200
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+from busqueda import IndicePreguntas
+
+TEMAS = ["Álgebra", "Cálculo", "Bases de datos", "Redes", "Programación", "Física", "Química", "Historia"]
+PALABRAS = (
+    "índice consulta tabla transacción función derivada integral matriz vector red protocolo paquete "
+    "átomo molécula energía fuerza velocidad revolución independencia clase objeto herencia memoria "
+    "proceso hilo bloqueo disco árbol grafo nodo arista límite serie ecuación normal clave foránea"
+).split()
+
+
+class Cursor:
+    def __init__(self, datos):
+        self.datos, self.filas, self.arraysize = datos, iter(()), 100
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        pass
+
+    def execute(self, sql, **params):
+        self.filas = iter(self.datos.preguntas)
+
+    def fetchmany(self):
+        return [fila for _, fila in zip(range(self.arraysize), self.filas)]
+
+
+class Oracle:
+    def __init__(self, preguntas):
+        self.preguntas = preguntas
+
+    def cursor(self):
+        return Cursor(self)
+
+
+def banco_sintetico(cantidad, profesores, azar):
+    preguntas = []
+    for id_pregunta in range(1, cantidad + 1):
+        texto = " ".join(azar.choices(PALABRAS, k=12)) + f" caso{azar.randrange(50000)}"
+        opciones = ",".join(" ".join(azar.choices(PALABRAS, k=2)) for _ in range(4))
+        preguntas.append((id_pregunta, texto, opciones, azar.choice(TEMAS), int(azar.random() < 0.3), azar.randrange(profesores)))
+    return preguntas
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--preguntas", type=int, default=1_000_000)
+    parser.add_argument("--profesores", type=int, default=2000)
+    parser.add_argument("--consultas", type=int, default=200)
+    args = parser.parse_args()
+
+    azar = random.Random(7)
+    oracle = Oracle(banco_sintetico(args.preguntas, args.profesores, azar))
+    indice = IndicePreguntas()
+    inicio = time.perf_counter()
+    indice.reconstruir(oracle)
+    print(f"construcción: {args.preguntas} preguntas en {time.perf_counter() - inicio:.1f} s, {indice.estadisticas()}")
+
+    consultas = [
+        ("una palabra", lambda: azar.choice(PALABRAS), "banco"),
+        ("dos palabras", lambda: " ".join(azar.sample(PALABRAS, 2)), "banco"),
+        ("prefijo", lambda: azar.choice(PALABRAS)[:3] + "*", "banco"),
+        ("selectiva", lambda: f"caso{azar.randrange(50000)}", "banco"),
+        ("mías", lambda: azar.choice(PALABRAS), "mias"),
+    ]
+    for nombre, generar, alcance in consultas:
+        tiempos, resultados = [], 0
+        for _ in range(args.consultas):
+            texto = generar()
+            inicio = time.perf_counter()
+            total, _ = indice.buscar(texto, azar.randrange(args.profesores), alcance)
+            tiempos.append((time.perf_counter() - inicio) * 1000)
+            resultados += total
+        tiempos.sort()
+        print(f"{nombre:>13}: p50 {tiempos[len(tiempos) // 2]:.1f} ms, p99 {tiempos[int(len(tiempos) * 0.99)]:.1f} ms, "
+              f"{resultados // args.consultas} resultados en promedio")
+
+
+if __name__ == "__main__":
+    main()
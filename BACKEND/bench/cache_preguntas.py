@@ -0,0 +1,96 @@
+# Un grupo que empieza un examen a la vez: N estudiantes piden /preguntas-examen/{id} simultáneamente.
+# Compara leer y serializar las filas en cada petición (como antes) contra la cache de preguntas.py.
+# Oracle se simula con una espera de --latencia-ms por consulta y filas sintéticas de PREGUNTA.
+#
+#   python bench/cache_preguntas.py --estudiantes 500 --preguntas 40
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+from preguntas import CachePreguntas
+
+
+class Cursor:
+    def __init__(self, filas, latencia):
+        self.filas, self.latencia = filas, latencia
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        pass
+
+    async def execute(self, sql, params):
+        await asyncio.sleep(self.latencia)
+
+    async def fetchall(self):
+        return [tuple(fila) for fila in self.filas]
+
+
+class Oracle:
+    def __init__(self, filas, latencia, sesiones):
+        self.filas, self.latencia = filas, latencia
+        self.sesiones = asyncio.Semaphore(sesiones)
+        self.consultas = 0
+
+    async def adquirir(self):
+        await self.sesiones.acquire()
+        self.consultas += 1
+        return self
+
+    async def liberar(self, connection):
+        self.sesiones.release()
+
+    def cursor(self):
+        return Cursor(self.filas, self.latencia)
+
+
+async def sin_cache(oracle, id_examen):
+    connection = await oracle.adquirir()
+    try:
+        with connection.cursor() as cursor:
+            await cursor.execute("", {"p_id": id_examen})
+            filas = await cursor.fetchall()
+    finally:
+        await oracle.liberar(connection)
+    return json.dumps(filas, ensure_ascii=False).encode()
+
+
+async def con_cache(cache, oracle, id_examen):
+    return (await cache.obtener_async(id_examen, oracle.adquirir, oracle.liberar)).cuerpo
+
+
+async def ronda(args, usar_cache):
+    filas = [
+        (i, f"Pregunta {i} del examen", "Opción A,Opción B,Opción C,Opción D", "Opción B", 1 + i % 5, "Tema", 0)
+        for i in range(1, args.preguntas + 1)
+    ]
+    oracle = Oracle(filas, args.latencia_ms / 1000, args.sesiones)
+    cache = CachePreguntas(100, 300)
+    inicio = time.perf_counter()
+    if usar_cache:
+        await asyncio.gather(*[con_cache(cache, oracle, 1) for _ in range(args.estudiantes)])
+    else:
+        await asyncio.gather(*[sin_cache(oracle, 1) for _ in range(args.estudiantes)])
+    return time.perf_counter() - inicio, oracle.consultas
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--estudiantes", type=int, default=500)
+    parser.add_argument("--preguntas", type=int, default=40)
+    parser.add_argument("--latencia-ms", type=float, default=5)
+    parser.add_argument("--sesiones", type=int, default=40)
+    args = parser.parse_args()
+
+    for nombre, usar_cache in (("sin cache", False), ("con cache", True)):
+        duracion, consultas = asyncio.run(ronda(args, usar_cache))
+        print(f"{nombre}: {args.estudiantes} peticiones en {duracion * 1000:.0f} ms, {consultas} consultas a Oracle")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+# Compara verificar un token con jwt.decode en cada petición (como antes) contra la cache de cache_tokens.py.
+#
+#   python bench/cache_tokens.py --tokens 500 --peticiones 200000
+import argparse
+import os
+import secrets
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+
+from jwt import encode, decode
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+from cache_tokens import CacheTokens
+
+clave_secreta = secrets.token_hex(16)
+
+
+def crear_token(user_id):
+    payload = {
+        "user_id": user_id,
+        "is_professor": False,
+        "jti": secrets.token_hex(16),
+        "exp": datetime.utcnow() + timedelta(hours=1),
+    }
+    return encode(payload, clave_secreta, algorithm="HS256")
+
+
+def verificar_sin_cache(credencial):
+    payload = decode(credencial, clave_secreta, algorithms=["HS256"])
+    expiracion = datetime.fromtimestamp(payload["exp"], tz=timezone.utc)
+    if expiracion > datetime.now(timezone.utc):
+        return payload["user_id"], payload["is_professor"]
+
+
+def verificar_con_cache(cache, credencial):
+    clave = cache.digest(credencial)
+    datos = cache.obtener(clave)
+    if datos is None:
+        payload = decode(credencial, clave_secreta, algorithms=["HS256"])
+        datos = (payload["user_id"], payload["is_professor"], payload["jti"], payload["exp"])
+        cache.guardar(clave, datos)
+    return datos[0], datos[1]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--tokens", type=int, default=500, help="estudiantes distintos en la sesión")
+    parser.add_argument("--peticiones", type=int, default=200_000)
+    args = parser.parse_args()
+
+    tokens = [crear_token(i) for i in range(args.tokens)]
+    cache = CacheTokens(capacidad=args.tokens * 2)
+
+    inicio = time.perf_counter()
+    for i in range(args.peticiones):
+        verificar_sin_cache(tokens[i % len(tokens)])
+    sin_cache = (time.perf_counter() - inicio) / args.peticiones * 1e6
+
+    inicio = time.perf_counter()
+    for i in range(args.peticiones):
+        verificar_con_cache(cache, tokens[i % len(tokens)])
+    con_cache = (time.perf_counter() - inicio) / args.peticiones * 1e6
+
+    print(f"jwt.decode por petición: {sin_cache:.2f} us")
+    print(f"con cache:               {con_cache:.2f} us  ({sin_cache / con_cache:.1f}x)")
+    print(cache.estadisticas())
+
+
+if __name__ == "__main__":
+    main()
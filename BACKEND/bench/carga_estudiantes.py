@@ -0,0 +1,92 @@
+# Prueba de carga de las rutas de estudiantes durante un examen.
+# Se ejecuta contra un servidor levantado (uvicorn main:app --workers N) antes y después de un cambio
+# y reporta peticiones/segundo y latencias p50/p99 por ruta.
+#
+#   python bench/carga_estudiantes.py --url http://localhost:8000 --estudiante 1 --clave 12345 --examen 1
+import argparse
+import asyncio
+import statistics
+import time
+
+import httpx
+
+
+def percentil(valores, p):
+    if not valores:
+        return 0.0
+    ordenados = sorted(valores)
+    indice = min(len(ordenados) - 1, int(round(p / 100 * (len(ordenados) - 1))))
+    return ordenados[indice]
+
+
+async def cliente(http, ruta, metodo, params, headers, fin, latencias, errores):
+    while time.perf_counter() < fin:
+        inicio = time.perf_counter()
+        try:
+            respuesta = await http.request(metodo, ruta, params=params, headers=headers)
+            if respuesta.status_code >= 400:
+                errores.append(respuesta.status_code)
+        except httpx.HTTPError as error:
+            errores.append(type(error).__name__)
+        latencias.append((time.perf_counter() - inicio) * 1000)
+
+
+async def medir(url, ruta, metodo, params, headers, concurrencia, duracion):
+    latencias, errores = [], []
+    limites = httpx.Limits(max_connections=concurrencia, max_keepalive_connections=concurrencia)
+    async with httpx.AsyncClient(base_url=url, limits=limites, timeout=60) as http:
+        fin = time.perf_counter() + duracion
+        inicio = time.perf_counter()
+        await asyncio.gather(*[
+            cliente(http, ruta, metodo, params, headers, fin, latencias, errores)
+            for _ in range(concurrencia)
+        ])
+        total = time.perf_counter() - inicio
+    return {
+        "ruta": ruta,
+        "peticiones": len(latencias),
+        "errores": len(errores),
+        "rps": len(latencias) / total,
+        "p50_ms": statistics.median(latencias) if latencias else 0.0,
+        "p99_ms": percentil(latencias, 99),
+    }
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--url", default="http://localhost:8000")
+    parser.add_argument("--estudiante", type=int, required=True)
+    parser.add_argument("--clave", required=True)
+    parser.add_argument("--examen", type=int, required=True)
+    parser.add_argument("--concurrencia", type=int, default=500)
+    parser.add_argument("--duracion", type=float, default=30)
+    parser.add_argument("--incluir-escritura", action="store_true",
+                        help="también envía presentaciones a /almacenar_presentacion_examen/")
+    args = parser.parse_args()
+
+    async with httpx.AsyncClient(base_url=args.url) as http:
+        respuesta = await http.post("/login", json={"id": args.estudiante, "password": args.clave, "is_professor": 0})
+        respuesta.raise_for_status()
+        headers = {"Authorization": f"Bearer {respuesta.json()['token']}"}
+
+    pruebas = [
+        ("/examenes-asignados", "GET", None),
+        (f"/preguntas-examen/{args.examen}", "GET", None),
+    ]
+    if args.incluir_escritura:
+        pruebas.append(("/almacenar_presentacion_examen/", "POST", {
+            "p_id_estudiante": args.estudiante,
+            "p_id_examen": args.examen,
+            "p_fecha_presentacion": time.strftime("%d/%m/%y"),
+            "p_tiempo_tomado": "+00 00:30:00",
+            "p_respuestas": "",
+        }))
+
+    print(f"{'ruta':40} {'peticiones':>10} {'errores':>8} {'rps':>10} {'p50 ms':>10} {'p99 ms':>10}")
+    for ruta, metodo, params in pruebas:
+        r = await medir(args.url, ruta, metodo, params, headers, args.concurrencia, args.duracion)
+        print(f"{r['ruta']:40} {r['peticiones']:>10} {r['errores']:>8} {r['rps']:>10.1f} {r['p50_ms']:>10.1f} {r['p99_ms']:>10.1f}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
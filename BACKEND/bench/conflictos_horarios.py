@@ -0,0 +1,77 @@
+# Cruces de exámenes con horarios.HorariosSemestre sobre un semestre sintético, sin Oracle.
+# Compara buscar los exámenes que se cruzan con el índice por (semana, día) contra recorrer todos los
+# exámenes del semestre, y mide la grilla semanal que reemplaza al GROUP BY de /horarios.
+#
+#   python bench/conflictos_horarios.py --horarios 20000 --examenes 50000 --grupos 2000 --estudiantes 40000
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+from horarios import HorariosSemestre, minutos
+
+DIAS = ["Lunes", "Martes", "Miércoles", "Jueves", "Viernes", "Sábado"]
+
+
+def semestre_sintetico(args, azar):
+    horarios = [
+        (i, DIAS[d], f"{azar.randrange(7, 20):02d}:{azar.choice(['00', '30'])}", azar.randrange(1, 17), "2024-1", d + 1)
+        for i, d in ((i, azar.randrange(len(DIAS))) for i in range(1, args.horarios + 1))
+    ]
+    grupos = [(azar.randrange(1, args.horarios + 1), azar.randrange(args.grupos)) for _ in range(args.horarios)]
+    examenes = [(azar.randrange(1, args.horarios + 1), e, azar.choice([60, 90, 120])) for e in range(args.examenes)]
+    estudiantes = [(g, azar.randrange(args.estudiantes)) for g in range(args.grupos) for _ in range(30)]
+    return horarios, grupos, examenes, estudiantes
+
+
+def cruzados_recorriendo(horarios, examenes, id_horario, duracion):
+    fila = horarios[id_horario]
+    inicio = minutos(fila[2])
+    fin = inicio + duracion
+    cruzados = []
+    for otro, id_examen, tiempo_limite in examenes:
+        o = horarios[otro]
+        if (o[3], o[5]) == (fila[3], fila[5]):
+            desde = minutos(o[2])
+            if desde < fin and desde + tiempo_limite > inicio:
+                cruzados.append((id_examen, otro))
+    return cruzados
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--horarios", type=int, default=20000)
+    parser.add_argument("--examenes", type=int, default=50000)
+    parser.add_argument("--grupos", type=int, default=2000)
+    parser.add_argument("--estudiantes", type=int, default=40000)
+    parser.add_argument("--consultas", type=int, default=500)
+    args = parser.parse_args()
+
+    azar = random.Random(7)
+    horarios, grupos, examenes, estudiantes = semestre_sintetico(args, azar)
+    inicio = time.perf_counter()
+    semestre = HorariosSemestre("2024-1", horarios, grupos, examenes, estudiantes, float("inf"))
+    print(f"carga: {time.perf_counter() - inicio:.2f} s")
+
+    por_id = {fila[0]: fila for fila in horarios}
+    consultas = [(azar.randrange(1, args.horarios + 1), azar.choice([60, 90, 120])) for _ in range(args.consultas)]
+    for nombre, buscar in (
+        ("recorriendo", lambda h, d: cruzados_recorriendo(por_id, examenes, h, d)),
+        ("índice", lambda h, d: semestre.examenes_cruzados(h, d)),
+        ("conflictos", lambda h, d: semestre.conflictos(h, d)),
+    ):
+        inicio = time.perf_counter()
+        for id_horario, duracion in consultas:
+            buscar(id_horario, duracion)
+        print(f"{nombre:>12}: {(time.perf_counter() - inicio) * 1e6 / len(consultas):,.0f} µs por horario")
+
+    inicio = time.perf_counter()
+    for semana in range(1, 17):
+        semestre.grilla(semana)
+    print(f"{'grilla':>12}: {(time.perf_counter() - inicio) * 1e3 / 16:.2f} ms por semana")
+
+
+if __name__ == "__main__":
+    main()
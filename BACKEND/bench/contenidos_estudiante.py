@@ -0,0 +1,119 @@
+# /contenidos-estudiante-notas antes y después de contenidos.py: filas leídas, tamaño del JSON y latencia.
+# Contra la base de datos configurada en db.py, para un estudiante:
+#
+#   python bench/contenidos_estudiante.py --estudiante 1 --repeticiones 50
+#
+# Sin base de datos, con cursos sintéticos (solo filas y tamaño del JSON):
+#
+#   python bench/contenidos_estudiante.py --sintetico --cursos 6 --unidades 8 --contenidos 6 --examenes 4 --horarios 3 --grupos 2
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+from contenidos import CONSULTA_CONTENIDOS, CONSULTA_EXAMENES, armar_arbol
+
+# Consulta de main.py antes de contenidos.py
+ANTES = """
+    SELECT
+        C.NOMBRE,
+        CU.DESCRIPCIÓN,
+        UC.NOMBRE,
+        E.NOMBRE
+    FROM
+        CURSO C
+    INNER JOIN
+        UNIDAD_DE_CURSO UC ON UC.ID_CURSO = C.ID_CURSO
+    INNER JOIN
+        CONTENIDO_DE_UNIDAD CU ON CU.ID_UNIDAD = UC.ID_UNIDAD
+    INNER JOIN
+        EXAMEN E ON E.ID_CURSO = C.ID_CURSO
+    INNER JOIN
+        EXAMEN_HORARIO EH ON EH.ID_EXAMEN = E.ID_EXAMEN
+    INNER JOIN
+        GRUPO_HORARIO GH ON GH.ID_HORARIO = EH.ID_HORARIO
+    INNER JOIN
+        GRUPO G ON G.ID_GRUPO = GH.ID_GRUPO
+    INNER JOIN
+        ESTUDIANTE_GRUPO EG ON EG.ID_GRUPO = GH.ID_GRUPO AND EG.ID_ESTUDIANTE = :p_id
+"""
+
+
+def tamano(datos) -> int:
+    return len(json.dumps(datos, ensure_ascii=False, separators=(",", ":")).encode("utf-8"))
+
+
+def sintetico(args):
+    contenidos, examenes, plano = [], [], []
+    for c in range(args.cursos):
+        curso = f"Curso {c} de ingeniería de sistemas"
+        for e in range(args.examenes):
+            examenes.append((c, c * 100 + e, f"Examen {e} de {curso}"))
+        for u in range(args.unidades):
+            unidad = f"Unidad {u}: tema de la unidad"
+            for k in range(args.contenidos):
+                descripcion = f"Contenido {k} de la unidad {u}, " + "texto de la descripción " * 4
+                contenidos.append((c, curso, c * 100 + u, unidad, (c * 100 + u) * 100 + k, descripcion))
+                # Antes: una fila por examen x horario del examen x grupo del estudiante en ese horario
+                for e in range(args.examenes):
+                    plano += [[curso, descripcion, unidad, f"Examen {e} de {curso}"]] * (args.horarios * args.grupos)
+    inicio = time.perf_counter()
+    arbol = armar_arbol(contenidos, examenes)
+    armado = (time.perf_counter() - inicio) * 1000
+    print(f"  antes: {len(plano)} filas, {tamano(plano) / 1024:,.1f} KiB")
+    print(f"después: {len(contenidos) + len(examenes)} filas, {tamano(arbol) / 1024:,.1f} KiB (árbol en {armado:.2f} ms)")
+
+
+def medir(connection, consultas, armar, id_estudiante, repeticiones):
+    tiempos = []
+    with connection.cursor() as cursor:
+        for _ in range(repeticiones):
+            inicio = time.perf_counter()
+            resultados = []
+            for sql in consultas:
+                cursor.execute(sql, p_id=id_estudiante)
+                resultados.append(cursor.fetchall())
+            respuesta = armar(*resultados)
+            cuerpo = tamano(respuesta)
+            tiempos.append((time.perf_counter() - inicio) * 1000)
+    tiempos.sort()
+    return sum(map(len, resultados)), cuerpo, statistics.median(tiempos), tiempos[int(len(tiempos) * 0.95)]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--estudiante", type=int)
+    parser.add_argument("--repeticiones", type=int, default=50)
+    parser.add_argument("--sintetico", action="store_true")
+    parser.add_argument("--cursos", type=int, default=6)
+    parser.add_argument("--unidades", type=int, default=8)
+    parser.add_argument("--contenidos", type=int, default=6)
+    parser.add_argument("--examenes", type=int, default=4)
+    parser.add_argument("--horarios", type=int, default=3)
+    parser.add_argument("--grupos", type=int, default=2)
+    args = parser.parse_args()
+
+    if args.sintetico:
+        sintetico(args)
+        return
+    if args.estudiante is None:
+        parser.error("--estudiante es obligatorio sin --sintetico")
+
+    from db import adquirir_conexion, liberar_conexion
+    connection = adquirir_conexion()
+    try:
+        for momento, consultas, armar in (
+            ("antes", [ANTES], lambda filas: filas),
+            ("después", [CONSULTA_CONTENIDOS, CONSULTA_EXAMENES], armar_arbol),
+        ):
+            filas, cuerpo, p50, p95 = medir(connection, consultas, armar, args.estudiante, args.repeticiones)
+            print(f"{momento:>7}: {filas} filas, {cuerpo / 1024:,.1f} KiB, p50 {p50:.1f} ms, p95 {p95:.1f} ms")
+    finally:
+        liberar_conexion(connection)
+
+
+if __name__ == "__main__":
+    main()
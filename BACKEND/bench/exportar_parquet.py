@@ -0,0 +1,62 @@
+# Rendimiento y memoria de la exportación Parquet sobre una tabla sintética de presentaciones.
+# Las filas se generan por bloques con la misma forma que devuelve el cursor de Oracle, así se mide
+# solo la conversión a Arrow y la escritura (la lectura de Oracle se mide aparte con el endpoint).
+#
+# Con --materializar se hace como los reportes JSON: todas las filas en memoria (fetchall) y un solo bloque.
+#
+#   python bench/exportar_parquet.py --filas 5000000
+import argparse
+import os
+import resource
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+import exportacion
+
+
+def lotes_sinteticos(total, tamano):
+    base = datetime(2024, 1, 15, 8, 0, 0)
+    generadas = 0
+    while generadas < total:
+        n = min(tamano, total - generadas)
+        yield [
+            (
+                i % 200, f"Grupo {i % 200}", i % 40_000, f"Estudiante {i % 40_000}",
+                i % 500, f"Examen {i % 500}", i % 30, i,
+                base + timedelta(minutes=i % 100_000), float(i % 101), timedelta(minutes=i % 120),
+            )
+            for i in range(generadas, generadas + n)
+        ]
+        generadas += n
+
+
+def memoria_maxima_mb():
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--filas", type=int, default=5_000_000)
+    parser.add_argument("--lote", type=int, default=exportacion.ARRAYSIZE)
+    parser.add_argument("--materializar", action="store_true")
+    args = parser.parse_args()
+
+    destino = os.path.join(tempfile.mkdtemp(), "notas.parquet")
+    memoria_inicial = memoria_maxima_mb()
+    inicio = time.perf_counter()
+    lotes = lotes_sinteticos(args.filas, args.lote)
+    if args.materializar:
+        lotes = [[fila for lote in lotes for fila in lote]]
+    filas = exportacion.escribir_parquet(lotes, destino)
+    duracion = time.perf_counter() - inicio
+
+    print(f"{filas} filas en {duracion:.1f} s ({filas / duracion:,.0f} filas/s)")
+    print(f"archivo: {os.path.getsize(destino) / 1e6:.1f} MB")
+    print(f"memoria máxima del proceso: {memoria_maxima_mb():.0f} MB (antes de exportar: {memoria_inicial:.0f} MB)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,42 @@
+# Envía N preguntas sintéticas a /preguntas/importar como un cuerpo CSV en streaming y mide filas/segundo.
+#
+#   python bench/importar_preguntas.py --profesor 1 --clave 12345 --examen 1 --preguntas 50000
+import argparse
+import time
+
+import httpx
+
+
+def generar_csv(cantidad):
+    yield b"texto,opciones,respuestas_correctas,id_tipo,tema,privacidad\n"
+    for i in range(cantidad):
+        yield f'"Pregunta de prueba {i}, ¿cuánto es {i} + 1?","{i},{i + 1},{i + 2}",{i + 1},1,Benchmark,1\n'.encode()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--url", default="http://localhost:8000")
+    parser.add_argument("--profesor", type=int, required=True)
+    parser.add_argument("--clave", required=True)
+    parser.add_argument("--examen", type=int, required=True)
+    parser.add_argument("--preguntas", type=int, default=50_000)
+    args = parser.parse_args()
+
+    with httpx.Client(base_url=args.url, timeout=600) as http:
+        respuesta = http.post("/login", json={"id": args.profesor, "password": args.clave, "is_professor": 1})
+        respuesta.raise_for_status()
+        headers = {"Authorization": f"Bearer {respuesta.json()['token']}", "Content-Type": "text/csv"}
+
+        inicio = time.perf_counter()
+        respuesta = http.post("/preguntas/importar", params={"id_examen": args.examen, "formato": "csv"},
+                              headers=headers, content=generar_csv(args.preguntas))
+        duracion = time.perf_counter() - inicio
+        respuesta.raise_for_status()
+        resumen = respuesta.json()
+
+    print(f"insertadas: {resumen['insertadas']}, con error: {resumen['con_error']}")
+    print(f"{duracion:.2f} s, {resumen['insertadas'] / duracion:.0f} preguntas/s")
+
+
+if __name__ == "__main__":
+    main()
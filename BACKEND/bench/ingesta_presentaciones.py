@@ -0,0 +1,89 @@
+# Envíos por segundo de presentaciones cuando terminan 1000 estudiantes a la vez.
+# Compara el diario con escritor agrupado (una transacción y un fsync por grupo de envíos simultáneos)
+# con una transacción por envío desde el threadpool, como hacía cada petición con su commit.
+# Solo mide la confirmación al estudiante; el guardado en Oracle va por lotes en segundo plano.
+#
+#   python bench/ingesta_presentaciones.py --finalistas 1000 --rondas 10
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+from ingesta import DiarioPresentaciones, clave_idempotencia
+
+
+def datos_presentacion(estudiante: int, examen: int):
+    fecha = "2024-05-20T10:00:00"
+    return clave_idempotencia(estudiante, examen, fecha), {
+        "id_estudiante": estudiante,
+        "id_examen": examen,
+        "fecha_presentacion": fecha,
+        "puntaje": None,
+        "tiempo_tomado_s": 3000.0,
+        "direccion_ip": "10.0.0.1",
+        "respuestas": ",".join(str(i) for i in range(40)),
+    }
+
+
+def resumen(nombre, total, duracion, latencias):
+    latencias.sort()
+    print(f"{nombre:<22} {total / duracion:>10,.0f} envíos/s   p50 {statistics.median(latencias) * 1000:7.1f} ms"
+          f"   p99 {latencias[int(len(latencias) * 0.99) - 1] * 1000:7.1f} ms")
+
+
+async def agrupado(diario, finalistas, rondas):
+    latencias = []
+
+    async def enviar(estudiante, examen):
+        clave, datos = datos_presentacion(estudiante, examen)
+        inicio = time.perf_counter()
+        await diario.registrar(clave, datos)
+        latencias.append(time.perf_counter() - inicio)
+
+    inicio = time.perf_counter()
+    for ronda in range(rondas):
+        await asyncio.gather(*(enviar(e, ronda) for e in range(finalistas)))
+    return time.perf_counter() - inicio, latencias
+
+
+async def por_envio(diario, finalistas, rondas, hilos):
+    latencias = []
+    loop = asyncio.get_running_loop()
+    ejecutor = ThreadPoolExecutor(hilos)
+
+    def enviar(estudiante, examen, llegada):
+        diario.registrar_sincrono(*datos_presentacion(estudiante, examen))
+        latencias.append(time.perf_counter() - llegada)
+
+    inicio = time.perf_counter()
+    for ronda in range(rondas):
+        llegada = time.perf_counter()
+        await asyncio.gather(*(loop.run_in_executor(ejecutor, enviar, e, ronda, llegada) for e in range(finalistas)))
+    return time.perf_counter() - inicio, latencias
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--finalistas", type=int, default=1000)
+    parser.add_argument("--rondas", type=int, default=10)
+    parser.add_argument("--hilos", type=int, default=40, help="threadpool de FastAPI/AnyIO para el caso por envío")
+    args = parser.parse_args()
+    total = args.finalistas * args.rondas
+    directorio = tempfile.mkdtemp()
+
+    diario = DiarioPresentaciones(os.path.join(directorio, "agrupado.db"))
+    duracion, latencias = asyncio.run(agrupado(diario, args.finalistas, args.rondas))
+    resumen("diario agrupado", total, duracion, latencias)
+
+    diario = DiarioPresentaciones(os.path.join(directorio, "por_envio.db"))
+    duracion, latencias = asyncio.run(por_envio(diario, args.finalistas, args.rondas, args.hilos))
+    resumen("commit por envío", total, duracion, latencias)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+# Inscripción de N estudiantes a un grupo: una llamada a crear_ESTUDIANTES_GRUPO por estudiante (antes)
+# contra inscribir_estudiantes (validación en lote + executemany).
+# Crea un grupo y estudiantes sintéticos dentro de una transacción que se descarta al final.
+#
+#   python bench/inscripcion_grupo.py --estudiantes 10000
+import argparse
+import os
+import sys
+import time
+
+import oracledb
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+from db import DB_USUARIO, DB_CLAVE, DB_DSN
+from inscripcion import inscribir_estudiantes
+
+BASE_ID = 900_000_000
+
+
+def preparar(cursor, grupo_id, ids):
+    cursor.execute("INSERT INTO GRUPO (ID_GRUPO, NOMBRE) VALUES (:1, 'Benchmark')", [grupo_id])
+    cursor.executemany("INSERT INTO ESTUDIANTE (ID_ESTUDIANTE, NOMBRE) VALUES (:1, 'Benchmark')", [(i,) for i in ids])
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--estudiantes", type=int, default=10_000)
+    args = parser.parse_args()
+
+    connection = oracledb.connect(user=DB_USUARIO, password=DB_CLAVE, dsn=DB_DSN)
+    ids = list(range(BASE_ID, BASE_ID + args.estudiantes))
+    try:
+        with connection.cursor() as cursor:
+            preparar(cursor, BASE_ID, ids)
+            inicio = time.perf_counter()
+            for estudiante_id in ids:
+                cursor.callfunc("crear_ESTUDIANTES_GRUPO", str, [estudiante_id, BASE_ID])
+            por_fila = time.perf_counter() - inicio
+            cursor.execute("DELETE FROM ESTUDIANTE_GRUPO WHERE ID_GRUPO = :1", [BASE_ID])
+
+        inicio = time.perf_counter()
+        errores = inscribir_estudiantes(connection, BASE_ID, ids)
+        lote = time.perf_counter() - inicio
+    finally:
+        connection.rollback()
+        connection.close()
+
+    print(f"{args.estudiantes} estudiantes")
+    print(f"una llamada por estudiante: {por_fila:8.2f} s")
+    print(f"en lote:                    {lote:8.2f} s  ({por_fila / lote:.1f}x), errores: {len(errores)}")
+
+
+if __name__ == "__main__":
+    main()
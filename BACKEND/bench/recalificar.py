@@ -0,0 +1,95 @@
+# Tiempo de calificación de un examen completo con calificacion.ClaveExamen sobre presentaciones
+# sintéticas con el mismo JSON que guarda el endpoint en RESPUESTAS_DADAS, sin Oracle.
+# Se mide el cálculo de puntajes y de RESPUESTAS, que es lo que hace la recalificación por bloque.
+#
+# Con --por-fila se califica presentación por presentación y pregunta por pregunta, para comparar.
+#
+#   python bench/recalificar.py --presentaciones 100000 --preguntas 20
+import argparse
+import json
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+import calificacion
+from calificacion import COMPLETA, VERDADERO_FALSO, UNICA, MULTIPLE, UNIR
+
+
+def examen_sintetico(preguntas, azar):
+    filas = []
+    for id_pregunta in range(1, preguntas + 1):
+        tipo = (COMPLETA, VERDADERO_FALSO, UNICA, MULTIPLE, UNIR)[id_pregunta % 5]
+        if tipo == VERDADERO_FALSO:
+            correcta = azar.choice(["Verdadero", "Falso"])
+        elif tipo == MULTIPLE:
+            correcta = ",".join(azar.sample(["A", "B", "C", "D", "E"], 2))
+        elif tipo == UNIR:
+            correcta = ",".join(azar.sample(["uno", "dos", "tres", "cuatro"], 4))
+        else:
+            correcta = f"Respuesta {id_pregunta}"
+        filas.append((id_pregunta, tipo, correcta))
+    return filas
+
+
+def respuesta_sintetica(tipo, correcta, azar):
+    if azar.random() < 0.7:
+        if tipo == MULTIPLE:
+            opciones = correcta.split(",")
+            azar.shuffle(opciones)
+            return opciones
+        return correcta if tipo != COMPLETA else f"  {correcta.upper()} "
+    if tipo == VERDADERO_FALSO:
+        return "Verdadero" if correcta == "Falso" else "Falso"
+    if tipo == MULTIPLE:
+        return azar.sample(["A", "B", "C", "D", "E"], azar.randint(1, 3))
+    if tipo == UNIR:
+        return ",".join(azar.sample(["uno", "dos", "tres", "cuatro"], 4))
+    return f"Otra {azar.randint(1, 50)}"
+
+
+def calificar_por_fila(filas, respuestas_dadas):
+    correctas = [(str(p), t, calificacion.canonizar(t, c)) for p, t, c in filas]
+    puntajes, acertadas = [], []
+    for texto in respuestas_dadas:
+        dadas = json.loads(texto)
+        bien = [p for p, t, c in correctas if p in dadas and calificacion.canonizar(t, calificacion._texto(dadas[p])) == c]
+        puntajes.append(round(len(bien) * 100.0 / len(correctas), 2))
+        acertadas.append(",".join(bien))
+    return puntajes, acertadas
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--presentaciones", type=int, default=100_000)
+    parser.add_argument("--preguntas", type=int, default=20)
+    parser.add_argument("--por-fila", action="store_true")
+    args = parser.parse_args()
+
+    azar = random.Random(7)
+    filas = examen_sintetico(args.preguntas, azar)
+    respuestas_dadas = [
+        calificacion.normalizar_respuestas_dadas(json.dumps(
+            {str(p): respuesta_sintetica(t, c, azar) for p, t, c in filas if azar.random() < 0.95}
+        ))
+        for _ in range(args.presentaciones)
+    ]
+
+    inicio = time.perf_counter()
+    if args.por_fila:
+        puntajes, _ = calificar_por_fila(filas, respuestas_dadas)
+    else:
+        clave = calificacion.ClaveExamen(1, filas)
+        puntajes = []
+        for i in range(0, len(respuestas_dadas), calificacion.TAMANO_BLOQUE):
+            bloque, _ = clave.calificar(respuestas_dadas[i:i + calificacion.TAMANO_BLOQUE])
+            puntajes.extend(bloque.tolist())
+    duracion = time.perf_counter() - inicio
+
+    print(f"{len(puntajes)} presentaciones x {args.preguntas} preguntas en {duracion:.2f} s "
+          f"({len(puntajes) / duracion:,.0f} presentaciones/s), puntaje medio {sum(puntajes) / len(puntajes):.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+# Microbenchmark de la verificación de revocación a medida que crecen los logouts.
+# Compara la lista anterior (búsqueda lineal) con los almacenes por jti de revocacion.py.
+#
+#   python bench/revocacion_tokens.py --hasta 1000000
+import argparse
+import os
+import secrets
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+from revocacion import RevocacionMemoria, RevocacionSqlite
+
+
+def costo_por_consulta(verificar, claves, repeticiones):
+    inicio = time.perf_counter()
+    for i in range(repeticiones):
+        verificar(claves[i % len(claves)])
+    return (time.perf_counter() - inicio) / repeticiones * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--hasta", type=int, default=1_000_000)
+    parser.add_argument("--consultas", type=int, default=20_000)
+    args = parser.parse_args()
+
+    exp = int(time.time()) + 3600
+    memoria = RevocacionMemoria()
+    directorio = tempfile.mkdtemp()
+    sqlite = RevocacionSqlite(os.path.join(directorio, "revocados.db"))
+    lista = []
+    consultas = [secrets.token_hex(16) for _ in range(1000)]
+
+    tamanos = [n for n in (1_000, 10_000, 100_000, 1_000_000, 10_000_000) if n <= args.hasta]
+    print(f"{'revocados':>10} {'lista us':>10} {'memoria us':>11} {'sqlite us':>10}")
+    total = 0
+    for tamano in tamanos:
+        nuevos = [secrets.token_hex(16) for _ in range(tamano - total)]
+        for jti in nuevos:
+            memoria.revocar(jti, exp)
+        con = sqlite._conexion()
+        with con:
+            con.executemany("INSERT OR REPLACE INTO tokens_revocados (jti, exp) VALUES (?, ?)", ((j, exp) for j in nuevos))
+        lista.extend(nuevos)
+        total = tamano
+
+        # La lista se mide con pocas consultas: cada una recorre todos los tokens
+        t_lista = costo_por_consulta(lista.__contains__, consultas, max(20, args.consultas // max(1, tamano // 1000)))
+        t_memoria = costo_por_consulta(memoria.esta_revocado, consultas, args.consultas)
+        t_sqlite = costo_por_consulta(sqlite.esta_revocado, consultas, args.consultas)
+        print(f"{tamano:>10} {t_lista:>10.2f} {t_memoria:>11.2f} {t_sqlite:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+# Serialización de reportes grandes sin Oracle: jsonable_encoder + JSONResponse de FastAPI (antes)
+# contra serializacion.a_json (después), con filas como las de /reporte/preguntas-examen y
+# /consultas/estudiantes, y con presentaciones (DATE e INTERVAL DAY TO SECOND ya convertido a segundos
+# por serializacion.manejador_tipos).
+#
+#   python bench/serializacion_reportes.py --filas 100000
+import argparse
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+import serializacion
+
+
+def reportes(filas: int, azar: random.Random) -> dict:
+    inicio = datetime(2024, 2, 1, 8, 0)
+    return {
+        "/reporte/preguntas-examen": [
+            (f"Examen {i % 300}", f"¿Pregunta {i} sobre transacciones, índices y planes de ejecución?", azar.randrange(500))
+            for i in range(filas)
+        ],
+        "/consultas/estudiantes": [
+            (f"Estudiante {i} Pérez", azar.random() * 5, azar.randrange(1, 40)) for i in range(filas)
+        ],
+        # antes con timedelta (jsonable_encoder lo pasa a segundos), después ya en segundos
+        "presentaciones": [
+            (i, inicio + timedelta(minutes=i), timedelta(seconds=azar.randrange(3600)), azar.random() * 5)
+            for i in range(filas)
+        ],
+    }
+
+
+def medir(funcion, datos, repeticiones: int):
+    tiempos = []
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        cuerpo = funcion(datos)
+        tiempos.append(time.perf_counter() - inicio)
+    return min(tiempos) * 1000, len(cuerpo)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--filas", type=int, default=100_000)
+    parser.add_argument("--repeticiones", type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"codificador: {'orjson' if serializacion.orjson is not None else 'json (sin orjson)'}")
+    for nombre, filas in reportes(args.filas, random.Random(7)).items():
+        antes, tamano_antes = medir(lambda d: JSONResponse(jsonable_encoder(d)).body, filas, args.repeticiones)
+        if nombre == "presentaciones":
+            filas = [(a, b, c.total_seconds(), d) for a, b, c, d in filas]
+        despues, tamano_despues = medir(serializacion.a_json, filas, args.repeticiones)
+        print(f"{nombre:>26}: antes {antes:,.0f} ms ({tamano_antes / 1e6:.1f} MB), "
+              f"después {despues:,.0f} ms ({tamano_despues / 1e6:.1f} MB), x{antes / despues:.0f}")
+
+
+if __name__ == "__main__":
+    main()
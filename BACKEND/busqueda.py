@@ -0,0 +1,306 @@
+import logging
+import math
+import os
+import re
+import threading
+import unicodedata
+from array import array
+from bisect import bisect_left
+from collections import Counter
+import numpy as np
+
+# Índice invertido en memoria para buscar en el banco de preguntas por TEXTO, OPCIONES y TEMA.
+# Cada pregunta es un documento (sin repetir aunque esté en varios exámenes); los términos se guardan
+# sin tildes ni mayúsculas y la consulta se ordena con BM25. Un término que termina en * busca por prefijo.
+# Se construye al arrancar en un hilo aparte, se actualiza con cada alta, cambio o baja de preguntas y
+# se reconstruye cada BUSQUEDA_RECONSTRUIR_S para recoger lo que cambiaron otros workers.
+
+logger = logging.getLogger("uvicorn.error")
+
+RECONSTRUIR_S = float(os.getenv("BUSQUEDA_RECONSTRUIR_S", "3600"))
+# Filas por viaje a la base de datos al construir
+ARRAYSIZE = 5000
+# Términos del vocabulario a los que se expande como máximo un prefijo
+MAXIMO_EXPANSION = 500
+LIMITE_MAXIMO = 100
+
+PESO_TEXTO, PESO_OPCIONES, PESO_TEMA = 1.0, 0.5, 2.0
+K1, B = 1.2, 0.75
+
+PALABRA = re.compile(r"\w+")
+VACIAS = frozenset(
+    "a al con de del el en es la las lo los o para por que se su un una y".split()
+)
+
+ALCANCES = ("banco", "mias", "publicas")
+
+CONSULTA_PREGUNTAS = "SELECT ID_PREGUNTA, TEXTO, OPCIONES, TEMA, PRIVACIDAD, ID_PROFESOR FROM PREGUNTA"
+
+# Preguntas sin dueño (PREGUNTA.ID_PROFESOR nulo)
+SIN_PROFESOR = -1
+
+# Para actualizar solo algunas preguntas
+FILTRO_IDS = " WHERE ID_PREGUNTA IN (SELECT COLUMN_VALUE FROM TABLE(:ids))"
+
+
+def normalizar(texto: str) -> str:
+    return unicodedata.normalize("NFKD", texto.casefold()).encode("ascii", "ignore").decode("ascii")
+
+
+def terminos(texto) -> list:
+    if not texto:
+        return []
+    return [t for t in PALABRA.findall(normalizar(texto)) if t not in VACIAS]
+
+
+# [(término, es_prefijo)] de la consulta del usuario
+def leer_consulta(consulta: str) -> list:
+    leidos = []
+    for parte in consulta.split():
+        prefijo = parte.endswith("*")
+        for termino in PALABRA.findall(normalizar(parte)):
+            if termino not in VACIAS or prefijo:
+                leidos.append((termino, False))
+        if prefijo and leidos:
+            leidos[-1] = (leidos[-1][0], True)
+    return leidos
+
+
+class _Estado:
+    def __init__(self):
+        self.posicion_termino = {}
+        self.vocabulario = []
+        self.docs = []
+        self.pesos = []
+        self.ids = array("q")
+        self.privacidad = array("b")
+        self.temas = array("i")
+        self.codigos_tema = {}
+        self.longitudes = array("f")
+        self.vivos = bytearray()
+        self.doc_por_id = {}
+        self.profesores = array("q")
+        self.longitud_total = 0.0
+
+    def agregar(self, id_pregunta: int, texto, opciones, tema, privacidad, id_profesor):
+        anterior = self.doc_por_id.get(id_pregunta)
+        if anterior is not None:
+            self.quitar(anterior)
+        frecuencias = Counter()
+        for termino in terminos(texto):
+            frecuencias[termino] += PESO_TEXTO
+        for termino in terminos(opciones):
+            frecuencias[termino] += PESO_OPCIONES
+        for termino in terminos(tema):
+            frecuencias[termino] += PESO_TEMA
+        doc = len(self.ids)
+        longitud = sum(frecuencias.values())
+        self.ids.append(id_pregunta)
+        self.privacidad.append(privacidad or 0)
+        self.profesores.append(SIN_PROFESOR if id_profesor is None else id_profesor)
+        self.temas.append(self.codigos_tema.setdefault(normalizar(tema or ""), len(self.codigos_tema)))
+        self.longitudes.append(longitud)
+        self.vivos.append(1)
+        self.doc_por_id[id_pregunta] = doc
+        self.longitud_total += longitud
+        for termino, peso in frecuencias.items():
+            posicion = self.posicion_termino.get(termino)
+            if posicion is None:
+                posicion = self.posicion_termino[termino] = len(self.docs)
+                self.docs.append(array("I"))
+                self.pesos.append(array("f"))
+                self.vocabulario.insert(bisect_left(self.vocabulario, termino), termino)
+            self.docs[posicion].append(doc)
+            self.pesos[posicion].append(peso)
+
+    # El documento queda marcado como borrado; sus entradas se descartan en la próxima reconstrucción
+    def quitar(self, doc: int):
+        self.vivos[doc] = 0
+        self.longitud_total -= self.longitudes[doc]
+        del self.doc_por_id[self.ids[doc]]
+
+    def _expandir(self, termino: str, prefijo: bool) -> list:
+        if not prefijo:
+            posicion = self.posicion_termino.get(termino)
+            return [] if posicion is None else [posicion]
+        inicio = bisect_left(self.vocabulario, termino)
+        expandidos = []
+        for candidato in self.vocabulario[inicio:inicio + MAXIMO_EXPANSION]:
+            if not candidato.startswith(termino):
+                break
+            expandidos.append(self.posicion_termino[candidato])
+        return expandidos
+
+    def buscar(self, consulta: list, propietario, alcance: str, privacidad, tema, desde: int, limite: int):
+        n = len(self.ids)
+        cantidad = len(self.doc_por_id)
+        if not consulta or not cantidad:
+            return 0, []
+        longitudes = np.frombuffer(self.longitudes, dtype=np.float32)
+        promedio = self.longitud_total / cantidad
+        total = np.zeros(n, dtype=np.float32)
+        coincidencias = np.zeros(n, dtype=np.uint8)
+        for termino, prefijo in consulta:
+            expandidos = self._expandir(termino, prefijo)
+            if not expandidos:
+                return 0, []
+            puntaje = np.zeros(n, dtype=np.float32)
+            for posicion in expandidos:
+                docs = np.frombuffer(self.docs[posicion], dtype=np.uint32)
+                tf = np.frombuffer(self.pesos[posicion], dtype=np.float32)
+                idf = math.log(1 + (cantidad - len(docs) + 0.5) / (len(docs) + 0.5))
+                valor = idf * tf * (K1 + 1) / (tf + K1 * (1 - B + B * longitudes[docs] / promedio))
+                # Varios términos del mismo prefijo en un documento cuentan como el mejor de ellos
+                puntaje[docs] = np.maximum(puntaje[docs], valor)
+            total += puntaje
+            coincidencias += puntaje > 0
+
+        candidatos = np.flatnonzero(
+            (coincidencias == len(consulta)) & (np.frombuffer(self.vivos, dtype=np.uint8) == 1)
+        )
+        if tema is not None:
+            codigo = self.codigos_tema.get(normalizar(tema))
+            if codigo is None:
+                return 0, []
+            candidatos = candidatos[np.frombuffer(self.temas, dtype=np.int32)[candidatos] == codigo]
+        niveles = np.frombuffer(self.privacidad, dtype=np.int8)
+        if privacidad is not None:
+            candidatos = candidatos[niveles[candidatos] == privacidad]
+        # Una pregunta privada solo la ve su profesor, aunque se pida privacidad distinta de 0
+        publicas = niveles[candidatos] == 0
+        if alcance == "publicas":
+            candidatos = candidatos[publicas]
+        else:
+            if propietario is None:
+                es_propio = np.zeros(len(candidatos), dtype=bool)
+            else:
+                es_propio = np.frombuffer(self.profesores, dtype=np.int64)[candidatos] == propietario
+            candidatos = candidatos[es_propio if alcance == "mias" else es_propio | publicas]
+
+        puntajes = total[candidatos]
+        hasta = min(desde + limite, len(candidatos))
+        if hasta <= desde:
+            return len(candidatos), []
+        # Solo se ordenan las primeras "hasta" posiciones
+        if hasta < len(candidatos):
+            primeros = np.argpartition(-puntajes, hasta - 1)[:hasta]
+        else:
+            primeros = np.arange(len(candidatos))
+        orden = primeros[np.lexsort((candidatos[primeros], -puntajes[primeros]))][desde:hasta]
+        ids = np.frombuffer(self.ids, dtype=np.int64)[candidatos[orden]]
+        return len(candidatos), ids.tolist()
+
+
+class IndicePreguntas:
+    def __init__(self):
+        self._estado = _Estado()
+        self._lock = threading.RLock()
+        self._reconstruyendo = False
+        self._cambiadas_durante = set()
+        self._detener = threading.Event()
+        self._hilo = None
+        self.listo = False
+
+    def buscar(self, consulta: str, propietario=None, alcance: str = "banco", privacidad=None, tema=None,
+               desde: int = 0, limite: int = 20):
+        leida = leer_consulta(consulta)
+        with self._lock:
+            return self._estado.buscar(leida, propietario, alcance, privacidad, tema, desde, limite)
+
+    # Bloques de filas (id, texto, opciones, tema, privacidad, profesor) leídos de Oracle
+    def _leer(self, connection, ids=None):
+        with connection.cursor() as cursor:
+            cursor.arraysize = ARRAYSIZE
+            if ids is None:
+                cursor.execute(CONSULTA_PREGUNTAS)
+            else:
+                cursor.execute(CONSULTA_PREGUNTAS + FILTRO_IDS, ids=ids)
+            while True:
+                filas = cursor.fetchmany()
+                if not filas:
+                    break
+                yield filas
+
+    def reconstruir(self, connection):
+        with self._lock:
+            self._reconstruyendo = True
+            self._cambiadas_durante = set()
+        nuevo = _Estado()
+        try:
+            # El índice nuevo no lo ve nadie hasta el final: se llena sin tomar el lock
+            for filas in self._leer(connection):
+                for fila in filas:
+                    nuevo.agregar(*fila)
+        finally:
+            with self._lock:
+                self._reconstruyendo = False
+                cambiadas = self._cambiadas_durante
+        with self._lock:
+            self._estado = nuevo
+            self.listo = True
+        # Lo que cambió mientras se leía puede no estar en la lectura completa
+        if cambiadas:
+            self.actualizar(connection, cambiadas)
+        logger.info("Índice de preguntas: %d preguntas, %d términos", len(nuevo.doc_por_id), len(nuevo.docs))
+
+    # Vuelve a leer de Oracle las preguntas indicadas (las que ya no existen se quitan del índice)
+    def actualizar(self, connection, ids):
+        ids = sorted(set(ids))
+        if not ids:
+            return
+        with self._lock:
+            if self._reconstruyendo:
+                self._cambiadas_durante.update(ids)
+        lista = connection.gettype("SYS.ODCINUMBERLIST").newobject(ids)
+        filas = [fila for bloque in self._leer(connection, lista) for fila in bloque]
+        with self._lock:
+            for fila in filas:
+                self._estado.agregar(*fila)
+            for id_pregunta in set(ids) - {fila[0] for fila in filas}:
+                doc = self._estado.doc_por_id.get(id_pregunta)
+                if doc is not None:
+                    self._estado.quitar(doc)
+
+    # Preguntas de un examen (después de importarlas en bloque)
+    def actualizar_examen(self, connection, id_examen: int):
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT ID_PREGUNTA FROM EXAMEN_PREGUNTA WHERE ID_EXAMEN = :id_examen", id_examen=id_examen)
+            ids = [fila[0] for fila in cursor.fetchall()]
+        self.actualizar(connection, ids)
+
+    def iniciar(self, adquirir, liberar):
+        def ciclo():
+            while not self._detener.is_set():
+                try:
+                    connection = adquirir()
+                    try:
+                        self.reconstruir(connection)
+                    finally:
+                        liberar(connection)
+                except Exception:
+                    logger.exception("No se pudo construir el índice de preguntas")
+                    # Si ya estaba listo se sigue respondiendo con el índice anterior hasta el próximo intento
+                    if self._detener.wait(30):
+                        return
+                    continue
+                if RECONSTRUIR_S <= 0 or self._detener.wait(RECONSTRUIR_S):
+                    return
+
+        self._hilo = threading.Thread(target=ciclo, name="indice-preguntas", daemon=True)
+        self._hilo.start()
+
+    def detener(self):
+        self._detener.set()
+
+    def estadisticas(self):
+        with self._lock:
+            estado = self._estado
+            return {
+                "listo": self.listo,
+                "preguntas": len(estado.doc_por_id),
+                "borradas": len(estado.ids) - len(estado.doc_por_id),
+                "terminos": len(estado.docs),
+            }
+
+
+indice_preguntas = IndicePreguntas()
@@ -0,0 +1,62 @@
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+
+# Cache LRU de tokens ya verificados, indexada por el SHA-256 de la credencial.
+# Evita repetir jwt.decode (HMAC) cada vez que un estudiante presenta el mismo token.
+# Cada entrada vence con el exp del propio token y se borra al hacer logout.
+
+
+class CacheTokens:
+    def __init__(self, capacidad: int):
+        self._capacidad = capacidad
+        self._entradas = OrderedDict()
+        self._lock = threading.Lock()
+        self.aciertos = 0
+        self.fallos = 0
+
+    @staticmethod
+    def digest(credencial: str) -> bytes:
+        return hashlib.sha256(credencial.encode()).digest()
+
+    # Devuelve (usuario_id, is_professor, jti, exp) o None si no está o ya venció
+    def obtener(self, clave: bytes):
+        with self._lock:
+            datos = self._entradas.get(clave)
+            if datos is None:
+                self.fallos += 1
+                return None
+            if datos[3] <= time.time():
+                del self._entradas[clave]
+                self.fallos += 1
+                return None
+            self._entradas.move_to_end(clave)
+            self.aciertos += 1
+            return datos
+
+    def guardar(self, clave: bytes, datos: tuple):
+        with self._lock:
+            self._entradas[clave] = datos
+            self._entradas.move_to_end(clave)
+            while len(self._entradas) > self._capacidad:
+                self._entradas.popitem(last=False)
+
+    def invalidar(self, clave: bytes):
+        with self._lock:
+            self._entradas.pop(clave, None)
+
+    def estadisticas(self):
+        with self._lock:
+            consultas = self.aciertos + self.fallos
+            return {
+                "entradas": len(self._entradas),
+                "capacidad": self._capacidad,
+                "aciertos": self.aciertos,
+                "fallos": self.fallos,
+                "tasa_aciertos": self.aciertos / consultas if consultas else 0.0,
+            }
+
+
+cache_tokens = CacheTokens(int(os.getenv("CACHE_TOKENS_CAPACIDAD", "20000")))
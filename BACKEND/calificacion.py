@@ -0,0 +1,260 @@
+import argparse
+import json
+import re
+import time
+import unicodedata
+import numpy as np
+
+# Calificación en el servidor a partir de las respuestas dadas (PRESENTACION_EXAMEN.RESPUESTAS_DADAS,
+# JSON {"<ID_PREGUNTA>": "respuesta"}; en múltiple y unir las opciones van separadas por "," igual que
+# en PREGUNTA.RESPUESTAS_CORRECTAS). Se califican todas las presentaciones de un examen juntas:
+# las respuestas quedan en una matriz presentaciones x preguntas y cada columna se compara contra
+# la clave del examen con NumPy, normalizando solo las respuestas distintas de cada pregunta.
+#
+#   python calificacion.py --examen 5              recalifica las presentaciones del examen
+#   python calificacion.py --pregunta 12           recalifica los exámenes que usan la pregunta
+#   python calificacion.py --examen 5 --simular    solo cuenta los puntajes que cambiarían
+
+# PREGUNTA.ID_TIPO
+COMPLETA, VERDADERO_FALSO, UNICA, MULTIPLE, UNIR = 1, 2, 3, 4, 5
+
+# Presentaciones que se leen, califican y actualizan por bloque al recalificar
+TAMANO_BLOQUE = 10000
+
+SIN_RESPUESTA = ""
+
+CONSULTA_CLAVES = """
+    SELECT ep.ID_Examen, p.ID_Pregunta, p.ID_Tipo, p.Respuestas_Correctas
+    FROM Examen_Pregunta ep
+    JOIN Pregunta p ON p.ID_Pregunta = ep.ID_Pregunta
+    WHERE ep.ID_Examen IN (SELECT COLUMN_VALUE FROM TABLE(:examenes))
+    ORDER BY ep.ID_Examen, p.ID_Pregunta
+"""
+
+CONSULTA_PRESENTACIONES = """
+    SELECT ID_Presentacion_Examen, Puntaje, Respuestas_Dadas, ID_Estudiante
+    FROM Presentacion_Examen
+    WHERE ID_Examen = :id_examen AND Respuestas_Dadas IS NOT NULL
+"""
+
+# Exámenes que tienen la pregunta y exámenes que la pueden tomar del banco: les faltan preguntas para
+# Cantidad_De_Preguntas y tienen alguna del mismo tema (las candidatas de preguntas.CONSULTA_BANCO)
+EXAMENES_CON_PREGUNTA = """
+    SELECT ID_Examen FROM Examen_Pregunta WHERE ID_Pregunta = :id_pregunta
+    UNION
+    SELECT e.ID_Examen
+    FROM Examen e
+    WHERE e.Cantidad_De_Preguntas > (SELECT COUNT(*) FROM Examen_Pregunta ep WHERE ep.ID_Examen = e.ID_Examen)
+    AND EXISTS (
+        SELECT 1
+        FROM Examen_Pregunta ep
+        JOIN Pregunta p ON p.ID_Pregunta = ep.ID_Pregunta
+        JOIN Pregunta q ON q.Tema = p.Tema
+        WHERE ep.ID_Examen = e.ID_Examen AND q.ID_Pregunta = :id_pregunta
+    )
+"""
+
+ACTUALIZAR_PUNTAJE = """
+    UPDATE Presentacion_Examen SET Puntaje = :1, Respuestas = :2
+    WHERE ID_Presentacion_Examen = :3
+"""
+
+ESPACIOS = re.compile(r"\s+")
+
+
+def _normalizar(texto: str) -> str:
+    return ESPACIOS.sub(" ", unicodedata.normalize("NFKC", texto)).strip().casefold()
+
+
+# Forma canónica de una respuesta (o de la respuesta correcta) según el tipo de pregunta:
+# múltiple no depende del orden de las opciones, unir sí (cada elemento con su pareja)
+def canonizar(tipo: int, texto: str) -> str:
+    if tipo == MULTIPLE:
+        return ",".join(sorted({_normalizar(o) for o in texto.split(",") if o.strip()}))
+    if tipo == UNIR:
+        return ",".join(_normalizar(o) for o in texto.split(","))
+    return _normalizar(texto)
+
+
+def _texto(valor) -> str:
+    if valor is None:
+        return SIN_RESPUESTA
+    if isinstance(valor, list):
+        return ",".join(str(v) for v in valor)
+    return str(valor)
+
+
+# Valida el JSON de respuestas dadas que envía el cliente y lo deja con todas las respuestas como texto
+def normalizar_respuestas_dadas(texto: str) -> str:
+    dadas = json.loads(texto)
+    if not isinstance(dadas, dict):
+        raise ValueError("Las respuestas dadas deben ser un objeto JSON")
+    return json.dumps({str(id_pregunta): _texto(valor) for id_pregunta, valor in dadas.items()}, ensure_ascii=False)
+
+
+# filas: (ID_PREGUNTA, ID_TIPO, RESPUESTAS_CORRECTAS) de todas las preguntas que pueden tocarle a un
+# estudiante; cantidad: cuántas responde cada uno (el puntaje es sobre esa cantidad).
+# asignar(id_estudiante) devuelve los IDs de las preguntas que le tocaron (ensamblaje.armar): con él cada
+# presentación se califica solo contra esas, aunque el estudiante envíe respuestas de otras del banco.
+class ClaveExamen:
+    def __init__(self, id_examen: int, filas: list, cantidad: int = None, asignar=None):
+        self.id_examen = id_examen
+        self.cantidad = cantidad or len(filas)
+        self.asignar = asignar
+        self.preguntas = np.array([fila[0] for fila in filas], dtype=np.int64)
+        self.tipos = [fila[1] for fila in filas]
+        self.correctas = [canonizar(tipo, correcta or "") for _, tipo, correcta in filas]
+        self.claves_json = [str(fila[0]) for fila in filas]
+        self.columnas = {fila[0]: j for j, fila in enumerate(filas)}
+
+    # Matriz booleana presentaciones x preguntas con los aciertos
+    def aciertos(self, respuestas_dadas: list) -> np.ndarray:
+        # Un solo json.loads para todo el bloque
+        dadas = json.loads("[" + ",".join(texto or "{}" for texto in respuestas_dadas) + "]")
+        aciertos = np.zeros((len(dadas), len(self.claves_json)), dtype=bool)
+        # Con preguntas del banco la clave tiene más preguntas de las que respondió cada uno
+        respondidas = set().union(*dadas)
+        for j, clave in enumerate(self.claves_json):
+            if clave not in respondidas:
+                continue
+            columna = [d.get(clave, SIN_RESPUESTA) for d in dadas]
+            try:
+                columna = np.array(columna, dtype=str)
+            except ValueError:
+                columna = None
+            if columna is None or columna.ndim != 1:  # respuestas guardadas como lista en lugar de texto
+                columna = np.array([_texto(d.get(clave)) for d in dadas], dtype=str)
+            # Cada respuesta distinta se normaliza y compara una sola vez
+            distintas, posiciones = np.unique(columna, return_inverse=True)
+            tipo, correcta = self.tipos[j], self.correctas[j]
+            correctas = np.fromiter(
+                (d != SIN_RESPUESTA and canonizar(tipo, d) == correcta for d in distintas),
+                dtype=bool, count=len(distintas),
+            )
+            aciertos[:, j] = correctas[posiciones]
+        return aciertos
+
+    # Matriz booleana presentaciones x preguntas con las preguntas que le tocaron a cada estudiante
+    def asignadas(self, estudiantes: list) -> np.ndarray:
+        asignadas = np.zeros((len(estudiantes), len(self.claves_json)), dtype=bool)
+        columnas_por_estudiante = {}
+        for i, id_estudiante in enumerate(estudiantes):
+            columnas = columnas_por_estudiante.get(id_estudiante)
+            if columnas is None:
+                columnas = columnas_por_estudiante[id_estudiante] = [
+                    self.columnas[int(p)] for p in self.asignar(id_estudiante) if int(p) in self.columnas
+                ]
+            asignadas[i, columnas] = True
+        return asignadas
+
+    # Puntajes (0 a 100, dos decimales) y IDs de las preguntas acertadas separados por ",".
+    # estudiantes: ID_ESTUDIANTE de cada presentación, para calificar solo sus preguntas
+    def calificar(self, respuestas_dadas: list, estudiantes: list = None):
+        aciertos = self.aciertos(respuestas_dadas)
+        if not len(self.claves_json):
+            return np.zeros(len(respuestas_dadas)), [""] * len(respuestas_dadas)
+        cantidad = self.cantidad
+        if estudiantes is not None and self.asignar is not None:
+            asignadas = self.asignadas(estudiantes)
+            aciertos &= asignadas
+            cantidad = np.maximum(asignadas.sum(axis=1), 1)
+        puntajes = np.round(np.minimum(aciertos.sum(axis=1) * (100.0 / cantidad), 100.0), 2)
+        ids = self.preguntas.astype(str)
+        acertadas = [",".join(ids[fila]) for fila in aciertos]
+        return puntajes, acertadas
+
+
+# {id_examen: ClaveExamen} con las preguntas y respuestas correctas actuales de cada examen
+def armar_claves(filas: list) -> dict:
+    por_examen = {}
+    for id_examen, id_pregunta, tipo, correcta in filas:
+        por_examen.setdefault(id_examen, []).append((id_pregunta, tipo, correcta))
+    return {id_examen: ClaveExamen(id_examen, preguntas) for id_examen, preguntas in por_examen.items()}
+
+
+def cargar_claves(connection, examenes) -> dict:
+    lista = connection.gettype("SYS.ODCINUMBERLIST").newobject(sorted(set(examenes)))
+    with connection.cursor() as cursor:
+        cursor.execute(CONSULTA_CLAVES, examenes=lista)
+        return armar_claves(cursor.fetchall())
+
+
+# Califica en el lugar los datos de presentaciones que traen respuestas dadas (lote de la ingesta):
+# un grupo por examen y una sola consulta de claves para todos. Un puntaje que ya traigan se reemplaza.
+def calificar_pendientes(connection, presentaciones: list, cargar=None):
+    con_respuestas = [d for d in presentaciones if d.get("respuestas_dadas")]
+    if not con_respuestas:
+        return
+    por_examen = {}
+    for datos in con_respuestas:
+        por_examen.setdefault(datos["id_examen"], []).append(datos)
+    claves = (cargar or cargar_claves)(connection, por_examen)
+    for id_examen, grupo in por_examen.items():
+        if id_examen not in claves:
+            continue
+        puntajes, acertadas = claves[id_examen].calificar(
+            [d["respuestas_dadas"] for d in grupo], [d["id_estudiante"] for d in grupo]
+        )
+        for datos, puntaje, correctas in zip(grupo, puntajes, acertadas):
+            datos["puntaje"] = float(puntaje)
+            datos["respuestas"] = correctas
+
+
+# Recalifica todas las presentaciones con respuestas dadas de un examen; solo se escriben
+# las que cambian de puntaje. Devuelve (revisadas, cambiadas)
+def recalificar_examen(connection, id_examen: int, simular: bool = False, cargar=None):
+    clave = (cargar or cargar_claves)(connection, [id_examen]).get(id_examen)
+    if clave is None:
+        return 0, 0
+    revisadas = cambiadas = 0
+    with connection.cursor() as lectura, connection.cursor() as escritura:
+        lectura.arraysize = TAMANO_BLOQUE
+        lectura.execute(CONSULTA_PRESENTACIONES, id_examen=id_examen)
+        while True:
+            filas = lectura.fetchmany()
+            if not filas:
+                break
+            ids = np.array([fila[0] for fila in filas], dtype=np.int64)
+            anteriores = np.array([np.nan if fila[1] is None else fila[1] for fila in filas], dtype=float)
+            puntajes, acertadas = clave.calificar([fila[2] for fila in filas], [fila[3] for fila in filas])
+            cambios = np.flatnonzero(~np.isclose(puntajes, anteriores))
+            revisadas += len(filas)
+            cambiadas += len(cambios)
+            if len(cambios) and not simular:
+                escritura.executemany(ACTUALIZAR_PUNTAJE, [
+                    (float(puntajes[i]), acertadas[i], int(ids[i])) for i in cambios
+                ])
+    if not simular:
+        connection.commit()
+    return revisadas, cambiadas
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--examen", type=int, action="append", default=[])
+    parser.add_argument("--pregunta", type=int)
+    parser.add_argument("--simular", action="store_true")
+    args = parser.parse_args()
+    if not args.examen and args.pregunta is None:
+        parser.error("indique --examen o --pregunta")
+
+    from db import adquirir_conexion, liberar_conexion
+    from preguntas import cache_preguntas
+    connection = adquirir_conexion()
+    try:
+        examenes = list(args.examen)
+        if args.pregunta is not None:
+            with connection.cursor() as cursor:
+                cursor.execute(EXAMENES_CON_PREGUNTA, id_pregunta=args.pregunta)
+                examenes += [fila[0] for fila in cursor.fetchall()]
+        for id_examen in sorted(set(examenes)):
+            inicio = time.perf_counter()
+            revisadas, cambiadas = recalificar_examen(connection, id_examen, args.simular, cache_preguntas.claves)
+            print(f"Examen {id_examen}: {revisadas} presentaciones, {cambiadas} con puntaje distinto "
+                  f"({time.perf_counter() - inicio:.1f} s)")
+    finally:
+        liberar_conexion(connection)
+
+
+if __name__ == "__main__":
+    main()
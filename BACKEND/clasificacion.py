@@ -0,0 +1,71 @@
+from fastapi import HTTPException
+from paginacion import ConsultaPaginada
+
+# Clasificaciones top-N por examen, grupo o curso, calculadas en una sola consulta con funciones analíticas
+# sobre MEJOR_PUNTAJE (BD/migraciones/V005), que ya guarda una fila por estudiante y examen.
+#   examen: mejor puntaje del estudiante en el examen
+#   grupo:  promedio de los mejores puntajes de cada estudiante del grupo
+#   curso:  promedio de los mejores puntajes del estudiante en los exámenes del curso
+
+N_MAXIMO = 100
+
+PUNTAJES = {
+    "examen": ("""
+        SELECT m.ID_Examen AS Clave_Ambito, x.Nombre AS Ambito, m.ID_Estudiante AS Clave_Estudiante,
+            m.Puntaje, m.Fecha_Presentacion AS Fecha
+        FROM Mejor_Puntaje m
+        JOIN Examen x ON x.ID_Examen = m.ID_Examen
+    """, "m.ID_Examen = :id", ""),
+    "grupo": ("""
+        SELECT eg.ID_Grupo AS Clave_Ambito, g.Nombre AS Ambito, m.ID_Estudiante AS Clave_Estudiante,
+            AVG(m.Puntaje) AS Puntaje, MAX(m.Fecha_Presentacion) AS Fecha
+        FROM Estudiante_Grupo eg
+        JOIN Grupo g ON g.ID_Grupo = eg.ID_Grupo
+        JOIN Mejor_Puntaje m ON m.ID_Estudiante = eg.ID_Estudiante
+    """, "eg.ID_Grupo = :id", "GROUP BY eg.ID_Grupo, g.Nombre, m.ID_Estudiante"),
+    "curso": ("""
+        SELECT x.ID_Curso AS Clave_Ambito, c.Nombre AS Ambito, m.ID_Estudiante AS Clave_Estudiante,
+            AVG(m.Puntaje) AS Puntaje, MAX(m.Fecha_Presentacion) AS Fecha
+        FROM Mejor_Puntaje m
+        JOIN Examen x ON x.ID_Examen = m.ID_Examen
+        JOIN Curso c ON c.ID_Curso = x.ID_Curso
+    """, "x.ID_Curso = :id", "GROUP BY x.ID_Curso, c.Nombre, m.ID_Estudiante"),
+}
+
+# Política de empates:
+#   incluir: RANK, los empatados en el puesto N entran todos (puede haber más de N filas)
+#   denso:   DENSE_RANK, los N mejores puntajes distintos con todos sus estudiantes
+#   excluir: ROW_NUMBER, exactamente N filas; gana quien logró el puntaje primero
+EMPATES = {
+    "incluir": "RANK() OVER (PARTITION BY Clave_Ambito ORDER BY Puntaje DESC)",
+    "denso": "DENSE_RANK() OVER (PARTITION BY Clave_Ambito ORDER BY Puntaje DESC)",
+    "excluir": "ROW_NUMBER() OVER (PARTITION BY Clave_Ambito ORDER BY Puntaje DESC, Fecha, Clave_Estudiante)",
+}
+
+COLUMNAS = ["Ambito", "Posicion", "Estudiante", "Puntaje"]
+CLAVES = ["Clave_Ambito", "Posicion", "Clave_Estudiante"]
+
+
+# Devuelve la consulta paginable y sus parámetros; id limita la clasificación a un solo examen, grupo o curso
+def consulta_clasificacion(ambito: str, n: int = 10, empates: str = "incluir", id: int = None):
+    if ambito not in PUNTAJES:
+        raise HTTPException(status_code=400, detail="ambito debe ser examen, grupo o curso")
+    if empates not in EMPATES:
+        raise HTTPException(status_code=400, detail="empates debe ser incluir, denso o excluir")
+    if not 1 <= n <= N_MAXIMO:
+        raise HTTPException(status_code=400, detail=f"n debe estar entre 1 y {N_MAXIMO}")
+    base, filtro, agrupar = PUNTAJES[ambito]
+    params = {"n": n}
+    if id is not None:
+        base += f" WHERE {filtro}"
+        params["id"] = id
+    sql = f"""
+        SELECT p.Clave_Ambito, p.Ambito, p.Clave_Estudiante, e.Nombre AS Estudiante, p.Puntaje, p.Posicion
+        FROM (
+            SELECT t.*, {EMPATES[empates]} AS Posicion
+            FROM ({base} {agrupar}) t
+        ) p
+        JOIN Estudiante e ON e.ID_Estudiante = p.Clave_Estudiante
+        WHERE p.Posicion <= :n
+    """
+    return ConsultaPaginada(sql, COLUMNAS, CLAVES), params
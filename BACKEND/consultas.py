@@ -0,0 +1,154 @@
+import logging
+import os
+import threading
+import time
+
+# Registro de las consultas de lectura de main.py con el perfil de filas que se espera de cada una.
+# El perfil fija arraysize y prefetchrows del cursor para que Oracle entregue el resultado en los
+# viajes justos: una búsqueda por clave primaria sale en el mismo viaje del execute (y se lee con
+# fetchone), un listado corto también, y un reporte grande trae bloques de miles de filas por viaje
+# en lugar de 100. Cada consulta lleva sus contadores (ejecuciones, filas, viajes y tiempo) en
+# GET /consultas-registradas/estadisticas.
+# Los viajes se estiman con el perfil; con CONSULTAS_MEDIR_VIAJES=1 se miden en V$MYSTAT (necesita
+# GRANT SELECT sobre V_$MYSTAT y V_$STATNAME, y suma dos consultas por ejecución: solo para pruebas).
+
+logger = logging.getLogger("uvicorn.error")
+
+MEDIR_VIAJES = os.getenv("CONSULTAS_MEDIR_VIAJES", "0") == "1"
+
+CONSULTA_VIAJES = """
+    SELECT M.VALUE
+    FROM V$MYSTAT M
+    JOIN V$STATNAME N ON N.STATISTIC# = M.STATISTIC#
+    WHERE N.NAME = 'SQL*Net roundtrips to/from client'
+"""
+
+
+class Perfil:
+    __slots__ = ("nombre", "arraysize", "prefetchrows", "una")
+
+    def __init__(self, nombre: str, arraysize: int, prefetchrows: int, una: bool = False):
+        self.nombre = nombre
+        self.arraysize = arraysize
+        self.prefetchrows = prefetchrows
+        # Devuelve la fila (o None) con fetchone en lugar de la lista
+        self.una = una
+
+    # Viajes de un execute + fetch de filas: el execute trae hasta prefetchrows y cada fetch arraysize;
+    # si llegaron todas las que caben hace falta un viaje más para saber que no hay otra
+    def viajes(self, filas: int) -> int:
+        if self.una or filas < self.prefetchrows:
+            return 1
+        return 2 + (filas - self.prefetchrows) // self.arraysize
+
+
+# Búsqueda por clave: una fila o ninguna
+FILA = Perfil("fila", 1, 2, una=True)
+# Listados de un usuario (sus exámenes, notas, grupos): hasta 100 filas en el viaje del execute
+POCAS = Perfil("pocas", 100, 101)
+# Listados que crecen con el banco o la cantidad de estudiantes
+MUCHAS = Perfil("muchas", 1000, 1000)
+# Reportes completos de profesores
+REPORTE = Perfil("reporte", 5000, 5000)
+
+
+class Consulta:
+    def __init__(self, nombre: str, sql: str, perfil: Perfil):
+        self.nombre = nombre
+        self.sql = sql
+        self.perfil = perfil
+        self._lock = threading.Lock()
+        self.ejecuciones = 0
+        self.filas = 0
+        self.viajes = 0
+        self.viajes_medidos = 0
+        self.segundos = 0.0
+
+    def preparar(self, cursor):
+        cursor.arraysize = self.perfil.arraysize
+        cursor.prefetchrows = self.perfil.prefetchrows
+
+    # viajes: cuando el que ejecuta cambió el perfil del cursor (páginas de paginacion.py)
+    def contar(self, filas: int, segundos: float, viajes_medidos: int = 0, viajes: int = None):
+        with self._lock:
+            self.ejecuciones += 1
+            self.filas += filas
+            self.viajes += self.perfil.viajes(filas) if viajes is None else viajes
+            self.viajes_medidos += viajes_medidos
+            self.segundos += segundos
+
+    def _resultado(self, filas: list):
+        if self.perfil.una:
+            return filas[0] if filas else None
+        return filas
+
+    def ejecutar(self, connection, parametros: dict = None):
+        inicio = time.perf_counter()
+        with connection.cursor() as cursor:
+            antes = _viajes_sesion(cursor) if MEDIR_VIAJES else 0
+            self.preparar(cursor)
+            cursor.execute(self.sql, parametros or {})
+            if self.perfil.una:
+                fila = cursor.fetchone()
+                filas = [] if fila is None else [fila]
+            else:
+                filas = cursor.fetchall()
+            # Un viaje de la lectura de V$MYSTAT queda dentro de la diferencia
+            medidos = _viajes_sesion(cursor) - antes - 1 if MEDIR_VIAJES else 0
+        self.contar(len(filas), time.perf_counter() - inicio, medidos)
+        return self._resultado(filas)
+
+    async def ejecutar_async(self, connection, parametros: dict = None):
+        inicio = time.perf_counter()
+        with connection.cursor() as cursor:
+            self.preparar(cursor)
+            await cursor.execute(self.sql, parametros or {})
+            if self.perfil.una:
+                fila = await cursor.fetchone()
+                filas = [] if fila is None else [fila]
+            else:
+                filas = await cursor.fetchall()
+        self.contar(len(filas), time.perf_counter() - inicio)
+        return self._resultado(filas)
+
+    def estadisticas(self) -> dict:
+        with self._lock:
+            return {
+                "perfil": self.perfil.nombre,
+                "ejecuciones": self.ejecuciones,
+                "filas": self.filas,
+                "viajes": self.viajes,
+                "viajes_medidos": self.viajes_medidos if MEDIR_VIAJES else None,
+                "viajes_por_ejecucion": self.viajes / self.ejecuciones if self.ejecuciones else 0.0,
+                "ms_promedio": self.segundos * 1000 / self.ejecuciones if self.ejecuciones else 0.0,
+            }
+
+
+def _viajes_sesion(cursor) -> int:
+    cursor.execute(CONSULTA_VIAJES)
+    return cursor.fetchone()[0]
+
+
+_registro = {}
+
+
+def registrar(nombre: str, sql: str, perfil: Perfil) -> Consulta:
+    if nombre in _registro:
+        raise ValueError(f"La consulta {nombre} ya está registrada")
+    consulta = _registro[nombre] = Consulta(nombre, sql, perfil)
+    return consulta
+
+
+def registradas() -> dict:
+    return dict(_registro)
+
+
+# Cada consulta registrada ocupa un lugar en la cache de sentencias de cada sesión (DB_STMTCACHE)
+def revisar_cache_sentencias(tamano: int):
+    if len(_registro) > tamano:
+        logger.warning("Hay %d consultas registradas y DB_STMTCACHE es %d: se volverán a analizar en cada uso",
+                       len(_registro), tamano)
+
+
+def estadisticas() -> dict:
+    return {nombre: consulta.estadisticas() for nombre, consulta in sorted(_registro.items())}
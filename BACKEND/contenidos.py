@@ -0,0 +1,69 @@
+# Contenidos para estudiar de un estudiante (/contenidos-estudiante-notas y /mi-panel) como árbol
+# curso -> unidades -> contenidos, con los exámenes del estudiante en cada curso.
+# Antes era un JOIN de CURSO a ESTUDIANTE_GRUPO que devolvía una fila por contenido x examen x horario
+# x grupo; ahora los exámenes del estudiante solo filtran (EXISTS), cada contenido sale una vez y el
+# árbol se arma en una pasada sobre las filas ya ordenadas.
+
+# Exámenes de los grupos del estudiante (correlacionado con E.ID_EXAMEN)
+EXAMEN_DEL_ESTUDIANTE = """
+    SELECT 1
+    FROM EXAMEN_HORARIO EH
+    JOIN GRUPO_HORARIO GH ON GH.ID_HORARIO = EH.ID_HORARIO
+    JOIN ESTUDIANTE_GRUPO EG ON EG.ID_GRUPO = GH.ID_GRUPO
+    WHERE EH.ID_EXAMEN = E.ID_EXAMEN AND EG.ID_ESTUDIANTE = :p_id
+"""
+
+# Igual, con los grupos ya leídos (panel.py)
+EXAMEN_DE_LOS_GRUPOS = """
+    SELECT 1
+    FROM EXAMEN_HORARIO EH
+    JOIN GRUPO_HORARIO GH ON GH.ID_HORARIO = EH.ID_HORARIO
+    WHERE EH.ID_EXAMEN = E.ID_EXAMEN AND GH.ID_GRUPO IN (SELECT COLUMN_VALUE FROM TABLE(:grupos))
+"""
+
+
+def _consulta_contenidos(filtro: str) -> str:
+    return f"""
+    SELECT C.ID_CURSO, C.NOMBRE, UC.ID_UNIDAD, UC.NOMBRE, CU.ID_CONTENIDO, CU.DESCRIPCIÓN
+    FROM CURSO C
+    INNER JOIN UNIDAD_DE_CURSO UC ON UC.ID_CURSO = C.ID_CURSO
+    INNER JOIN CONTENIDO_DE_UNIDAD CU ON CU.ID_UNIDAD = UC.ID_UNIDAD
+    WHERE EXISTS (
+        SELECT 1 FROM EXAMEN E WHERE E.ID_CURSO = C.ID_CURSO AND EXISTS ({filtro})
+    )
+    ORDER BY C.ID_CURSO, UC.ID_UNIDAD, CU.ID_CONTENIDO
+"""
+
+
+def _consulta_examenes(filtro: str) -> str:
+    return f"""
+    SELECT E.ID_CURSO, E.ID_EXAMEN, E.NOMBRE
+    FROM EXAMEN E
+    WHERE EXISTS ({filtro})
+    ORDER BY E.ID_CURSO, E.ID_EXAMEN
+"""
+
+
+CONSULTA_CONTENIDOS = _consulta_contenidos(EXAMEN_DEL_ESTUDIANTE)
+CONSULTA_EXAMENES = _consulta_examenes(EXAMEN_DEL_ESTUDIANTE)
+CONSULTA_CONTENIDOS_GRUPOS = _consulta_contenidos(EXAMEN_DE_LOS_GRUPOS)
+CONSULTA_EXAMENES_GRUPOS = _consulta_examenes(EXAMEN_DE_LOS_GRUPOS)
+
+
+# Filas de CONSULTA_CONTENIDOS y CONSULTA_EXAMENES (ordenadas) -> árbol; solo entran los cursos con contenidos
+def armar_arbol(contenidos: list, examenes: list) -> list:
+    examenes_curso = {}
+    for id_curso, id_examen, nombre in examenes:
+        examenes_curso.setdefault(id_curso, []).append({"id_examen": id_examen, "nombre": nombre})
+    cursos = []
+    curso = unidad = None
+    for id_curso, nombre_curso, id_unidad, nombre_unidad, id_contenido, descripcion in contenidos:
+        if curso is None or curso["id_curso"] != id_curso:
+            curso = {"id_curso": id_curso, "curso": nombre_curso, "examenes": examenes_curso.get(id_curso, []), "unidades": []}
+            cursos.append(curso)
+            unidad = None
+        if unidad is None or unidad["id_unidad"] != id_unidad:
+            unidad = {"id_unidad": id_unidad, "unidad": nombre_unidad, "contenidos": []}
+            curso["unidades"].append(unidad)
+        unidad["contenidos"].append({"id_contenido": id_contenido, "contenido": descripcion})
+    return cursos
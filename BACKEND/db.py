@@ -0,0 +1,188 @@
+import os
+import threading
+from contextvars import ContextVar
+import oracledb
+from fastapi import HTTPException
+
+# Configuración de los pools de sesiones (se puede ajustar con variables de entorno)
+DB_USUARIO = os.getenv("DB_USUARIO", "BELSANTO")
+DB_CLAVE = os.getenv("DB_CLAVE", "12345")
+DB_DSN = os.getenv("DB_DSN", oracledb.makedsn("localhost", "1521", service_name="XE"))
+
+POOL_MIN = int(os.getenv("DB_POOL_MIN", "2"))
+POOL_MAX = int(os.getenv("DB_POOL_MAX", "20"))
+POOL_INCREMENTO = int(os.getenv("DB_POOL_INCREMENTO", "2"))
+# Milisegundos que una petición espera por una sesión libre antes de responder 503
+POOL_TIMEOUT_ADQUIRIR = int(os.getenv("DB_POOL_TIMEOUT_MS", "5000"))
+# Segundos de inactividad tras los cuales la sesión se verifica con un ping al entregarla (0 = siempre)
+POOL_PING_INTERVALO = int(os.getenv("DB_POOL_PING_S", "60"))
+# Sentencias preparadas que guarda cada sesión (las consultas registradas en consultas.py y las demás)
+CACHE_SENTENCIAS = int(os.getenv("DB_STMTCACHE", "60"))
+
+# Pool asíncrono para las rutas de estudiantes que más carga reciben durante un examen
+POOL_ASYNC_MIN = int(os.getenv("DB_POOL_ASYNC_MIN", "4"))
+POOL_ASYNC_MAX = int(os.getenv("DB_POOL_ASYNC_MAX", "40"))
+
+# El pool síncrono se abre en el startup de la app, o con la primera conexión que pida un script
+# (migraciones.py, ingesta.py --reproducir...): importar db no se conecta a Oracle
+pool = None
+_lock_pool = threading.Lock()
+
+
+def abrir_pool():
+    global pool
+    with _lock_pool:
+        if pool is None:
+            pool = oracledb.create_pool(
+                user=DB_USUARIO,
+                password=DB_CLAVE,
+                dsn=DB_DSN,
+                min=POOL_MIN,
+                max=POOL_MAX,
+                increment=POOL_INCREMENTO,
+                getmode=oracledb.POOL_GETMODE_TIMEDWAIT,
+                wait_timeout=POOL_TIMEOUT_ADQUIRIR,
+                ping_interval=POOL_PING_INTERVALO,
+                stmtcachesize=CACHE_SENTENCIAS,
+            )
+    return pool
+
+# El pool asíncrono necesita el event loop en marcha: se abre en el startup de la app
+pool_async = None
+
+
+async def abrir_pool_async():
+    global pool_async
+    pool_async = oracledb.create_pool_async(
+        user=DB_USUARIO,
+        password=DB_CLAVE,
+        dsn=DB_DSN,
+        min=POOL_ASYNC_MIN,
+        max=POOL_ASYNC_MAX,
+        increment=POOL_INCREMENTO,
+        getmode=oracledb.POOL_GETMODE_TIMEDWAIT,
+        wait_timeout=POOL_TIMEOUT_ADQUIRIR,
+        ping_interval=POOL_PING_INTERVALO,
+        stmtcachesize=CACHE_SENTENCIAS,
+    )
+
+# Conexión aparte (fuera de los pools) para recibir notificaciones de cambios de Oracle
+def conectar_eventos():
+    return oracledb.connect(user=DB_USUARIO, password=DB_CLAVE, dsn=DB_DSN, events=True)
+
+# Usuario de la petición (profesor:12, estudiante:5) o proceso (ingesta) que usa la conexión.
+# Se envía como CLIENT_IDENTIFIER de la sesión y los triggers de auditoría lo guardan en REGISTRO.ACTOR
+actor_actual = ContextVar("actor_actual", default=None)
+
+# Contadores de uso de los pools para dimensionarlos en los picos de exámenes
+_lock_estadisticas = threading.Lock()
+_estadisticas = {
+    "adquisiciones": 0,
+    "timeouts": 0,
+    "commits": 0,
+    "rollbacks": 0,
+    "max_ocupadas": 0,
+}
+_estadisticas_async = dict(_estadisticas)
+
+
+def _contar(clave: str, cantidad: int = 1, contadores: dict = _estadisticas):
+    with _lock_estadisticas:
+        contadores[clave] += cantidad
+
+
+def _registrar_adquisicion(pool_usado, contadores: dict):
+    with _lock_estadisticas:
+        contadores["adquisiciones"] += 1
+        contadores["max_ocupadas"] = max(contadores["max_ocupadas"], pool_usado.busy)
+
+
+def adquirir_conexion():
+    pool_usado = pool or abrir_pool()
+    try:
+        connection = pool_usado.acquire()
+    except oracledb.DatabaseError:
+        _contar("timeouts")
+        raise HTTPException(status_code=503, detail="No hay conexiones disponibles con la base de datos, intente de nuevo")
+    _registrar_adquisicion(pool_usado, _estadisticas)
+    # La sesión vuelve al pool con el identificador anterior: se reemplaza siempre (va en el próximo viaje)
+    connection.client_identifier = actor_actual.get() or ""
+    return connection
+
+
+def liberar_conexion(connection):
+    pool.release(connection)
+
+
+# Dependencia de FastAPI: una conexión por petición, con commit o rollback al terminar
+def get_connection():
+    connection = adquirir_conexion()
+    try:
+        yield connection
+        connection.commit()
+        _contar("commits")
+    except Exception:
+        connection.rollback()
+        _contar("rollbacks")
+        raise
+    finally:
+        liberar_conexion(connection)
+
+
+async def adquirir_conexion_async():
+    try:
+        connection = await pool_async.acquire()
+    except oracledb.DatabaseError:
+        _contar("timeouts", contadores=_estadisticas_async)
+        raise HTTPException(status_code=503, detail="No hay conexiones disponibles con la base de datos, intente de nuevo")
+    _registrar_adquisicion(pool_async, _estadisticas_async)
+    connection.client_identifier = actor_actual.get() or ""
+    return connection
+
+
+async def liberar_conexion_async(connection):
+    await pool_async.release(connection)
+
+
+# Igual que get_connection, pero sin ocupar un hilo del threadpool mientras se espera a Oracle
+async def get_async_connection():
+    connection = await adquirir_conexion_async()
+    try:
+        yield connection
+        await connection.commit()
+        _contar("commits", contadores=_estadisticas_async)
+    except Exception:
+        await connection.rollback()
+        _contar("rollbacks", contadores=_estadisticas_async)
+        raise
+    finally:
+        await liberar_conexion_async(connection)
+
+
+async def cerrar_pools():
+    if pool_async is not None:
+        await pool_async.close()
+    if pool is not None:
+        pool.close()
+
+
+def _resumen(pool_usado, contadores: dict):
+    with _lock_estadisticas:
+        copia = dict(contadores)
+    return {
+        "min": pool_usado.min,
+        "max": pool_usado.max,
+        "incremento": pool_usado.increment,
+        "abiertas": pool_usado.opened,
+        "ocupadas": pool_usado.busy,
+        **copia,
+    }
+
+
+def estadisticas_pool():
+    return {
+        "timeout_adquirir_ms": POOL_TIMEOUT_ADQUIRIR,
+        "ping_intervalo_s": POOL_PING_INTERVALO,
+        "sincrono": _resumen(pool, _estadisticas) if pool is not None else None,
+        "asincrono": _resumen(pool_async, _estadisticas_async) if pool_async is not None else None,
+    }
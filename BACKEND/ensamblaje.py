@@ -0,0 +1,67 @@
+import hashlib
+import os
+import numpy as np
+
+# Armado del examen de cada estudiante a partir de las preguntas del examen (EXAMEN_PREGUNTA) y,
+# si no alcanzan para CANTIDAD_DE_PREGUNTAS, del banco público (PRIVACIDAD = 0) de los mismos temas.
+# La semilla sale del examen y del estudiante, así el mismo estudiante recibe siempre las mismas
+# preguntas (mientras no cambien las del examen ni el banco) sin guardar su selección.
+
+ALEATORIO = "Aleatorio"
+
+# Se mezcla en la semilla para que no se pueda calcular la selección de otro estudiante
+SEMILLA = os.getenv("ENSAMBLAJE_SEMILLA", "")
+
+
+# Sin el secreto la semilla sale solo de los IDs y cualquiera puede calcular la selección de otro
+# estudiante: el servidor no arranca (main.py lo comprueba al iniciar) ni arma exámenes sin él
+def comprobar_semilla():
+    if not SEMILLA:
+        raise RuntimeError(
+            "Falta ENSAMBLAJE_SEMILLA: un secreto aleatorio, el mismo en todos los workers "
+            "(por ejemplo python -c \"import secrets; print(secrets.token_hex(32))\")"
+        )
+
+
+def generador(id_examen: int, id_estudiante: int) -> np.random.Generator:
+    comprobar_semilla()
+    digest = hashlib.sha256(f"{SEMILLA}:{id_examen}:{id_estudiante}".encode()).digest()
+    return np.random.default_rng(int.from_bytes(digest[:16], "big"))
+
+
+# k IDs distintos de la unión de los arreglos (uno por tema) sin concatenarlos: se eligen k posiciones
+# de 0 a total - 1 con el algoritmo de Floyd (O(k)) y se ubica el tema de cada una con searchsorted
+def muestrear(azar: np.random.Generator, arreglos: list, k: int) -> np.ndarray:
+    tamanos = np.array([len(a) for a in arreglos], dtype=np.int64)
+    fines = np.cumsum(tamanos)
+    total = int(fines[-1]) if len(fines) else 0
+    k = min(k, total)
+    if k <= 0:
+        return np.empty(0, dtype=np.int64)
+    if 2 * k > total:
+        posiciones = azar.permutation(total)[:k]
+    else:
+        elegidas, vistas = [], set()
+        for j, u in zip(range(total - k, total), azar.random(k)):
+            t = int(u * (j + 1))
+            t = j if t in vistas else t
+            vistas.add(t)
+            elegidas.append(t)
+        posiciones = np.array(elegidas, dtype=np.int64)
+    temas = np.searchsorted(fines, posiciones, side="right")
+    locales = posiciones - (fines[temas] - tamanos[temas])
+    return np.array([arreglos[t][i] for t, i in zip(temas, locales)], dtype=np.int64)
+
+
+# IDs de las preguntas del estudiante, en el orden en que se le muestran
+def armar(id_examen: int, id_estudiante: int, propias: np.ndarray, banco: list, cantidad, orden) -> np.ndarray:
+    azar = generador(id_examen, id_estudiante)
+    if cantidad is None or cantidad <= 0:
+        cantidad = len(propias)
+    if cantidad <= len(propias):
+        elegidas = muestrear(azar, [propias], cantidad)
+    else:
+        elegidas = np.concatenate([propias, muestrear(azar, banco, cantidad - len(propias))])
+    if orden == ALEATORIO:
+        return elegidas[azar.permutation(len(elegidas))]
+    return np.sort(elegidas)
@@ -0,0 +1,167 @@
+import csv
+import io
+import os
+import tempfile
+from functools import partial
+from fastapi import HTTPException
+from starlette.background import BackgroundTask
+from starlette.responses import FileResponse
+from db import adquirir_conexion, liberar_conexion
+from periodos import TODOS, filtro_semestre
+from serializacion import RespuestaStream
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # pip install pyarrow para exportar en Parquet
+    pa = None
+
+# Exportación de notas (PRESENTACION_EXAMEN con su estudiante, grupo y examen) en CSV o Parquet.
+# Las filas se leen del cursor por bloques de ARRAYSIZE y se escriben bloque a bloque,
+# así la memoria no depende del tamaño del semestre exportado.
+
+ARRAYSIZE = 5000
+
+COLUMNAS = [
+    "ID_GRUPO", "GRUPO", "ID_ESTUDIANTE", "ESTUDIANTE", "ID_EXAMEN", "EXAMEN", "ID_CURSO",
+    "ID_PRESENTACION_EXAMEN", "FECHA_PRESENTACION", "PUNTAJE", "TIEMPO_TOMADO",
+]
+
+# Mismos joins que /reporte/examenes-grupo-especifico
+CONSULTA = """
+    SELECT g.ID_Grupo,
+        g.Nombre,
+        e.ID_Estudiante,
+        e.Nombre,
+        ex.ID_Examen,
+        ex.Nombre,
+        ex.ID_Curso,
+        pe.ID_Presentacion_Examen,
+        pe.Fecha_Presentacion,
+        pe.Puntaje,
+        pe.Tiempo_Tomado
+    FROM Estudiante_Grupo eg
+    JOIN Estudiante e ON eg.ID_Estudiante = e.ID_Estudiante
+    JOIN Grupo g ON eg.ID_Grupo = g.ID_Grupo
+    JOIN Presentacion_Examen pe ON e.ID_Estudiante = pe.ID_Estudiante
+    JOIN Examen ex ON pe.ID_Examen = ex.ID_Examen
+"""
+
+
+def _esquema():
+    return pa.schema([
+        ("ID_GRUPO", pa.int64()),
+        ("GRUPO", pa.string()),
+        ("ID_ESTUDIANTE", pa.int64()),
+        ("ESTUDIANTE", pa.string()),
+        ("ID_EXAMEN", pa.int64()),
+        ("EXAMEN", pa.string()),
+        ("ID_CURSO", pa.int64()),
+        ("ID_PRESENTACION_EXAMEN", pa.int64()),
+        ("FECHA_PRESENTACION", pa.timestamp("s")),
+        ("PUNTAJE", pa.float64()),
+        ("TIEMPO_TOMADO", pa.duration("us")),
+    ])
+
+
+def consulta_filtrada(semestre: str = None, grupo: int = None, curso: int = None):
+    condiciones, params = [], {}
+    if semestre is not None and semestre != TODOS:
+        # El semestre de un examen es el de los horarios en que está programado;
+        # el rango de fechas limita la lectura a la partición de ese semestre
+        condiciones.append("""EXISTS (
+            SELECT 1 FROM EXAMEN_HORARIO eh JOIN HORARIO h ON h.ID_HORARIO = eh.ID_HORARIO
+            WHERE eh.ID_EXAMEN = ex.ID_Examen AND h.SEMESTRE = :semestre)""")
+        params["semestre"] = semestre
+        rango, fechas = filtro_semestre("pe.Fecha_Presentacion", semestre)
+        condiciones.append(rango)
+        params.update(fechas)
+    if grupo is not None:
+        condiciones.append("g.ID_Grupo = :grupo")
+        params["grupo"] = grupo
+    if curso is not None:
+        condiciones.append("ex.ID_Curso = :curso")
+        params["curso"] = curso
+    sql = CONSULTA
+    if condiciones:
+        sql += " WHERE " + " AND ".join(condiciones)
+    return sql + " ORDER BY g.ID_Grupo, e.ID_Estudiante, pe.Fecha_Presentacion", params
+
+
+def leer_lotes(connection, sql: str, params: dict):
+    with connection.cursor() as cursor:
+        cursor.arraysize = ARRAYSIZE
+        cursor.prefetchrows = ARRAYSIZE
+        cursor.execute(sql, params)
+        while True:
+            filas = cursor.fetchmany()
+            if not filas:
+                break
+            yield filas
+
+
+def escribir_csv(lotes):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(COLUMNAS)
+    for filas in lotes:
+        writer.writerows(filas)
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue()
+
+
+# Cada bloque del cursor se convierte en un RecordBatch y se agrega al archivo; devuelve las filas escritas
+def escribir_parquet(lotes, destino) -> int:
+    esquema = _esquema()
+    total = 0
+    with pq.ParquetWriter(destino, esquema, compression="zstd") as writer:
+        for filas in lotes:
+            columnas = list(zip(*filas))
+            batch = pa.RecordBatch.from_arrays(
+                [pa.array(valores, type=campo.type) for valores, campo in zip(columnas, esquema)],
+                schema=esquema,
+            )
+            writer.write_batch(batch)
+            total += len(filas)
+    return total
+
+
+# Cierra el cursor de leer_lotes antes de que RespuestaStream devuelva la conexión
+def _csv(connection, sql, params):
+    lotes = leer_lotes(connection, sql, params)
+    try:
+        yield from escribir_csv(lotes)
+    finally:
+        lotes.close()
+
+
+def exportar(formato: str, semestre: str = None, grupo: int = None, curso: int = None):
+    sql, params = consulta_filtrada(semestre, grupo, curso)
+    if formato == "csv":
+        connection = adquirir_conexion()
+        return RespuestaStream(
+            _csv(connection, sql, params),
+            partial(liberar_conexion, connection),
+            media_type="text/csv",
+            headers={"Content-Disposition": 'attachment; filename="notas.csv"'},
+        )
+    if formato == "parquet":
+        if pa is None:
+            raise HTTPException(status_code=501, detail="La exportación Parquet requiere pyarrow")
+        # Parquet escribe su índice al final: se arma en un archivo temporal y luego se envía
+        descriptor, ruta = tempfile.mkstemp(suffix=".parquet")
+        os.close(descriptor)
+        connection = adquirir_conexion()
+        try:
+            escribir_parquet(leer_lotes(connection, sql, params), ruta)
+        except Exception:
+            os.remove(ruta)
+            raise
+        finally:
+            liberar_conexion(connection)
+        return FileResponse(ruta, media_type="application/vnd.apache.parquet", filename="notas.parquet",
+                            background=BackgroundTask(os.remove, ruta))
+    raise HTTPException(status_code=400, detail="formato debe ser csv o parquet")
@@ -0,0 +1,217 @@
+import os
+import threading
+import time
+from bisect import bisect_left, bisect_right
+
+# Horarios de un semestre en memoria: la grilla semanal (/horarios, /estudiante_horarios) y los cruces
+# de exámenes. Cada examen ocupa en su horario el intervalo [HORA, HORA + TIEMPO_LIMITE) y los
+# intervalos se guardan por (semana, día) ordenados por inicio: los que se cruzan con uno nuevo se
+# buscan con bisect entre inicio - duración máxima del día y fin, sin recorrer el semestre.
+# Un examen en el horario X lo presentan los grupos de X (GRUPO_HORARIO); hay cruce con otro examen
+# si comparten grupo o algún estudiante está en grupos de los dos.
+# Se invalida al crear exámenes o cambiar los estudiantes de un grupo; el vencimiento
+# (HORARIOS_TTL_S) acota lo que tarda otro worker de uvicorn en ver el cambio.
+
+TTL_S = float(os.getenv("HORARIOS_TTL_S", "60"))
+# Duración de los exámenes sin TIEMPO_LIMITE
+DURACION_MIN = int(os.getenv("HORARIOS_DURACION_EXAMEN_MIN", "60"))
+
+CONSULTA_HORARIOS = """
+    SELECT H.ID_HORARIO, H.DIA, H.HORA, H.SEMANA, H.SEMESTRE, H.INDICE_DIA
+    FROM HORARIO H
+    WHERE H.SEMESTRE = :semestre
+"""
+
+CONSULTA_GRUPOS = """
+    SELECT GH.ID_HORARIO, GH.ID_GRUPO
+    FROM GRUPO_HORARIO GH
+    JOIN HORARIO H ON H.ID_HORARIO = GH.ID_HORARIO
+    WHERE H.SEMESTRE = :semestre
+"""
+
+CONSULTA_EXAMENES = """
+    SELECT EH.ID_HORARIO, EH.ID_EXAMEN, E.TIEMPO_LIMITE
+    FROM EXAMEN_HORARIO EH
+    JOIN HORARIO H ON H.ID_HORARIO = EH.ID_HORARIO
+    JOIN EXAMEN E ON E.ID_EXAMEN = EH.ID_EXAMEN
+    WHERE H.SEMESTRE = :semestre
+"""
+
+CONSULTA_ESTUDIANTES = """
+    SELECT EG.ID_GRUPO, EG.ID_ESTUDIANTE
+    FROM ESTUDIANTE_GRUPO EG
+    WHERE EG.ID_GRUPO IN (
+        SELECT GH.ID_GRUPO
+        FROM GRUPO_HORARIO GH
+        JOIN HORARIO H ON H.ID_HORARIO = GH.ID_HORARIO
+        WHERE H.SEMESTRE = :semestre
+    )
+"""
+
+CONSULTA_SEMESTRE = "SELECT SEMESTRE FROM HORARIO WHERE ID_HORARIO = :id_horario"
+
+
+# "08:00" -> 480; None si HORA no tiene ese formato (solo se cruza con su mismo horario)
+def minutos(hora):
+    try:
+        horas, minutos_ = hora.split(":")[:2]
+        return int(horas) * 60 + int(minutos_)
+    except (AttributeError, ValueError):
+        return None
+
+
+class HorariosSemestre:
+    def __init__(self, semestre: str, horarios: list, grupos: list, examenes: list, estudiantes: list, vence: float):
+        self.semestre = semestre
+        self.vence = vence
+        self.horarios = {fila[0]: fila for fila in horarios}
+        self.por_semana = {}
+        for fila in sorted(horarios, key=lambda f: (f[5], f[2] or "")):
+            self.por_semana.setdefault(fila[3], []).append(fila)
+        self.grupos_horario = {}
+        for id_horario, id_grupo in grupos:
+            self.grupos_horario.setdefault(id_horario, set()).add(id_grupo)
+        self.estudiantes_grupo = {}
+        for id_grupo, id_estudiante in estudiantes:
+            self.estudiantes_grupo.setdefault(id_grupo, set()).add(id_estudiante)
+        self.examenes_horario = {}
+        # (semana, indice_dia) -> [inicios ordenados], [(inicio, fin, id_examen, id_horario)], duración máxima
+        self.intervalos = {}
+        for id_horario, id_examen, tiempo_limite in examenes:
+            self.examenes_horario.setdefault(id_horario, []).append(id_examen)
+            fila = self.horarios.get(id_horario)
+            inicio = minutos(fila[2])
+            if inicio is not None:
+                fin = inicio + (tiempo_limite or DURACION_MIN)
+                self.intervalos.setdefault((fila[3], fila[5]), []).append((inicio, fin, id_examen, id_horario))
+        for clave, lista in self.intervalos.items():
+            lista.sort()
+            self.intervalos[clave] = ([i[0] for i in lista], lista, max(i[1] - i[0] for i in lista))
+
+    # Filas de /horarios: (..., GRUPO_ASOCIADO, EXAMEN_ASOCIADO)
+    def grilla(self, semana) -> list:
+        return [
+            (*fila, "SI" if fila[0] in self.grupos_horario else "NO", "SI" if fila[0] in self.examenes_horario else "NO")
+            for fila in self.por_semana.get(semana, ())
+        ]
+
+    # Filas de /estudiante_horarios: los horarios de la semana de los grupos del estudiante
+    def grilla_estudiante(self, semana, id_estudiante: int) -> list:
+        return [
+            (*fila, "SI") for fila in self.por_semana.get(semana, ())
+            if any(id_estudiante in self.estudiantes_grupo.get(g, ()) for g in self.grupos_horario.get(fila[0], ()))
+        ]
+
+    # Exámenes (id_examen, id_horario) que se cruzan con [HORA de id_horario, + duracion)
+    def examenes_cruzados(self, id_horario: int, duracion: int, excluir=None) -> list:
+        fila = self.horarios[id_horario]
+        cruzados = [(e, id_horario) for e in self.examenes_horario.get(id_horario, ()) if e != excluir]
+        inicio = minutos(fila[2])
+        dia = self.intervalos.get((fila[3], fila[5]))
+        if inicio is None or dia is None:
+            return cruzados
+        inicios, intervalos, maxima = dia
+        fin = inicio + (duracion or DURACION_MIN)
+        for desde, hasta, id_examen, otro in intervalos[bisect_left(inicios, inicio - maxima):bisect_right(inicios, fin - 1)]:
+            if hasta > inicio and otro != id_horario and id_examen != excluir:
+                cruzados.append((id_examen, otro))
+        return cruzados
+
+    # Grupos y estudiantes que tendrían dos exámenes a la vez si un examen de duracion minutos va en id_horario
+    def conflictos(self, id_horario: int, duracion: int, excluir=None) -> dict:
+        grupos = self.grupos_horario.get(id_horario, set())
+        estudiantes = set().union(*(self.estudiantes_grupo.get(g, ()) for g in grupos))
+        examenes, grupos_cruzados, estudiantes_cruzados = [], set(), set()
+        for id_examen, otro in self.examenes_cruzados(id_horario, duracion, excluir):
+            otros_grupos = self.grupos_horario.get(otro, set())
+            comunes = grupos & otros_grupos
+            afectados = estudiantes & set().union(*(self.estudiantes_grupo.get(g, ()) for g in otros_grupos))
+            if comunes or afectados:
+                examenes.append({"id_examen": id_examen, "id_horario": otro})
+                grupos_cruzados |= comunes
+                estudiantes_cruzados |= afectados
+        return {
+            "examenes": examenes,
+            "grupos": sorted(grupos_cruzados),
+            "estudiantes": sorted(estudiantes_cruzados),
+        }
+
+
+class CacheHorarios:
+    def __init__(self, ttl_s: float):
+        self._ttl_s = ttl_s
+        self._semestres = {}
+        self._lock = threading.Lock()
+        # Una lectura por semestre a la vez; las demás peticiones esperan esa misma
+        self._cargando = {}
+        self._generacion = 0
+        self.aciertos = 0
+        self.fallos = 0
+        self.lecturas = 0
+
+    def _leer(self, connection, semestre: str) -> HorariosSemestre:
+        generacion = self._generacion
+        with connection.cursor() as cursor:
+            cursor.execute(CONSULTA_HORARIOS, semestre=semestre)
+            horarios = cursor.fetchall()
+            cursor.execute(CONSULTA_GRUPOS, semestre=semestre)
+            grupos = cursor.fetchall()
+            cursor.execute(CONSULTA_EXAMENES, semestre=semestre)
+            examenes = cursor.fetchall()
+            cursor.arraysize = 5000
+            cursor.execute(CONSULTA_ESTUDIANTES, semestre=semestre)
+            estudiantes = cursor.fetchall()
+        entrada = HorariosSemestre(semestre, horarios, grupos, examenes, estudiantes, time.monotonic() + self._ttl_s)
+        with self._lock:
+            self.lecturas += 1
+            if generacion == self._generacion:
+                self._semestres[semestre] = entrada
+        return entrada
+
+    def obtener(self, semestre: str):
+        with self._lock:
+            entrada = self._semestres.get(semestre)
+            if entrada is not None and entrada.vence > time.monotonic():
+                self.aciertos += 1
+                return entrada
+            self.fallos += 1
+            return None
+
+    # Lee el semestre de Oracle; refrescar=False devuelve lo que haya leído otra petición mientras esperaba
+    def cargar(self, connection, semestre: str, refrescar: bool = False) -> HorariosSemestre:
+        with self._lock:
+            anterior = self._semestres.get(semestre)
+            cargando = self._cargando.setdefault(semestre, threading.Lock())
+        with cargando:
+            if not refrescar:
+                with self._lock:
+                    actual = self._semestres.get(semestre)
+                if actual is not None and actual is not anterior and actual.vence > time.monotonic():
+                    return actual
+            return self._leer(connection, semestre)
+
+    def semestre_de(self, connection, id_horario: int):
+        with connection.cursor() as cursor:
+            cursor.execute(CONSULTA_SEMESTRE, id_horario=id_horario)
+            fila = cursor.fetchone()
+        return None if fila is None else fila[0]
+
+    def invalidar(self, semestre: str = None):
+        with self._lock:
+            self._generacion += 1
+            if semestre is None:
+                self._semestres.clear()
+            else:
+                self._semestres.pop(semestre, None)
+
+    def estadisticas(self):
+        with self._lock:
+            return {
+                "semestres": len(self._semestres),
+                "aciertos": self.aciertos,
+                "fallos": self.fallos,
+                "lecturas": self.lecturas,
+            }
+
+
+cache_horarios = CacheHorarios(TTL_S)
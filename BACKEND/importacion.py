@@ -0,0 +1,160 @@
+import codecs
+import csv
+import json
+import oracledb
+from fastapi import HTTPException
+
+# Importación masiva de preguntas (CSV o JSON Lines) leyendo el cuerpo de la petición por partes.
+# Las filas se agrupan en lotes: los IDs se piden a la secuencia en bloque y PREGUNTA y
+# EXAMEN_PREGUNTA se insertan con executemany, reportando los errores fila por fila.
+
+TAMANO_LOTE = 2000
+
+SIGUIENTES_IDS = "SELECT secuencia_examen.NEXTVAL FROM DUAL CONNECT BY LEVEL <= :n"
+
+INSERTAR_PREGUNTA = """
+    INSERT INTO PREGUNTA (ID_PREGUNTA, TEXTO, OPCIONES, RESPUESTAS_CORRECTAS, ID_TIPO, TEMA, PRIVACIDAD, ID_PROFESOR)
+    VALUES (:1, :2, :3, :4, :5, :6, :7, :8)
+"""
+
+INSERTAR_EXAMEN_PREGUNTA = "INSERT INTO EXAMEN_PREGUNTA (ID_EXAMEN, ID_PREGUNTA) VALUES (:1, :2)"
+
+
+# Convierte los bloques de bytes del cuerpo en líneas de texto sin cargarlo completo.
+# Un byte que no es UTF-8 responde 400 con su posición (lo ya insertado se deshace con la petición)
+async def _lineas(stream):
+    decodificador = codecs.getincrementaldecoder("utf-8")()
+    pendiente = ""
+    leidos = lineas = 0
+    async for bloque in stream:
+        pendiente += _decodificar(decodificador, bloque, leidos, lineas + pendiente.count("\n"))
+        leidos += len(bloque)
+        *completas, pendiente = pendiente.split("\n")
+        lineas += len(completas)
+        for linea in completas:
+            yield linea
+    pendiente += _decodificar(decodificador, b"", leidos, lineas + pendiente.count("\n"), final=True)
+    if pendiente:
+        yield pendiente
+
+
+def _decodificar(decodificador, bloque: bytes, leidos: int, lineas: int, final: bool = False) -> str:
+    # Bytes de un carácter incompleto que quedaron del bloque anterior
+    arrastrados = len(decodificador.getstate()[0])
+    try:
+        return decodificador.decode(bloque, final=final)
+    except UnicodeDecodeError as error:
+        posicion = leidos - arrastrados + error.start
+        linea = lineas + error.object[:error.start].count(b"\n") + 1
+        raise HTTPException(
+            status_code=400,
+            detail=f"El archivo no está en UTF-8: byte inválido en la posición {posicion} (línea {linea})",
+        )
+
+
+# Registros CSV (un campo entre comillas puede ocupar varias líneas) como diccionarios
+async def _registros_csv(stream):
+    encabezado = None
+    registro, numero, inicio = "", 0, 0
+    async for linea in _lineas(stream):
+        numero += 1
+        if not registro:
+            inicio = numero
+        registro = f"{registro}\n{linea}" if registro else linea
+        # Con comillas impares el registro sigue en la siguiente línea
+        if registro.count('"') % 2:
+            continue
+        valores = next(csv.reader([registro]))
+        registro = ""
+        if not any(v.strip() for v in valores):
+            continue
+        if encabezado is None:
+            encabezado = [v.strip().lower() for v in valores]
+            continue
+        if len(valores) != len(encabezado):
+            yield inicio, None, f"Se esperaban {len(encabezado)} columnas y hay {len(valores)}"
+        else:
+            yield inicio, dict(zip(encabezado, valores)), None
+    if registro:
+        yield inicio, None, "Comillas sin cerrar al final del archivo"
+
+
+async def _registros_jsonl(stream):
+    numero = 0
+    async for linea in _lineas(stream):
+        numero += 1
+        if not linea.strip():
+            continue
+        try:
+            fila = json.loads(linea)
+        except json.JSONDecodeError as error:
+            yield numero, None, f"JSON inválido: {error.msg}"
+            continue
+        if not isinstance(fila, dict):
+            yield numero, None, "Cada línea debe ser un objeto JSON"
+        else:
+            yield numero, fila, None
+
+
+# Valida una fila y la deja en el orden de INSERTAR_PREGUNTA (sin el ID ni el profesor)
+def _validar(fila: dict):
+    texto = str(fila.get("texto") or "").strip()
+    if not texto:
+        raise ValueError("El texto de la pregunta es obligatorio")
+    try:
+        id_tipo = int(fila.get("id_tipo"))
+    except (TypeError, ValueError):
+        raise ValueError("id_tipo debe ser un número")
+    if id_tipo not in (1, 2, 3, 4, 5):
+        raise ValueError("id_tipo debe estar entre 1 y 5")
+    try:
+        privacidad = int(fila.get("privacidad") or 0)
+    except (TypeError, ValueError):
+        privacidad = None
+    if privacidad not in (0, 1):
+        raise ValueError("privacidad debe ser 0 (pública) o 1 (privada)")
+    tema = str(fila.get("tema") or "").strip() or "No definido"
+    return (texto, fila.get("opciones"), fila.get("respuestas_correctas"), id_tipo, tema, privacidad)
+
+
+async def _insertar_lote(connection: oracledb.AsyncConnection, id_examen: int, id_profesor: int, lote: list, errores: list) -> int:
+    with connection.cursor() as cursor:
+        await cursor.execute(SIGUIENTES_IDS, n=len(lote))
+        ids = [fila[0] for fila in await cursor.fetchall()]
+
+        await cursor.executemany(
+            INSERTAR_PREGUNTA,
+            [(id_pregunta, *valores, id_profesor) for id_pregunta, (_, valores) in zip(ids, lote)],
+            batcherrors=True,
+        )
+        fallidas = set()
+        for error in cursor.getbatcherrors():
+            fallidas.add(error.offset)
+            errores.append({"fila": lote[error.offset][0], "error": error.message})
+
+        enlaces = [(id_examen, ids[i]) for i in range(len(lote)) if i not in fallidas]
+        if enlaces:
+            await cursor.executemany(INSERTAR_EXAMEN_PREGUNTA, enlaces)
+        return len(enlaces)
+
+
+# id_profesor: quien importa queda como dueño de las preguntas
+async def importar_preguntas(connection: oracledb.AsyncConnection, stream, formato: str, id_examen: int, id_profesor: int) -> dict:
+    registros = _registros_csv(stream) if formato == "csv" else _registros_jsonl(stream)
+    errores, lote = [], []
+    insertadas = 0
+    async for numero, fila, error in registros:
+        if error is None:
+            try:
+                lote.append((numero, _validar(fila)))
+            except ValueError as invalida:
+                error = str(invalida)
+        if error is not None:
+            errores.append({"fila": numero, "error": error})
+        if len(lote) >= TAMANO_LOTE:
+            insertadas += await _insertar_lote(connection, id_examen, id_profesor, lote, errores)
+            lote = []
+    if lote:
+        insertadas += await _insertar_lote(connection, id_examen, id_profesor, lote, errores)
+    errores.sort(key=lambda e: e["fila"])
+    return {"insertadas": insertadas, "con_error": len(errores), "errores": errores}
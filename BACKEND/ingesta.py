@@ -0,0 +1,375 @@
+import argparse
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import queue
+import sqlite3
+import threading
+import time
+from datetime import datetime, timedelta
+import oracledb
+from calificacion import calificar_pendientes
+from preguntas import cache_preguntas
+
+# Ingesta de presentaciones de examen con diario local y escritura diferida.
+# Al terminar un examen todos los estudiantes envían casi a la vez: la petición solo agrega la
+# presentación al diario (SQLite en modo WAL, con fsync) y responde. Un hilo despachador toma las
+# pendientes por lotes y las guarda en Oracle con executemany y un solo commit por lote.
+# La clave de idempotencia evita guardar dos veces un envío repetido o reprocesado tras una caída.
+# Las que traen respuestas dadas y no traen puntaje se califican por examen al guardar el lote.
+#
+#   python ingesta.py --estado       cantidad de presentaciones por estado en el diario
+#   python ingesta.py --reproducir   guarda en Oracle todas las pendientes (recuperación tras una caída)
+
+logger = logging.getLogger("uvicorn.error")
+
+PENDIENTE, GUARDADA, ERROR = 0, 1, 2
+NOMBRES_ESTADO = {PENDIENTE: "pendiente", GUARDADA: "guardada", ERROR: "error"}
+
+# Presentaciones que el hilo escritor agrega al diario en una sola transacción
+TAMANO_GRUPO_DIARIO = 500
+# Presentaciones por executemany en Oracle
+TAMANO_LOTE = int(os.getenv("INGESTA_TAMANO_LOTE", "500"))
+# Espera del despachador cuando no hay pendientes
+INTERVALO_S = float(os.getenv("INGESTA_INTERVALO_MS", "50")) / 1000
+# Un lote reclamado que no se marcó en este tiempo (worker caído) vuelve a estar disponible
+RECLAMO_VENCE_S = 60
+# Las guardadas se conservan este tiempo para responder a reintentos con la misma clave
+RETENCION_S = 7 * 24 * 3600
+# Un lote que falla por algo que no es de Oracle (datos que rompen la calificación, por ejemplo) se
+# reintenta hasta este número de veces y después queda en error (python ingesta.py --reintentar-errores)
+MAX_INTENTOS = int(os.getenv("INGESTA_MAX_INTENTOS", "3"))
+
+SIGUIENTES_IDS = "SELECT secuencia_presentacion.NEXTVAL FROM DUAL CONNECT BY LEVEL <= :n"
+
+INSERTAR_PRESENTACION = """
+    INSERT INTO PRESENTACION_EXAMEN (ID_PRESENTACION_EXAMEN, ID_ESTUDIANTE, ID_EXAMEN, FECHA_PRESENTACION,
+        PUNTAJE, TIEMPO_TOMADO, DIRECCION_IP, RESPUESTAS, CLAVE_IDEMPOTENCIA, RESPUESTAS_DADAS)
+    VALUES (:1, :2, :3, :4, :5, :6, :7, :8, :9, :10)
+"""
+
+ID_POR_CLAVE = """
+    SELECT CLAVE_IDEMPOTENCIA, ID_PRESENTACION_EXAMEN
+    FROM PRESENTACION_EXAMEN
+    WHERE CLAVE_IDEMPOTENCIA IN (SELECT COLUMN_VALUE FROM TABLE(:claves))
+"""
+
+# ORA-00001: la clave de idempotencia ya está en PRESENTACION_EXAMEN
+CODIGO_DUPLICADO = 1
+
+
+# Sin Idempotency-Key del cliente, un reintento del mismo envío produce la misma clave.
+# La del cliente también se combina con el estudiante y el examen: dos estudiantes que envían la misma
+# no comparten presentación ni pueden consultar la del otro.
+def clave_idempotencia(id_estudiante: int, id_examen: int, fecha_presentacion: str, clave_cliente: str = None) -> str:
+    if clave_cliente:
+        return hashlib.sha256(f"{id_estudiante}|{id_examen}|clave|{clave_cliente}".encode()).hexdigest()
+    return hashlib.sha256(f"{id_estudiante}|{id_examen}|{fecha_presentacion}".encode()).hexdigest()
+
+
+# "HH:MM:SS" o segundos
+def leer_tiempo_tomado(valor: str) -> timedelta:
+    if ":" in valor:
+        horas, minutos, segundos = valor.split(":")
+        return timedelta(hours=int(horas), minutes=int(minutos), seconds=float(segundos))
+    return timedelta(seconds=float(valor))
+
+
+class DiarioPresentaciones:
+    def __init__(self, ruta: str):
+        self._ruta = ruta
+        self._local = threading.local()
+        with self._conexion() as con:
+            con.execute("""
+                CREATE TABLE IF NOT EXISTS presentaciones (
+                    clave TEXT PRIMARY KEY,
+                    datos TEXT NOT NULL,
+                    estado INTEGER NOT NULL DEFAULT 0,
+                    id_presentacion INTEGER,
+                    error TEXT,
+                    recibida REAL NOT NULL,
+                    reclamada REAL,
+                    intentos INTEGER NOT NULL DEFAULT 0
+                ) WITHOUT ROWID
+            """)
+            # Diarios creados antes de contar los intentos
+            if "intentos" not in {fila[1] for fila in con.execute("PRAGMA table_info(presentaciones)")}:
+                con.execute("ALTER TABLE presentaciones ADD COLUMN intentos INTEGER NOT NULL DEFAULT 0")
+            con.execute("CREATE INDEX IF NOT EXISTS presentaciones_estado ON presentaciones (estado, recibida)")
+        self._cola = queue.Queue()
+        threading.Thread(target=self._escribir, name="diario-presentaciones", daemon=True).start()
+
+    def _conexion(self) -> sqlite3.Connection:
+        con = getattr(self._local, "con", None)
+        if con is None:
+            con = sqlite3.connect(self._ruta, timeout=30)
+            con.execute("PRAGMA journal_mode=WAL")
+            # FULL: la presentación está en disco antes de responder al estudiante
+            con.execute("PRAGMA synchronous=FULL")
+            self._local.con = con
+        return con
+
+    # Agrega la presentación y devuelve su estado; si la clave ya existía devuelve el estado guardado
+    async def registrar(self, clave: str, datos: dict) -> dict:
+        loop = asyncio.get_running_loop()
+        futuro = loop.create_future()
+        self._cola.put((clave, json.dumps(datos), loop, futuro))
+        return await futuro
+
+    def registrar_sincrono(self, clave: str, datos: dict) -> dict:
+        return self._agregar(self._conexion(), [(clave, json.dumps(datos))])[0]
+
+    # Hilo escritor: junta las presentaciones que llegan a la vez en una transacción (un fsync por grupo)
+    def _escribir(self):
+        con = self._conexion()
+        while True:
+            grupo = [self._cola.get()]
+            while len(grupo) < TAMANO_GRUPO_DIARIO:
+                try:
+                    grupo.append(self._cola.get_nowait())
+                except queue.Empty:
+                    break
+            try:
+                resultados = self._agregar(con, [(clave, datos) for clave, datos, _, _ in grupo])
+            except Exception as error:
+                for _, _, loop, futuro in grupo:
+                    loop.call_soon_threadsafe(_rechazar, futuro, error)
+                continue
+            for (_, _, loop, futuro), resultado in zip(grupo, resultados):
+                loop.call_soon_threadsafe(_resolver, futuro, resultado)
+
+    def _agregar(self, con: sqlite3.Connection, filas: list) -> list:
+        ahora = time.time()
+        resultados = []
+        with con:
+            for clave, datos in filas:
+                insertada = con.execute(
+                    "INSERT OR IGNORE INTO presentaciones (clave, datos, recibida) VALUES (?, ?, ?)", (clave, datos, ahora)
+                ).rowcount
+                if insertada:
+                    resultados.append({"clave": clave, "estado": "pendiente", "id_presentacion_examen": None, "repetida": False})
+                else:
+                    resultados.append({**self._estado(con, clave), "repetida": True})
+        return resultados
+
+    def _estado(self, con: sqlite3.Connection, clave: str):
+        fila = con.execute("SELECT estado, id_presentacion, error FROM presentaciones WHERE clave = ?", (clave,)).fetchone()
+        if fila is None:
+            return None
+        estado, id_presentacion, error = fila
+        resultado = {"clave": clave, "estado": NOMBRES_ESTADO[estado], "id_presentacion_examen": id_presentacion}
+        if error:
+            resultado["error"] = error
+        return resultado
+
+    # Con id_estudiante solo devuelve la presentación si es de ese estudiante
+    def consultar(self, clave: str, id_estudiante: int = None):
+        con = self._conexion()
+        if id_estudiante is not None:
+            fila = con.execute("SELECT datos FROM presentaciones WHERE clave = ?", (clave,)).fetchone()
+            if fila is None or json.loads(fila[0])["id_estudiante"] != id_estudiante:
+                return None
+        return self._estado(con, clave)
+
+    # Marca como tomadas hasta `limite` pendientes (sin reclamar o con el reclamo vencido) y las devuelve
+    def reclamar(self, limite: int, ignorar_reclamos: bool = False) -> list:
+        ahora = time.time()
+        vencido = ahora if ignorar_reclamos else ahora - RECLAMO_VENCE_S
+        con = self._conexion()
+        with con:
+            filas = con.execute("""
+                UPDATE presentaciones SET reclamada = ?
+                WHERE clave IN (
+                    SELECT clave FROM presentaciones
+                    WHERE estado = 0 AND (reclamada IS NULL OR reclamada <= ?)
+                    ORDER BY recibida
+                    LIMIT ?
+                )
+                RETURNING clave, datos
+            """, (ahora, vencido, limite)).fetchall()
+        return [(clave, json.loads(datos)) for clave, datos in filas]
+
+    def marcar(self, guardadas: list, errores: list):
+        con = self._conexion()
+        with con:
+            con.executemany("UPDATE presentaciones SET estado = 1, id_presentacion = ?, reclamada = NULL WHERE clave = ?",
+                            [(id_presentacion, clave) for clave, id_presentacion in guardadas])
+            con.executemany("UPDATE presentaciones SET estado = 2, error = ?, reclamada = NULL WHERE clave = ?",
+                            [(mensaje, clave) for clave, mensaje in errores])
+
+    # Suma un intento a las presentaciones de un lote que falló y las deja listas para reclamar;
+    # las que llegan a MAX_INTENTOS pasan a error con el mensaje
+    def fallar(self, claves: list, mensaje: str):
+        con = self._conexion()
+        with con:
+            con.executemany("""
+                UPDATE presentaciones SET intentos = intentos + 1, reclamada = NULL,
+                    estado = CASE WHEN intentos + 1 >= ? THEN 2 ELSE estado END,
+                    error = CASE WHEN intentos + 1 >= ? THEN ? ELSE error END
+                WHERE clave = ?
+            """, [(MAX_INTENTOS, MAX_INTENTOS, mensaje, clave) for clave in claves])
+
+    def reintentar_errores(self) -> int:
+        con = self._conexion()
+        with con:
+            return con.execute("UPDATE presentaciones SET estado = 0, error = NULL, intentos = 0 WHERE estado = 2").rowcount
+
+    def purgar(self) -> int:
+        con = self._conexion()
+        with con:
+            return con.execute("DELETE FROM presentaciones WHERE estado = 1 AND recibida < ?",
+                               (time.time() - RETENCION_S,)).rowcount
+
+    def conteo(self) -> dict:
+        filas = self._conexion().execute("SELECT estado, COUNT(*) FROM presentaciones GROUP BY estado").fetchall()
+        return {NOMBRES_ESTADO[estado]: cantidad for estado, cantidad in filas}
+
+
+def _resolver(futuro, resultado):
+    if not futuro.done():
+        futuro.set_result(resultado)
+
+
+def _rechazar(futuro, error):
+    if not futuro.done():
+        futuro.set_exception(error)
+
+
+# Guarda un lote en Oracle con un solo executemany y un commit; devuelve (guardadas, errores)
+def guardar_lote(connection, lote: list):
+    calificar_pendientes(connection, [datos for _, datos in lote], cache_preguntas.claves)
+    with connection.cursor() as cursor:
+        cursor.execute(SIGUIENTES_IDS, n=len(lote))
+        ids = [fila[0] for fila in cursor.fetchall()]
+        filas = []
+        for id_presentacion, (clave, datos) in zip(ids, lote):
+            filas.append((
+                id_presentacion,
+                datos["id_estudiante"],
+                datos["id_examen"],
+                datetime.fromisoformat(datos["fecha_presentacion"]),
+                datos.get("puntaje"),
+                timedelta(seconds=datos["tiempo_tomado_s"]),
+                datos.get("direccion_ip"),
+                datos.get("respuestas"),
+                clave,
+                datos.get("respuestas_dadas"),
+            ))
+        cursor.executemany(INSERTAR_PRESENTACION, filas, batcherrors=True)
+
+        fallidas, duplicadas, errores = set(), [], []
+        for error in cursor.getbatcherrors():
+            fallidas.add(error.offset)
+            clave = lote[error.offset][0]
+            if error.code == CODIGO_DUPLICADO:
+                duplicadas.append(clave)
+            else:
+                errores.append((clave, error.message))
+        connection.commit()
+
+        guardadas = [(clave, ids[i]) for i, (clave, _) in enumerate(lote) if i not in fallidas]
+        if duplicadas:
+            # Ya se había guardado (reintento o lote reprocesado): se responde con el ID existente
+            claves = connection.gettype("SYS.ODCIVARCHAR2LIST").newobject(duplicadas)
+            cursor.execute(ID_POR_CLAVE, claves=claves)
+            guardadas += cursor.fetchall()
+    return guardadas, errores
+
+
+class Despachador(threading.Thread):
+    # Cada cuántas vueltas sin trabajo se purgan las presentaciones viejas del diario
+    PURGAR_CADA = 20_000
+
+    # al_guardar recibe los ID_ESTUDIANTE de cada lote ya guardado en Oracle
+    def __init__(self, diario: DiarioPresentaciones, adquirir, liberar, al_guardar=None):
+        super().__init__(name="despachador-presentaciones", daemon=True)
+        self._diario = diario
+        self._adquirir = adquirir
+        self._liberar = liberar
+        self._al_guardar = al_guardar
+        self._detener = threading.Event()
+        self.lotes = 0
+        self.guardadas = 0
+
+    def run(self):
+        vueltas = 0
+        while not self._detener.is_set():
+            try:
+                procesadas = self.procesar()
+            except Exception:
+                logger.exception("Error guardando presentaciones; se reintentará")
+                procesadas = 0
+                self._detener.wait(1)
+            if not procesadas:
+                vueltas += 1
+                if vueltas % self.PURGAR_CADA == 0:
+                    self._diario.purgar()
+                self._detener.wait(INTERVALO_S)
+
+    def procesar(self, ignorar_reclamos: bool = False) -> int:
+        lote = self._diario.reclamar(TAMANO_LOTE, ignorar_reclamos)
+        if not lote:
+            return 0
+        connection = self._adquirir()
+        # Un lote mezcla presentaciones de muchos estudiantes: en REGISTRO.ACTOR queda el proceso
+        connection.client_identifier = "ingesta"
+        try:
+            guardadas, errores = guardar_lote(connection, lote)
+        except oracledb.Error:
+            # Caída o timeout de la base: el lote vuelve a estar disponible cuando vence el reclamo
+            connection.rollback()
+            raise
+        except Exception as error:
+            connection.rollback()
+            self._diario.fallar([clave for clave, _ in lote], f"{type(error).__name__}: {error}")
+            raise
+        finally:
+            self._liberar(connection)
+        self._diario.marcar(guardadas, errores)
+        if self._al_guardar is not None:
+            self._al_guardar({datos["id_estudiante"] for _, datos in lote})
+        self.lotes += 1
+        self.guardadas += len(guardadas)
+        return len(lote)
+
+    # Al apagar: deja de tomar lotes nuevos y guarda lo que quede pendiente
+    def detener(self):
+        self._detener.set()
+        self.join()
+        try:
+            while self.procesar(ignorar_reclamos=True):
+                pass
+        except Exception:
+            logger.exception("Quedaron presentaciones pendientes en el diario; use python ingesta.py --reproducir")
+
+    def estadisticas(self) -> dict:
+        return {"lotes": self.lotes, "guardadas": self.guardadas, "diario": self._diario.conteo()}
+
+
+def crear_diario() -> DiarioPresentaciones:
+    return DiarioPresentaciones(os.getenv("INGESTA_DIARIO_RUTA", "presentaciones_diario.db"))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--reproducir", action="store_true")
+    parser.add_argument("--reintentar-errores", action="store_true")
+    parser.add_argument("--estado", action="store_true")
+    args = parser.parse_args()
+
+    diario = crear_diario()
+    if args.reintentar_errores:
+        print(f"Errores marcados como pendientes: {diario.reintentar_errores()}")
+    if args.reproducir:
+        from db import adquirir_conexion, liberar_conexion
+        despachador = Despachador(diario, adquirir_conexion, liberar_conexion)
+        while despachador.procesar(ignorar_reclamos=True):
+            pass
+        print(f"Guardadas en Oracle: {despachador.guardadas} en {despachador.lotes} lotes")
+    print(diario.conteo())
+
+
+if __name__ == "__main__":
+    main()
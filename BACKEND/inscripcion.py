@@ -0,0 +1,57 @@
+import oracledb
+
+# Inscripción masiva de estudiantes a un grupo.
+# Valida todo el lote con una sola consulta (mismas reglas y mensajes que AÑADIR_ESTUDIANTES_GRUPO)
+# e inserta con executemany; si algún estudiante falla no se inserta ninguno.
+
+VALIDAR_LOTE = """
+    SELECT
+        T.COLUMN_VALUE,
+        CASE
+            WHEN EG.ID_ESTUDIANTE IS NOT NULL THEN 'El estudiante ya está en un grupo'
+            WHEN E.ID_ESTUDIANTE IS NULL THEN 'El estudiante no existe'
+            WHEN G.TOTAL = 0 THEN 'El grupo no existe'
+        END AS ERROR
+    FROM
+        TABLE(:ids) T
+    CROSS JOIN
+        (SELECT COUNT(*) AS TOTAL FROM GRUPO WHERE ID_GRUPO = :grupo_id) G
+    LEFT JOIN
+        ESTUDIANTE E ON E.ID_ESTUDIANTE = T.COLUMN_VALUE
+    LEFT JOIN
+        (SELECT DISTINCT ID_ESTUDIANTE FROM ESTUDIANTE_GRUPO) EG ON EG.ID_ESTUDIANTE = T.COLUMN_VALUE
+"""
+
+INSERTAR = "INSERT INTO ESTUDIANTE_GRUPO (ID_ESTUDIANTE, ID_GRUPO) VALUES (:1, :2)"
+
+
+# Devuelve la lista de estudiantes no agregados (vacía si se insertó todo el lote)
+def inscribir_estudiantes(connection: oracledb.Connection, grupo_id: int, estudiante_ids: list) -> list:
+    # Un ID repetido en el lote se comporta como antes: la segunda vez ya está en un grupo
+    unicos, repetidos = [], []
+    vistos = set()
+    for estudiante_id in estudiante_ids:
+        if estudiante_id in vistos:
+            repetidos.append(estudiante_id)
+        else:
+            vistos.add(estudiante_id)
+            unicos.append(estudiante_id)
+
+    with connection.cursor() as cursor:
+        ids = connection.gettype("T_NUMEROS").newobject(unicos)
+        cursor.arraysize = 1000
+        cursor.execute(VALIDAR_LOTE, ids=ids, grupo_id=grupo_id)
+        errores = {int(estudiante_id): error for estudiante_id, error in cursor if error is not None}
+
+        no_agregados = [f"ID Estudiante: {e} - {errores[e]}" for e in unicos if e in errores]
+        no_agregados += [f"ID Estudiante: {e} - El estudiante ya está en un grupo" for e in repetidos]
+        if no_agregados or not unicos:
+            return no_agregados
+
+        cursor.executemany(INSERTAR, [(e, grupo_id) for e in unicos], batcherrors=True)
+        # Filas que fallaron al insertar (p. ej. otro profesor inscribió al estudiante entre la validación y el insert)
+        for error in cursor.getbatcherrors():
+            no_agregados.append(f"ID Estudiante: {unicos[error.offset]} - {error.message}")
+        if no_agregados:
+            connection.rollback()
+        return no_agregados
@@ -1,11 +1,35 @@
-from fastapi import FastAPI, HTTPException, Depends, Body
+from fastapi import FastAPI, HTTPException, Depends, Body, Header, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
+from starlette.concurrency import run_in_threadpool
 from jwt import encode as jwt_encode, decode, InvalidTokenError, ExpiredSignatureError
-from datetime import datetime, timedelta, timezone
+from datetime import datetime, timedelta
 from typing import List, Tuple
+import asyncio
+import os
 import secrets
-import cx_Oracle
+import oracledb
+from db import get_connection, get_async_connection, abrir_pool, abrir_pool_async, cerrar_pools, estadisticas_pool, CACHE_SENTENCIAS
+from db import adquirir_conexion, liberar_conexion, adquirir_conexion_async, liberar_conexion_async, actor_actual, conectar_eventos
+from revocacion import crear_almacen_revocacion
+from cache_tokens import cache_tokens
+from inscripcion import inscribir_estudiantes
+from importacion import importar_preguntas
+from paginacion import ConsultaPaginada, responder_reporte
+from consultas import FILA, POCAS, MUCHAS, REPORTE, registrar, revisar_cache_sentencias, estadisticas as estadisticas_consultas
+from exportacion import exportar
+from clasificacion import consulta_clasificacion
+from migraciones import comprobar_indices_al_iniciar
+from periodos import TODOS, filtro_semestre
+from ingesta import Despachador, clave_idempotencia, crear_diario, leer_tiempo_tomado
+from calificacion import normalizar_respuestas_dadas
+from ensamblaje import comprobar_semilla
+from preguntas import cache_preguntas
+from horarios import cache_horarios
+from panel import cache_panel
+from contenidos import CONSULTA_CONTENIDOS, CONSULTA_EXAMENES as CONSULTA_EXAMENES_CONTENIDOS, armar_arbol
+from referencias import CQN as REFERENCIAS_CQN, Referencia, cache_referencias, serializar
+from busqueda import ALCANCES, LIMITE_MAXIMO as LIMITE_BUSQUEDA, indice_preguntas
 
 # Initialize FastAPI app
 app = FastAPI()
@@ -19,56 +43,96 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Siguiente-Cursor", "X-Columnas", "ETag", "Last-Modified"],
 )
 
+# Presentaciones de examen: INGESTA_MODO=diario (por defecto) las confirma al escribirlas en el diario local
+# y las guarda en Oracle por lotes; INGESTA_MODO=directo las guarda una a una dentro de la petición
+INGESTA_MODO = os.getenv("INGESTA_MODO", "diario")
+diario_presentaciones = None
+despachador_presentaciones = None
+
+@app.on_event("startup")
+async def abrir_conexiones():
+    global diario_presentaciones, despachador_presentaciones
+    comprobar_semilla()
+    await run_in_threadpool(abrir_pool)
+    await abrir_pool_async()
+    revisar_cache_sentencias(CACHE_SENTENCIAS)
+    await run_in_threadpool(comprobar_indices_al_iniciar)
+    if INGESTA_MODO == "diario":
+        diario_presentaciones = crear_diario()
+        despachador_presentaciones = Despachador(diario_presentaciones, adquirir_conexion, liberar_conexion, cache_panel.invalidar)
+        despachador_presentaciones.start()
+    indice_preguntas.iniciar(adquirir_conexion, liberar_conexion)
+    if REFERENCIAS_CQN:
+        await run_in_threadpool(cache_referencias.suscribir, conectar_eventos, horario_cambiado)
+
+@app.on_event("shutdown")
+async def cerrar_conexiones():
+    indice_preguntas.detener()
+    cache_referencias.detener()
+    if despachador_presentaciones is not None:
+        await run_in_threadpool(despachador_presentaciones.detener)
+    await cerrar_pools()
+
+# Notificación de Oracle: un cambio en HORARIO también cambia la grilla de los semestres
+def horario_cambiado(tabla: str):
+    if tabla == "HORARIO":
+        cache_horarios.invalidar()
+
 # Security
 security = HTTPBearer()
-# Database connection
-dsn = cx_Oracle.makedsn("localhost", "1521", service_name="XE")
-connection = cx_Oracle.connect(user="BELSANTO", password="12345")
-
-clave_secreta = secrets.token_hex(16)
 
-# Lista de tokens inválidos
-tokens_invalidos = []
+# Con varios workers todos deben firmar con la misma clave (JWT_SECRET)
+clave_secreta = os.getenv("JWT_SECRET") or secrets.token_hex(16)
 
-# Helper function to get database cursor
-def get_cursor():
-    return connection.cursor()
+# Tokens revocados en logout, por jti
+tokens_revocados = crear_almacen_revocacion()
 
 # function to get JWT token creation
 def create_jwt_token(user_id: int, is_professor: bool):
     payload = {
         'user_id': user_id,
         'is_professor': is_professor,
+        'jti': secrets.token_hex(16),
         'exp': datetime.utcnow() + timedelta(hours=1)  # Token expires in 1 hour
     }
     return jwt_encode(payload, clave_secreta, algorithm='HS256')
 
-# Verificar token
-def verificar_token(token: str = Depends(security)):
-    try:
-        payload = decode(token.credentials, clave_secreta, algorithms=["HS256"])
-        usuario_id = payload["user_id"]
-        is_professor = payload["is_professor"]
-        expiracion_timestamp = payload["exp"]
-        expiracion = datetime.fromtimestamp(expiracion_timestamp, tz=timezone.utc)
-        if expiracion > datetime.now(timezone.utc) and token.credentials not in tokens_invalidos:
-            return usuario_id, is_professor
-        else:
-            raise HTTPException(status_code=401, detail="Token expirado o inválido")
-    except ExpiredSignatureError:
-        raise HTTPException(status_code=401, detail="Token expirado")
-    except InvalidTokenError:
-        raise HTTPException(status_code=401, detail="Token inválido")
+# Verificar token (async para no ocupar el threadpool en las rutas asíncronas)
+async def verificar_token(token: str = Depends(security)):
+    clave = cache_tokens.digest(token.credentials)
+    datos = cache_tokens.obtener(clave)
+    if datos is None:
+        try:
+            # decode ya valida la firma y el exp
+            payload = decode(token.credentials, clave_secreta, algorithms=["HS256"])
+            datos = (payload["user_id"], payload["is_professor"], payload["jti"], payload["exp"])
+        except ExpiredSignatureError:
+            raise HTTPException(status_code=401, detail="Token expirado")
+        except (InvalidTokenError, KeyError):
+            raise HTTPException(status_code=401, detail="Token inválido")
+        cache_tokens.guardar(clave, datos)
+    usuario_id, is_professor, jti, _ = datos
+    # Se consulta siempre: el logout pudo hacerse en otro worker (el archivo SQLite se lee fuera del event loop)
+    if tokens_revocados.bloqueante:
+        revocado = await run_in_threadpool(tokens_revocados.esta_revocado, jti)
+    else:
+        revocado = tokens_revocados.esta_revocado(jti)
+    if revocado:
+        raise HTTPException(status_code=401, detail="Token expirado o inválido")
+    # Las conexiones que se tomen después en la petición quedan identificadas con este usuario
+    actor_actual.set(f"{'profesor' if is_professor else 'estudiante'}:{usuario_id}")
+    return usuario_id, is_professor
 
 # Login endpoint
 @app.post("/login", tags=['Sesion'])
-def login(id: int = Body(...), password: str = Body(...), is_professor: int = Body(...)):
+def login(id: int = Body(...), password: str = Body(...), is_professor: int = Body(...), connection: oracledb.Connection = Depends(get_connection)):
     if is_professor not in [0, 1]:
         raise HTTPException(status_code=400, detail="is_professor must be 0 for student or 1 for professor")
 
-    cursor = get_cursor()
+    cursor = connection.cursor()
     try:
         if is_professor == 1:
             result = cursor.callfunc("LOGIN_PROFESOR", int, [id, password])
@@ -86,7 +150,13 @@ def login(id: int = Body(...), password: str = Body(...), is_professor: int = Bo
 # Logout endpoint
 @app.post("/logout", tags=['Sesion'])
 def logout(token: str = Depends(security)):
-    tokens_invalidos.append(token.credentials)
+    cache_tokens.invalidar(cache_tokens.digest(token.credentials))
+    try:
+        payload = decode(token.credentials, clave_secreta, algorithms=["HS256"])
+        tokens_revocados.revocar(payload["jti"], payload["exp"])
+    except (InvalidTokenError, KeyError):
+        # Un token vencido o inválido ya es rechazado, no hace falta revocarlo
+        pass
     return {"message": "Logged out successfully"}
 
 # Endpoint de prueba
@@ -102,582 +172,735 @@ def protected_route(user_info: Tuple[int, bool] = Depends(verificar_token)):
 def protected_route(user_id: int = Depends(verificar_token)):
     return {"message": f"¡Bienvenido, usuario {user_id}!"}
 
+# Aciertos de las caches del backend
+@app.get("/cache/estadisticas", tags=['home'])
+def obtener_estadisticas_cache(user_info: Tuple[int, bool] = Depends(verificar_token)):
+    return {
+        "tokens": cache_tokens.estadisticas(),
+        "preguntas": cache_preguntas.estadisticas(),
+        "busqueda": indice_preguntas.estadisticas(),
+        "horarios": cache_horarios.estadisticas(),
+        "referencias": cache_referencias.estadisticas(),
+        "panel": cache_panel.estadisticas(),
+    }
+
+# Para cambios hechos directamente en la base de datos (CURSO, HORARIO): la próxima petición vuelve a leer
+@app.post("/cache/referencias/invalidar", tags=['home'])
+def invalidar_referencias(user_info: Tuple[int, bool] = Depends(verificar_token)):
+    user_id, is_professor = user_info
+    if not is_professor:
+        raise HTTPException(status_code=403, detail="Solo los profesores pueden invalidar la cache.")
+    cache_referencias.invalidar()
+    cache_horarios.invalidar()
+    return {"invalidada": True}
+
+# Estadísticas de uso del pool de conexiones
+@app.get("/pool/estadisticas", tags=['home'])
+def obtener_estadisticas_pool(user_info: Tuple[int, bool] = Depends(verificar_token)):
+    return estadisticas_pool()
+
+# Ejecuciones, filas, viajes a la base de datos y tiempo promedio de cada consulta registrada (consultas.py)
+@app.get("/consultas-registradas/estadisticas", tags=['home'])
+def obtener_estadisticas_consultas(user_info: Tuple[int, bool] = Depends(verificar_token)):
+    return estadisticas_consultas()
+
 # Endpoint de Reporte de los exámenes presentados por cada estudiante con su puntaje promedio y el número total de exámenes presentados
+# (paginable con limite/cursor o en streaming NDJSON con stream=true)
+# (lee los agregados de BD/migraciones/V004 en lugar de recorrer Presentacion_Examen)
+CONSULTA_ESTUDIANTES = ConsultaPaginada("""
+    SELECT e.Nombre AS Estudiante,
+        a.Suma / NULLIF(a.Cantidad_Puntaje, 0) AS Puntaje_Promedio,
+        a.Cantidad AS Total_Examenes_Presentados,
+        e.ID_Estudiante AS Clave_Estudiante
+    FROM Agg_Puntaje_Estudiante a
+    JOIN Estudiante e ON e.ID_Estudiante = a.ID_Estudiante
+""", ["Estudiante", "Puntaje_Promedio", "Total_Examenes_Presentados"], ["Clave_Estudiante"], "/consultas/estudiantes")
+
 @app.get("/consultas/estudiantes", tags=['Consultas para Profesores'])
-def consultar_estudiantes(user_info: Tuple[int, bool] = Depends(verificar_token)):
+def consultar_estudiantes(limite: int = None, cursor: str = None, stream: bool = False, user_info: Tuple[int, bool] = Depends(verificar_token)):
     user_id, is_professor = user_info
     if not is_professor:
         raise HTTPException(status_code=403, detail="Solo los profesores pueden acceder a esta consulta.")
-    with get_cursor() as cursor:
-        cursor.execute("""
-            SELECT e.Nombre AS Estudiante,
-                AVG(pe.Puntaje) AS Puntaje_Promedio,
-                COUNT(pe.ID_Presentacion_Examen) AS Total_Examenes_Presentados
-            FROM Estudiante e
-            JOIN Presentacion_Examen pe ON e.ID_Estudiante = pe.ID_Estudiante
-            GROUP BY e.ID_Estudiante, e.Nombre
-        """)
-        result = cursor.fetchall()
-        return result
+    return responder_reporte(CONSULTA_ESTUDIANTES, {}, limite, cursor, stream)
 
 # Endpoint de Reporte de los cursos con sus profesores asignados y el número total de exámenes disponibles para cada curso
+CONSULTA_CURSOS_PROFESORES = registrar("/consultas/cursos", """
+    SELECT c.Nombre AS Curso,
+        p.Nombre AS Profesor,
+        COUNT(e.ID_Examen) AS Total_Examenes
+    FROM Curso c
+    JOIN Profesor p ON c.ID_Curso = p.ID_Profesor
+    LEFT JOIN Examen e ON c.ID_Curso = e.ID_Curso
+    GROUP BY c.ID_Curso, c.Nombre, p.Nombre
+""", POCAS)
+
 @app.get("/consultas/cursos", tags=['Consultas para Profesores'])
-def consultar_cursos(user_info: Tuple[int, bool] = Depends(verificar_token)):
+def consultar_cursos(user_info: Tuple[int, bool] = Depends(verificar_token), connection: oracledb.Connection = Depends(get_connection)):
     user_id, is_professor = user_info
     if not is_professor:
         raise HTTPException(status_code=403, detail="Solo los profesores pueden acceder a esta consulta.")
-    with get_cursor() as cursor:
-        cursor.execute("""
-            SELECT c.Nombre AS Curso,
-                p.Nombre AS Profesor,
-                COUNT(e.ID_Examen) AS Total_Examenes
-            FROM Curso c
-            JOIN Profesor p ON c.ID_Curso = p.ID_Profesor
-            LEFT JOIN Examen e ON c.ID_Curso = e.ID_Curso
-            GROUP BY c.ID_Curso, c.Nombre, p.Nombre
-        """)
-        result = cursor.fetchall()
-        return result
+    return CONSULTA_CURSOS_PROFESORES.ejecutar(connection)
 
 # Endpoint para Reporte de los estudiantes por grupo con el número total de exámenes presentados y el promedio de puntaje en los exámenes
+CONSULTA_EXAMENES_GRUPO = ConsultaPaginada("""
+    SELECT g.Nombre AS Grupo,
+        e.Nombre AS Estudiante,
+        NVL(a.Cantidad, 0) AS Total_Examenes_Presentados,
+        a.Suma / NULLIF(a.Cantidad_Puntaje, 0) AS Puntaje_Promedio,
+        g.ID_Grupo AS Clave_Grupo,
+        e.ID_Estudiante AS Clave_Estudiante
+    FROM Estudiante_Grupo eg
+    JOIN Estudiante e ON eg.ID_Estudiante = e.ID_Estudiante
+    JOIN Grupo g ON eg.ID_Grupo = g.ID_Grupo
+    LEFT JOIN Agg_Puntaje_Estudiante a ON a.ID_Estudiante = e.ID_Estudiante
+""", ["Grupo", "Estudiante", "Total_Examenes_Presentados", "Puntaje_Promedio"], ["Grupo", "Clave_Grupo", "Estudiante", "Clave_Estudiante"], "/reporte/examenes-grupo")
+
 @app.get("/reporte/examenes-grupo", tags=['Reportes'])
-def reporte_examenes_grupo(user_info: Tuple[int, bool] = Depends(verificar_token)):
+def reporte_examenes_grupo(limite: int = None, cursor: str = None, stream: bool = False, user_info: Tuple[int, bool] = Depends(verificar_token)):
     user_id, is_professor = user_info
     if not is_professor:
         raise HTTPException(status_code=403, detail="No tienes permiso para acceder a esta consulta")
-    with get_cursor() as cursor:
-        cursor.execute("""
-            SELECT g.Nombre AS Grupo,
-                e.Nombre AS Estudiante,
-                COUNT(pe.ID_Presentacion_Examen) AS Total_Examenes_Presentados,
-                AVG(pe.Puntaje) AS Puntaje_Promedio
-            FROM Estudiante_Grupo eg
-            JOIN Estudiante e ON eg.ID_Estudiante = e.ID_Estudiante
-            JOIN Grupo g ON eg.ID_Grupo = g.ID_Grupo
-            LEFT JOIN Presentacion_Examen pe ON e.ID_Estudiante = pe.ID_Estudiante
-            GROUP BY g.ID_Grupo, g.Nombre, e.ID_Estudiante, e.Nombre
-            ORDER BY g.Nombre, e.Nombre
-        """)
-        result = cursor.fetchall()
-        return result
+    return responder_reporte(CONSULTA_EXAMENES_GRUPO, {}, limite, cursor, stream)
 
 # Endpoint para Reporte de los grupos asignados a cada estudiante, indicando el nombre del estudiante y del grupo al que pertenece
+CONSULTA_ESTUDIANTES_GRUPO = registrar("/reporte/estudiantes-grupo", """
+    SELECT e.Nombre AS Estudiante,
+        g.Nombre AS Grupo
+    FROM Estudiante_Grupo eg
+    JOIN Estudiante e ON eg.ID_Estudiante = e.ID_Estudiante
+    JOIN Grupo g ON eg.ID_Grupo = g.ID_Grupo
+    ORDER BY e.Nombre, g.Nombre
+""", REPORTE)
+
 @app.get("/reporte/estudiantes-grupo", tags=['Reportes'])
-def reporte_estudiantes_grupo(user_info: Tuple[int, bool] = Depends(verificar_token)):
+def reporte_estudiantes_grupo(user_info: Tuple[int, bool] = Depends(verificar_token), connection: oracledb.Connection = Depends(get_connection)):
     user_id, is_professor = user_info
     if not is_professor:
         raise HTTPException(status_code=403, detail="No tienes permiso para acceder a esta consulta")
-    with get_cursor() as cursor:
-        cursor.execute("""
-            SELECT e.Nombre AS Estudiante,
-                g.Nombre AS Grupo
-            FROM Estudiante_Grupo eg
-            JOIN Estudiante e ON eg.ID_Estudiante = e.ID_Estudiante
-            JOIN Grupo g ON eg.ID_Grupo = g.ID_Grupo
-            ORDER BY e.Nombre, g.Nombre
-        """)
-        result = cursor.fetchall()
-        return result
+    return CONSULTA_ESTUDIANTES_GRUPO.ejecutar(connection)
 
 # Endpoint para Reporte de los estudiantes que obtuvieron el mayor puntaje en los exámenes
+# (por defecto solo el semestre actual; semestre=AAAA-S para otro y semestre=todos para el historial completo)
+CONSULTA_MEJOR_PUNTAJE_HISTORIAL = registrar("/reporte/estudiantes-mejor-puntaje (todos)", """
+    SELECT pe.ID_Estudiante AS Estudiante,
+        e.Nombre AS Estudiante_Nombre,
+        pe.ID_Examen AS Examen,
+        pe.Puntaje
+    FROM Agg_Puntaje_Examen a
+    JOIN Presentacion_Examen pe ON pe.ID_Examen = a.ID_Examen AND pe.Puntaje = a.Maximo
+    JOIN Estudiante e ON pe.ID_Estudiante = e.ID_Estudiante
+    ORDER BY pe.ID_Examen, pe.Puntaje DESC
+""", REPORTE)
+
+# El máximo del semestre se calcula en la misma pasada sobre su partición (el filtro es el mismo texto
+# para cualquier semestre, solo cambian :desde y :hasta)
+CONSULTA_MEJOR_PUNTAJE_SEMESTRE = registrar("/reporte/estudiantes-mejor-puntaje", f"""
+    SELECT pe.ID_Estudiante AS Estudiante,
+        e.Nombre AS Estudiante_Nombre,
+        pe.ID_Examen AS Examen,
+        pe.Puntaje
+    FROM (
+        SELECT ID_Estudiante, ID_Examen, Puntaje,
+            MAX(Puntaje) OVER (PARTITION BY ID_Examen) AS Maximo
+        FROM Presentacion_Examen
+        WHERE {filtro_semestre("Fecha_Presentacion")[0]}
+    ) pe
+    JOIN Estudiante e ON pe.ID_Estudiante = e.ID_Estudiante
+    WHERE pe.Puntaje = pe.Maximo
+    ORDER BY pe.ID_Examen, pe.Puntaje DESC
+""", REPORTE)
+
 @app.get("/reporte/estudiantes-mejor-puntaje", tags=['Reportes'])
-def reporte_estudiantes_mejor_puntaje(user_info: Tuple[int, bool] = Depends(verificar_token)):
+def reporte_estudiantes_mejor_puntaje(semestre: str = None, user_info: Tuple[int, bool] = Depends(verificar_token), connection: oracledb.Connection = Depends(get_connection)):
+    user_id, is_professor = user_info
+    if not is_professor:
+        raise HTTPException(status_code=403, detail="No tienes permiso para acceder a esta consulta")
+    if semestre == TODOS:
+        return CONSULTA_MEJOR_PUNTAJE_HISTORIAL.ejecutar(connection)
+    _, params = filtro_semestre("Fecha_Presentacion", semestre)
+    return CONSULTA_MEJOR_PUNTAJE_SEMESTRE.ejecutar(connection, params)
+
+# Endpoint de clasificación: los n mejores estudiantes por examen, grupo o curso (id filtra uno solo),
+# con política de empates incluir/denso/excluir y la misma paginación que los demás reportes
+@app.get("/reporte/clasificacion", tags=['Reportes'])
+def reporte_clasificacion(ambito: str = "examen", id: int = None, n: int = 10, empates: str = "incluir", limite: int = None, cursor: str = None, stream: bool = False, user_info: Tuple[int, bool] = Depends(verificar_token)):
     user_id, is_professor = user_info
     if not is_professor:
         raise HTTPException(status_code=403, detail="No tienes permiso para acceder a esta consulta")
-    with get_cursor() as cursor:
-        cursor.execute("""
-            SELECT pe.ID_Estudiante AS Estudiante,
-                e.Nombre AS Estudiante_Nombre,
-                pe.ID_Examen AS Examen,
-                pe.Puntaje
-            FROM Presentacion_Examen pe
-            JOIN Estudiante e ON pe.ID_Estudiante = e.ID_Estudiante
-            WHERE pe.Puntaje = (
-                SELECT MAX(Puntaje)
-                FROM Presentacion_Examen
-                WHERE ID_Examen = pe.ID_Examen
-            )
-            ORDER BY pe.ID_Examen, pe.Puntaje DESC
-        """)
-        result = cursor.fetchall()
-        return result
+    consulta, params = consulta_clasificacion(ambito, n, empates, id)
+    return responder_reporte(consulta, params, limite, cursor, stream)
 
 # Endpoint para Reporte de los exámenes presentados por los estudiantes en un grupo específico
+# (por defecto solo el semestre actual; semestre=AAAA-S para otro y semestre=todos para el historial completo)
+def _consulta_examenes_grupo(filtro: str) -> str:
+    return f"""
+    SELECT g.Nombre AS Grupo,
+        e.Nombre AS Estudiante,
+        pe.Fecha_Presentacion,
+        pe.Puntaje,
+        ex.Nombre AS Examen
+    FROM Estudiante_Grupo eg
+    JOIN Estudiante e ON eg.ID_Estudiante = e.ID_Estudiante
+    JOIN Grupo g ON eg.ID_Grupo = g.ID_Grupo
+    JOIN Presentacion_Examen pe ON e.ID_Estudiante = pe.ID_Estudiante
+    JOIN Examen ex ON pe.ID_Examen = ex.ID_Examen
+    WHERE g.Nombre = :grupo
+        AND {filtro}
+    ORDER BY e.Nombre, pe.Fecha_Presentacion
+"""
+
+CONSULTA_EXAMENES_GRUPO_HISTORIAL = registrar("/reporte/examenes-grupo-especifico (todos)",
+    _consulta_examenes_grupo(filtro_semestre("pe.Fecha_Presentacion", TODOS)[0]), MUCHAS)
+CONSULTA_EXAMENES_GRUPO_SEMESTRE = registrar("/reporte/examenes-grupo-especifico",
+    _consulta_examenes_grupo(filtro_semestre("pe.Fecha_Presentacion")[0]), MUCHAS)
+
 @app.get("/reporte/examenes-grupo-especifico", tags=['Reportes'])
-def reporte_examenes_grupo_especifico(grupo: str, user_info: Tuple[int, bool] = Depends(verificar_token)):
+def reporte_examenes_grupo_especifico(grupo: str, semestre: str = None, user_info: Tuple[int, bool] = Depends(verificar_token), connection: oracledb.Connection = Depends(get_connection)):
+    user_id, is_professor = user_info
+    if not is_professor:
+        raise HTTPException(status_code=403, detail="No tienes permiso para acceder a esta consulta")
+    _, params = filtro_semestre("pe.Fecha_Presentacion", semestre)
+    consulta = CONSULTA_EXAMENES_GRUPO_HISTORIAL if semestre == TODOS else CONSULTA_EXAMENES_GRUPO_SEMESTRE
+    return consulta.ejecutar(connection, {"grupo": grupo, **params})
+
+# Endpoint para exportar las notas completas en CSV o Parquet, filtradas por semestre, grupo y curso
+@app.get("/exportar/notas", tags=['Reportes'])
+def exportar_notas(formato: str = "csv", semestre: str = None, grupo: int = None, curso: int = None, user_info: Tuple[int, bool] = Depends(verificar_token)):
     user_id, is_professor = user_info
     if not is_professor:
         raise HTTPException(status_code=403, detail="No tienes permiso para acceder a esta consulta")
-    with get_cursor() as cursor:
-        cursor.execute("""
-            SELECT g.Nombre AS Grupo,
-                e.Nombre AS Estudiante,
-                pe.Fecha_Presentacion,
-                pe.Puntaje,
-                ex.Nombre AS Examen
-            FROM Estudiante_Grupo eg
-            JOIN Estudiante e ON eg.ID_Estudiante = e.ID_Estudiante
-            JOIN Grupo g ON eg.ID_Grupo = g.ID_Grupo
-            JOIN Presentacion_Examen pe ON e.ID_Estudiante = pe.ID_Estudiante
-            JOIN Examen ex ON pe.ID_Examen = ex.ID_Examen
-            WHERE g.Nombre = :grupo
-            ORDER BY e.Nombre, pe.Fecha_Presentacion
-        """, {"grupo": grupo})
-        result = cursor.fetchall()
-        return result
+    return exportar(formato, semestre, grupo, curso)
 
 # Endpoint para Reporte de los cursos y los exámenes programados para ellos
+CONSULTA_CURSOS_EXAMENES = registrar("/reporte/cursos-examenes-programados", """
+    SELECT c.Nombre AS Curso,
+        ex.Nombre AS Examen,
+        COUNT(ep.ID_Examen) AS Total_Preguntas
+    FROM Curso c
+    JOIN Examen ex ON c.ID_Curso = ex.ID_Curso
+    JOIN Examen_Pregunta ep ON ex.ID_Examen = ep.ID_Examen
+    GROUP BY c.ID_Curso, c.Nombre, ex.ID_Examen, ex.Nombre
+""", POCAS)
+
 @app.get("/reporte/cursos-examenes-programados", tags=['Reportes'])
-def reporte_cursos_examenes_programados(user_info: Tuple[int, bool] = Depends(verificar_token)):
+def reporte_cursos_examenes_programados(user_info: Tuple[int, bool] = Depends(verificar_token), connection: oracledb.Connection = Depends(get_connection)):
     user_id, is_professor = user_info
     if not is_professor:
         raise HTTPException(status_code=403, detail="No tienes permiso para acceder a esta consulta")
-    with get_cursor() as cursor:
-        cursor.execute("""
-            SELECT c.Nombre AS Curso,
-                ex.Nombre AS Examen,
-                COUNT(ep.ID_Examen) AS Total_Preguntas
-            FROM Curso c
-            JOIN Examen ex ON c.ID_Curso = ex.ID_Curso
-            JOIN Examen_Pregunta ep ON ex.ID_Examen = ep.ID_Examen
-            GROUP BY c.ID_Curso, c.Nombre, ex.ID_Examen, ex.Nombre
-        """)
-        result = cursor.fetchall()
-        return result
+    return CONSULTA_CURSOS_EXAMENES.ejecutar(connection)
 
 # Endpoint para Reporte de los estudiantes y su puntaje más alto obtenido en los exámenes
+CONSULTA_ESTUDIANTES_PUNTAJE_MAXIMO = ConsultaPaginada("""
+    SELECT e.Nombre AS Estudiante,
+        a.Maximo AS Puntaje_Maximo,
+        e.ID_Estudiante AS Clave_Estudiante
+    FROM Agg_Puntaje_Estudiante a
+    JOIN Estudiante e ON e.ID_Estudiante = a.ID_Estudiante
+""", ["Estudiante", "Puntaje_Maximo"], ["Clave_Estudiante"], "/reporte/estudiantes-puntaje-maximo")
+
 @app.get("/reporte/estudiantes-puntaje-maximo", tags=['Reportes'])
-def reporte_estudiantes_puntaje_maximo(user_info: Tuple[int, bool] = Depends(verificar_token)):
+def reporte_estudiantes_puntaje_maximo(limite: int = None, cursor: str = None, stream: bool = False, user_info: Tuple[int, bool] = Depends(verificar_token)):
     user_id, is_professor = user_info
     if not is_professor:
         raise HTTPException(status_code=403, detail="No tienes permiso para acceder a esta consulta")
-    with get_cursor() as cursor:
-        cursor.execute("""
-            SELECT e.Nombre AS Estudiante,
-                MAX(pe.Puntaje) AS Puntaje_Maximo
-            FROM Estudiante e
-            JOIN Presentacion_Examen pe ON e.ID_Estudiante = pe.ID_Estudiante
-            GROUP BY e.ID_Estudiante, e.Nombre
-        """)
-        result = cursor.fetchall()
-        return result
+    return responder_reporte(CONSULTA_ESTUDIANTES_PUNTAJE_MAXIMO, {}, limite, cursor, stream)
 
 # Endpoint para Reporte de los grupos con el número total de estudiantes asignados
+CONSULTA_GRUPOS_ESTUDIANTES = registrar("/reporte/grupos-estudiantes", """
+    SELECT g.Nombre AS Grupo,
+        COUNT(eg.ID_Estudiante) AS Total_Estudiantes
+    FROM Grupo g
+    JOIN Estudiante_Grupo eg ON g.ID_Grupo = eg.ID_Grupo
+    GROUP BY g.ID_Grupo, g.Nombre
+""", POCAS)
+
 @app.get("/reporte/grupos-estudiantes", tags=['Reportes'])
-def reporte_grupos_estudiantes(user_info: Tuple[int, bool] = Depends(verificar_token)):
+def reporte_grupos_estudiantes(user_info: Tuple[int, bool] = Depends(verificar_token), connection: oracledb.Connection = Depends(get_connection)):
     user_id, is_professor = user_info
     if not is_professor:
         raise HTTPException(status_code=403, detail="No tienes permiso para acceder a esta consulta")
-    with get_cursor() as cursor:
-        cursor.execute("""
-            SELECT g.Nombre AS Grupo,
-                COUNT(eg.ID_Estudiante) AS Total_Estudiantes
-            FROM Grupo g
-            JOIN Estudiante_Grupo eg ON g.ID_Grupo = eg.ID_Grupo
-            GROUP BY g.ID_Grupo, g.Nombre
-        """)
-        result = cursor.fetchall()
-        return result
+    return CONSULTA_GRUPOS_ESTUDIANTES.ejecutar(connection)
 
 # Endpoint para Reporte de las preguntas asignadas a cada examen con la cantidad de veces que se ha presentado cada pregunta
+CONSULTA_PREGUNTAS_EXAMEN = ConsultaPaginada("""
+    SELECT e.Nombre AS Examen,
+        p.texto AS Texto,
+        COUNT(*) * NVL(a.Cantidad, 0) AS Veces_Presentada,
+        e.ID_Examen AS Clave_Examen
+    FROM Examen e
+    JOIN Examen_Pregunta ep ON e.ID_Examen = ep.ID_Examen
+    JOIN Pregunta p ON ep.ID_Pregunta = p.ID_Pregunta
+    LEFT JOIN Agg_Puntaje_Examen a ON a.ID_Examen = e.ID_Examen
+    GROUP BY e.ID_Examen, e.Nombre, p.texto, a.Cantidad
+""", ["Examen", "Texto", "Veces_Presentada"], ["Clave_Examen", "Texto"], "/reporte/preguntas-examen")
+
 @app.get("/reporte/preguntas-examen", tags=['Reportes'])
-def reporte_preguntas_examen(user_info: Tuple[int, bool] = Depends(verificar_token)):
+def reporte_preguntas_examen(limite: int = None, cursor: str = None, stream: bool = False, user_info: Tuple[int, bool] = Depends(verificar_token)):
+    user_id, is_professor = user_info
+    if not is_professor:
+        raise HTTPException(status_code=403, detail="Solo los profesores pueden acceder a esta consulta.")
+    return responder_reporte(CONSULTA_PREGUNTAS_EXAMEN, {}, limite, cursor, stream)
+
+# Estadísticas de puntaje por estudiante, grupo o examen: cantidad, promedio, mínimo, máximo y desviación estándar
+def _consulta_estadisticas_puntaje(tabla: str, entidad: str, clave: str) -> str:
+    return f"""
+    SELECT t.Nombre,
+        a.Cantidad,
+        a.Suma / NULLIF(a.Cantidad_Puntaje, 0) AS Promedio,
+        a.Minimo,
+        a.Maximo,
+        CASE WHEN a.Cantidad_Puntaje > 1 THEN
+            SQRT(GREATEST(a.Suma_Cuadrados - a.Suma * a.Suma / a.Cantidad_Puntaje, 0) / (a.Cantidad_Puntaje - 1))
+        END AS Desviacion
+    FROM {tabla} a
+    JOIN {entidad} t ON t.{clave} = a.{clave}
+    ORDER BY t.Nombre
+"""
+
+ESTADISTICAS_PUNTAJE = {
+    nivel: registrar(f"/consultas/estadisticas-puntaje/{nivel}", _consulta_estadisticas_puntaje(*tabla), MUCHAS)
+    for nivel, tabla in (
+        ("estudiante", ("Agg_Puntaje_Estudiante", "Estudiante", "ID_Estudiante")),
+        ("grupo", ("Agg_Puntaje_Grupo", "Grupo", "ID_Grupo")),
+        ("examen", ("Agg_Puntaje_Examen", "Examen", "ID_Examen")),
+    )
+}
+
+@app.get("/consultas/estadisticas-puntaje/{nivel}", tags=['Consultas para Profesores'])
+def consultar_estadisticas_puntaje(nivel: str, user_info: Tuple[int, bool] = Depends(verificar_token), connection: oracledb.Connection = Depends(get_connection)):
     user_id, is_professor = user_info
     if not is_professor:
         raise HTTPException(status_code=403, detail="Solo los profesores pueden acceder a esta consulta.")
-    with get_cursor() as cursor:
-        cursor.execute("""
-            SELECT e.Nombre AS Examen,
-                p.texto,
-                COUNT(pe.ID_Presentacion_Examen) AS Veces_Presentada
-            FROM Examen e
-            JOIN Examen_Pregunta ep ON e.ID_Examen = ep.ID_Examen
-            JOIN Pregunta p ON ep.ID_Pregunta = p.ID_Pregunta
-            LEFT JOIN Presentacion_Examen pe ON e.ID_Examen = pe.ID_Examen
-            GROUP BY e.ID_Examen, e.Nombre, p.texto
-        """)
-        result = cursor.fetchall()
-        return result
+    if nivel not in ESTADISTICAS_PUNTAJE:
+        raise HTTPException(status_code=404, detail="El nivel debe ser estudiante, grupo o examen")
+    return ESTADISTICAS_PUNTAJE[nivel].ejecutar(connection)
+
+# Compara los agregados con Presentacion_Examen (lo mismo que hace el job nocturno JOB_AGG_VERIFICAR)
+@app.post("/consultas/estadisticas-puntaje/verificar", tags=['Consultas para Profesores'])
+def verificar_estadisticas_puntaje(reparar: bool = False, user_info: Tuple[int, bool] = Depends(verificar_token), connection: oracledb.Connection = Depends(get_connection)):
+    user_id, is_professor = user_info
+    if not is_professor:
+        raise HTTPException(status_code=403, detail="Solo los profesores pueden acceder a esta consulta.")
+    with connection.cursor() as cursor:
+        desvios = cursor.var(int)
+        cursor.callproc("AGG_VERIFICAR", [1 if reparar else 0, desvios])
+    return {"desvios": desvios.getvalue()}
 
 # Endpoint para obtener exámenes de un profesor específico
+CONSULTA_EXAMENES_PROFESOR = registrar("/examenes", """
+    SELECT
+        ID_EXAMEN,
+        NOMBRE,
+        DESCRIPCION,
+        CANTIDAD_DE_PREGUNTAS,
+        TIEMPO_LIMITE,
+        ID_CURSO,
+        ORDEN
+    FROM
+        EXAMEN E
+    WHERE
+        ID_PROFESOR = :p_id
+""", POCAS)
+
 @app.get("/examenes", tags=['Exámenes del Profesor'])
-def obtener_examenes_profesor( user_info: Tuple[int, bool] = Depends(verificar_token)):
+def obtener_examenes_profesor( user_info: Tuple[int, bool] = Depends(verificar_token), connection: oracledb.Connection = Depends(get_connection)):
     user_id, is_professor = user_info
     if not is_professor:
         raise HTTPException(status_code=403, detail="No tienes permiso para acceder a esta consulta")
-    with get_cursor() as cursor:
-        cursor.execute("""
-            SELECT
-                ID_EXAMEN,
-                NOMBRE,
-                DESCRIPCION,
-                CANTIDAD_DE_PREGUNTAS,
-                TIEMPO_LIMITE,
-                ID_CURSO,
-                ORDEN
-            FROM
-                EXAMEN E
-            WHERE
-                ID_PROFESOR = :p_id
-        """, {"p_id": user_id})
-        result = cursor.fetchall()
-        return result
+    return CONSULTA_EXAMENES_PROFESOR.ejecutar(connection, {"p_id": user_id})
 
 # Endpoint para obtener preguntas de un examen  específico
+# Se responde desde la cache de preguntas por examen; solo se toma una conexión si el examen no está.
+# El profesor recibe todas las preguntas y el estudiante las que le tocan (ensamblaje.py)
 @app.get("/preguntas-examen/{id_examen}", tags=['Preguntas del Examen'])
-def obtener_preguntas_examen(id_examen: int, user_info: Tuple[int, bool] = Depends(verificar_token)):
-    with get_cursor() as cursor:
-        cursor.execute("""
-            SELECT
-                P.*
-            FROM
-                PREGUNTA P
-            INNER JOIN
-                EXAMEN_PREGUNTA EP ON EP.ID_PREGUNTA = P.ID_PREGUNTA AND ID_EXAMEN = :p_id
-        """, {"p_id": id_examen})
-        result = cursor.fetchall()
-        return result
+async def obtener_preguntas_examen(id_examen: int, user_info: Tuple[int, bool] = Depends(verificar_token)):
+    user_id, is_professor = user_info
+    entrada = await cache_preguntas.obtener_async(id_examen, adquirir_conexion_async, liberar_conexion_async)
+    cuerpo = entrada.cuerpo if is_professor else entrada.cuerpo_estudiante(user_id)
+    return Response(content=cuerpo, media_type="application/json")
 
 # Endpoint para obtener exámenes con id específico
+# Búsqueda por clave primaria: se lee con fetchone y se sigue respondiendo una lista de cero o una fila
+CONSULTA_EXAMEN = registrar("/examen/{id_examen}", """
+    SELECT
+        ID_EXAMEN,
+        NOMBRE,
+        DESCRIPCION,
+        CANTIDAD_DE_PREGUNTAS,
+        TIEMPO_LIMITE,
+        ID_CURSO,
+        ORDEN
+    FROM
+        EXAMEN E
+    WHERE
+        ID_EXAMEN = :p_id
+""", FILA)
+
 @app.get("/examen/{id_examen}", tags=['Exámen'])
-def obtener_examen(id_examen: int, user_info: Tuple[int, bool] = Depends(verificar_token)):
-    with get_cursor() as cursor:
-        cursor.execute("""
-            SELECT
-                ID_EXAMEN,
-                NOMBRE,
-                DESCRIPCION,
-                CANTIDAD_DE_PREGUNTAS,
-                TIEMPO_LIMITE,
-                ID_CURSO,
-                ORDEN
-            FROM
-                EXAMEN E
-            WHERE
-                ID_EXAMEN = :p_id
-        """, {"p_id": id_examen})
-        result = cursor.fetchall()
-        return result
+def obtener_examen(id_examen: int, user_info: Tuple[int, bool] = Depends(verificar_token), connection: oracledb.Connection = Depends(get_connection)):
+    fila = CONSULTA_EXAMEN.ejecutar(connection, {"p_id": id_examen})
+    return [] if fila is None else [fila]
 
 # Endpoint para obtener exámenes no presentados de un estudiante en específico
+CONSULTA_EXAMENES_ASIGNADOS = registrar("/examenes-asignados", """
+    SELECT
+        E.ID_EXAMEN,
+        E.NOMBRE,
+        E.DESCRIPCION,
+        E.CANTIDAD_DE_PREGUNTAS,
+        E.TIEMPO_LIMITE,
+        E.ID_CURSO,
+        E.ORDEN
+    FROM
+        EXAMEN E
+    INNER JOIN
+        EXAMEN_HORARIO EH ON E.ID_EXAMEN = EH.ID_EXAMEN
+    INNER JOIN
+        GRUPO_HORARIO GH ON GH.ID_HORARIO = EH.ID_HORARIO
+    INNER JOIN
+        GRUPO G ON G.ID_GRUPO = GH.ID_GRUPO
+    INNER JOIN
+        ESTUDIANTE_GRUPO EG ON EG.ID_GRUPO = G.ID_GRUPO
+    LEFT JOIN
+        PRESENTACION_EXAMEN PE ON E.ID_EXAMEN = PE.ID_EXAMEN AND PE.ID_ESTUDIANTE = EG.ID_ESTUDIANTE
+    WHERE
+        EG.ID_ESTUDIANTE = :p_id
+        AND PE.ID_EXAMEN IS NULL
+""", POCAS)
+
 @app.get("/examenes-asignados", tags=['Exámenes Asignados no Presentados'])
-def obtener_examenes_asignados(user_info: Tuple[int, bool] = Depends(verificar_token)):
+async def obtener_examenes_asignados(user_info: Tuple[int, bool] = Depends(verificar_token), connection: oracledb.AsyncConnection = Depends(get_async_connection)):
     user_id, is_professor = user_info
     if is_professor:
         raise HTTPException(status_code=403, detail="No tienes permiso para acceder a esta consulta")
-    with get_cursor() as cursor:
-        cursor.execute("""
-            SELECT
-                E.ID_EXAMEN,
-                E.NOMBRE,
-                E.DESCRIPCION,
-                E.CANTIDAD_DE_PREGUNTAS,
-                E.TIEMPO_LIMITE,
-                E.ID_CURSO,
-                E.ORDEN
-            FROM
-                EXAMEN E
-            INNER JOIN
-                EXAMEN_HORARIO EH ON E.ID_EXAMEN = EH.ID_EXAMEN
-            INNER JOIN
-                GRUPO_HORARIO GH ON GH.ID_HORARIO = EH.ID_HORARIO
-            INNER JOIN
-                GRUPO G ON G.ID_GRUPO = GH.ID_GRUPO
-            INNER JOIN
-                ESTUDIANTE_GRUPO EG ON EG.ID_GRUPO = G.ID_GRUPO
-            LEFT JOIN
-                PRESENTACION_EXAMEN PE ON E.ID_EXAMEN = PE.ID_EXAMEN AND PE.ID_ESTUDIANTE = EG.ID_ESTUDIANTE
-            WHERE
-                EG.ID_ESTUDIANTE = :p_id
-                AND PE.ID_EXAMEN IS NULL
-        """, {"p_id": user_id})
-        result = cursor.fetchall()
-        return result
+    return await CONSULTA_EXAMENES_ASIGNADOS.ejecutar_async(connection, {"p_id": user_id})
+
+# Panel de inicio del estudiante en una sola petición (panel.py): exámenes asignados, notas, contenidos y,
+# con semana y semestre, su horario de la semana
+@app.get("/mi-panel", tags=['Panel del estudiante'])
+async def obtener_mi_panel(semana: int = None, semestre: str = None, user_info: Tuple[int, bool] = Depends(verificar_token)):
+    user_id, is_professor = user_info
+    if is_professor:
+        raise HTTPException(status_code=403, detail="No tienes permiso para acceder a esta consulta")
+    if semana is None or semestre is None:
+        panel = await cache_panel.obtener_async(user_id, adquirir_conexion_async, liberar_conexion_async)
+        return {**panel.respuesta(), "horarios": []}
+    panel, entrada = await asyncio.gather(
+        cache_panel.obtener_async(user_id, adquirir_conexion_async, liberar_conexion_async),
+        run_in_threadpool(horarios_semestre, semestre),
+    )
+    return {**panel.respuesta(), "horarios": entrada.grilla_estudiante(semana, user_id)}
 
 # Endpoint para obtener exámenes no presentados de un estudiante en específico
+CONSULTA_NOTAS_ESTUDIANTE = registrar("/obtener-notas", """
+    SELECT
+        PE.PUNTAJE,
+        E.NOMBRE,
+        E.DESCRIPCION,
+        E.CANTIDAD_DE_PREGUNTAS,
+        C.NOMBRE,
+        P.NOMBRE
+    FROM
+        PRESENTACION_EXAMEN PE
+    INNER JOIN
+        EXAMEN E ON E.ID_EXAMEN = PE.ID_EXAMEN
+    INNER JOIN
+        PROFESOR P ON E.ID_PROFESOR = P.ID_PROFESOR
+    LEFT JOIN
+        CURSO C ON C.ID_CURSO = E.ID_CURSO
+    WHERE
+        ID_ESTUDIANTE = :p_id
+""", POCAS)
+
 @app.get("/obtener-notas", tags=['Notas del estudiante'])
-def obtener_notas(user_info: Tuple[int, bool] = Depends(verificar_token)):
+def obtener_notas(user_info: Tuple[int, bool] = Depends(verificar_token), connection: oracledb.Connection = Depends(get_connection)):
     user_id, is_professor = user_info
     if is_professor:
         raise HTTPException(status_code=403, detail="No tienes permiso para acceder a esta consulta")
-    with get_cursor() as cursor:
-        cursor.execute("""
-            SELECT
-                PE.PUNTAJE,
-                E.NOMBRE,
-                E.DESCRIPCION,
-                E.CANTIDAD_DE_PREGUNTAS,
-                C.NOMBRE,
-                P.NOMBRE
-            FROM
-                PRESENTACION_EXAMEN PE
-            INNER JOIN
-                EXAMEN E ON E.ID_EXAMEN = PE.ID_EXAMEN
-            INNER JOIN
-                PROFESOR P ON E.ID_PROFESOR = P.ID_PROFESOR
-            LEFT JOIN
-                CURSO C ON C.ID_CURSO = E.ID_CURSO
-            WHERE
-                ID_ESTUDIANTE = :p_id
-        """, {"p_id": user_id})
-        result = cursor.fetchall()
-        return result
+    return CONSULTA_NOTAS_ESTUDIANTE.ejecutar(connection, {"p_id": user_id})
 
 # Endpoint para obtener contenidos y unidades de un estudiante en específico
+# Árbol curso -> unidades -> contenidos con los exámenes del estudiante en cada curso (contenidos.py)
+CONSULTA_CONTENIDOS_ESTUDIANTE = registrar("/contenidos-estudiante-notas (contenidos)", CONSULTA_CONTENIDOS, MUCHAS)
+CONSULTA_EXAMENES_ESTUDIANTE = registrar("/contenidos-estudiante-notas (exámenes)", CONSULTA_EXAMENES_CONTENIDOS, POCAS)
+
 @app.get("/contenidos-estudiante-notas", tags=['Contenidos del estudiante'])
-def get_contenidos_estudiante(user_info: Tuple[int, bool] = Depends(verificar_token)):
+def get_contenidos_estudiante(user_info: Tuple[int, bool] = Depends(verificar_token), connection: oracledb.Connection = Depends(get_connection)):
     user_id, is_professor = user_info
     if is_professor:
         raise HTTPException(status_code=403, detail="No tienes permiso para acceder a esta consulta")
-    with get_cursor() as cursor:
-        cursor.execute("""
-            SELECT
-                C.NOMBRE,
-                CU.DESCRIPCIÓN,
-                UC.NOMBRE,
-                E.NOMBRE
-            FROM
-                CURSO C
-            INNER JOIN
-                UNIDAD_DE_CURSO UC ON UC.ID_CURSO = C.ID_CURSO
-            INNER JOIN
-                CONTENIDO_DE_UNIDAD CU ON CU.ID_UNIDAD = UC.ID_UNIDAD
-            INNER JOIN
-                EXAMEN E ON E.ID_CURSO = C.ID_CURSO
-            INNER JOIN
-                EXAMEN_HORARIO EH ON EH.ID_EXAMEN = E.ID_EXAMEN
-            INNER JOIN
-                GRUPO_HORARIO GH ON GH.ID_HORARIO = EH.ID_HORARIO
-            INNER JOIN
-                GRUPO G ON G.ID_GRUPO = GH.ID_GRUPO
-            INNER JOIN
-                ESTUDIANTE_GRUPO EG ON EG.ID_GRUPO = GH.ID_GRUPO AND EG.ID_ESTUDIANTE = :p_id
-        """, {"p_id": user_id})
-        result = cursor.fetchall()
-        return result
+    contenidos = CONSULTA_CONTENIDOS_ESTUDIANTE.ejecutar(connection, {"p_id": user_id})
+    examenes = CONSULTA_EXAMENES_ESTUDIANTE.ejecutar(connection, {"p_id": user_id})
+    return armar_arbol(contenidos, examenes)
+
+# Dato de referencia de referencias.py (solo se toma una conexión si no está en memoria)
+def referencia(clave: str):
+    entrada = cache_referencias.obtener(clave)
+    if entrada is None:
+        connection = adquirir_conexion()
+        try:
+            entrada = cache_referencias.cargar(connection, clave)
+        finally:
+            liberar_conexion(connection)
+    return entrada
 
 # Cursos:
 @app.get("/cursos", tags=['Cursos'],)
-def get_cursos(user_id: int = Depends(verificar_token)):
-    with get_cursor() as cursor:
-        cursor.execute("""
-            SELECT
-                C.*
-            FROM
-                "CURSO" C
-        """)
-        result = cursor.fetchall()
-        return result
+def get_cursos(request: Request, user_id: int = Depends(verificar_token)):
+    return cache_referencias.responder(request, referencia("cursos"))
+
+# Horarios del semestre desde la cache de horarios.py (solo se toma una conexión si no está)
+def horarios_semestre(semestre: str):
+    entrada = cache_horarios.obtener(semestre)
+    if entrada is None:
+        connection = adquirir_conexion()
+        try:
+            entrada = cache_horarios.cargar(connection, semestre)
+        finally:
+            liberar_conexion(connection)
+    return entrada
 
 # Endpoint to fetch schedules
+# La grilla serializada se guarda con el semestre del que salió y se vuelve a armar cuando este se recarga
 @app.get("/horarios", tags=['Horarios disponibles'],)
-def get_horarios(user_id: int = Depends(verificar_token), semana: int = None, semestre: str = None):
-    with get_cursor() as cursor:
-        cursor.execute("""
-            SELECT
-                H."ID_HORARIO",
-                H."DIA",
-                H."HORA",
-                H."SEMANA",
-                H."SEMESTRE",
-                H."INDICE_DIA",
-                CASE
-                    WHEN MAX(CASE WHEN GH."ID_GRUPO" IS NOT NULL THEN 1 ELSE 0 END) = 1 THEN 'SI'
-                    ELSE 'NO'
-                END AS "GRUPO_ASOCIADO",
-                CASE
-                    WHEN MAX(CASE WHEN EH."ID_EXAMEN" IS NOT NULL THEN 1 ELSE 0 END) = 1 THEN 'SI'
-                    ELSE 'NO'
-                END AS "EXAMEN_ASOCIADO"
-            FROM
-                "HORARIO" H
-            LEFT JOIN
-                "GRUPO_HORARIO" GH ON H."ID_HORARIO" = GH."ID_HORARIO"
-            LEFT JOIN
-                "EXAMEN_HORARIO" EH ON H."ID_HORARIO" = EH."ID_HORARIO"
-            WHERE
-                H."SEMANA" = :semana
-            AND
-                H."SEMESTRE" = :semestre
-            GROUP BY
-                H."ID_HORARIO", H."DIA", H."HORA", H."SEMANA", H."SEMESTRE", H."INDICE_DIA"
-            ORDER BY
-                H."INDICE_DIA", H."HORA", H."SEMESTRE" ASC
-        """, {"semana": semana, "semestre": semestre})
-        result = cursor.fetchall()
-        return result
+def get_horarios(request: Request, user_id: int = Depends(verificar_token), semana: int = None, semestre: str = None):
+    if semana is None or semestre is None:
+        return []
+    entrada = horarios_semestre(semestre)
+    clave = ("horarios", semestre, semana)
+    grilla = cache_referencias.obtener(clave)
+    if grilla is None or grilla.origen is not entrada:
+        grilla = cache_referencias.guardar(clave, entrada.grilla(semana), origen=entrada)
+    return cache_referencias.responder(request, grilla)
+
+# Grupos y estudiantes que tendrían dos exámenes a la vez si un examen de tiempo_limite minutos va en el horario
+@app.get("/horarios/{id_horario}/conflictos", tags=['Horarios disponibles'])
+def get_conflictos_horario(id_horario: int, tiempo_limite: int = None, id_examen: int = None, user_info: Tuple[int, bool] = Depends(verificar_token), connection: oracledb.Connection = Depends(get_connection)):
+    user_id, is_professor = user_info
+    if not is_professor:
+        raise HTTPException(status_code=403, detail="Solo los profesores pueden acceder a esta consulta.")
+    semestre = cache_horarios.semestre_de(connection, id_horario)
+    if semestre is None:
+        raise HTTPException(status_code=404, detail="El horario no existe")
+    entrada = cache_horarios.obtener(semestre) or cache_horarios.cargar(connection, semestre)
+    return entrada.conflictos(id_horario, tiempo_limite, excluir=id_examen)
 
 
 @app.get("/semestres", tags=['Semestres disponibles'],)
-def get_semestres(user_id: int = Depends(verificar_token)):
-    with get_cursor() as cursor:
-        cursor.execute("""
-            SELECT SEMESTRE, count(DISTINCT SEMANA)
-            FROM "HORARIO"
-            GROUP BY SEMESTRE
-            ORDER BY SEMESTRE  ASC
-        """)
-        result = cursor.fetchall()
-        return result
+def get_semestres(request: Request, user_id: int = Depends(verificar_token)):
+    return cache_referencias.responder(request, referencia("semestres"))
 
 # Endpoint to fetch students for a group
+CONSULTA_ESTUDIANTES_POR_GRUPO = registrar("/estudiantes/{id_grupo}", """
+    SELECT E.*
+    FROM "ESTUDIANTE" E
+    JOIN "ESTUDIANTE_GRUPO" EG ON E."ID_ESTUDIANTE" = EG."ID_ESTUDIANTE"
+    WHERE EG."ID_GRUPO" = :id_grupo
+""", POCAS)
+
 @app.get("/estudiantes/{id_grupo}", tags=['Ver estudiantes por grupo'])
-def get_estudiantes(id_grupo: int, user_id: int = Depends(verificar_token)):
-    with get_cursor() as cursor:
-        cursor.execute("""
-            SELECT E.*
-            FROM "ESTUDIANTE" E
-            JOIN "ESTUDIANTE_GRUPO" EG ON E."ID_ESTUDIANTE" = EG."ID_ESTUDIANTE"
-            WHERE EG."ID_GRUPO" = :id_grupo
-        """, id_grupo=id_grupo)
-        result = cursor.fetchall()
-        return result
+def get_estudiantes(id_grupo: int, user_id: int = Depends(verificar_token), connection: oracledb.Connection = Depends(get_connection)):
+    return CONSULTA_ESTUDIANTES_POR_GRUPO.ejecutar(connection, {"id_grupo": id_grupo})
 
 # Endpoint to fetch student schedules for a group
 @app.get("/estudiante_horarios", tags=['Ver el horario de estudiante'])
-def get_estudiantes_horarios(user_info: Tuple[int, bool] = Depends(verificar_token), semana: int = None, semestre: str = None):
+def get_estudiantes_horarios(request: Request, user_info: Tuple[int, bool] = Depends(verificar_token), semana: int = None, semestre: str = None):
     user_id, is_professor = user_info
     if is_professor:
         raise HTTPException(status_code=403, detail="No tienes permiso para acceder a esta consulta")
-    with get_cursor() as cursor:
-        cursor.execute("""
-            SELECT
-                H."ID_HORARIO",
-                H."DIA",
-                H."HORA",
-                H."SEMANA",
-                H."SEMESTRE",
-                H."INDICE_DIA",
-                CASE
-                    WHEN MAX(CASE WHEN GH."ID_GRUPO" IS NOT NULL THEN 1 ELSE 0 END) = 1 THEN 'SI'
-                    ELSE 'NO'
-                END AS "GRUPO_ASOCIADO"
-            FROM
-                "HORARIO" H
-            INNER JOIN
-                "GRUPO_HORARIO" GH ON H."ID_HORARIO" = GH."ID_HORARIO"
-            INNER JOIN
-                "ESTUDIANTE_GRUPO" EG ON GH."ID_GRUPO" = EG."ID_GRUPO"
-            WHERE
-                H."SEMANA" = :semana
-            AND
-                H."SEMESTRE" = :semestre
-            AND
-                EG.ID_ESTUDIANTE = :p_id
-            GROUP BY
-                H."ID_HORARIO", H."DIA", H."HORA", H."SEMANA", H."SEMESTRE", H."INDICE_DIA"
-            ORDER BY
-                H."INDICE_DIA", H."HORA", H."SEMESTRE" ASC
-        """, {"p_id": user_id, "semana": semana, "semestre": semestre})
-        result = cursor.fetchall()
-        return result
+    if semana is None or semestre is None:
+        return []
+    # La de cada estudiante no se guarda, pero lleva ETag para responder 304 si no cambió
+    grilla = Referencia(serializar(horarios_semestre(semestre).grilla_estudiante(semana, user_id)))
+    return cache_referencias.responder(request, grilla)
+
+# Columnas del banco de preguntas (el frontend lee las filas por posición)
+COLUMNAS_BANCO = """
+    P.ID_PREGUNTA, P.TEXTO, P.OPCIONES, P.RESPUESTAS_CORRECTAS, P.ID_TIPO, P.TEMA,
+    CASE
+        WHEN P.PRIVACIDAD = 0 THEN 'PUBLICA'
+        WHEN P.PRIVACIDAD = 1 THEN 'PRIVADA'
+        ELSE 'DESCONOCIDA'
+    END AS PRIVACIDAD
+"""
 
 #Banco de preguntas disponibles para un profesor
+# Las públicas del tema (IX_PREGUNTA_TEMA_PRIVACIDAD) más las propias no públicas (IX_PREGUNTA_PROFESOR_TEMA);
+# el dueño es PREGUNTA.ID_PROFESOR, así cada pregunta sale una vez aunque esté en varios exámenes
+CONSULTA_BANCO_PREGUNTAS = registrar("/banco_preguntas", f"""
+    SELECT {COLUMNAS_BANCO}
+    FROM PREGUNTA P
+    WHERE P.TEMA = :tema AND P.PRIVACIDAD = 0
+    UNION ALL
+    SELECT {COLUMNAS_BANCO}
+    FROM PREGUNTA P
+    WHERE P.ID_PROFESOR = :id_profe AND P.TEMA = :tema AND P.PRIVACIDAD <> 0
+    ORDER BY TEXTO
+""", MUCHAS)
+
+CONSULTA_PREGUNTAS_PRIVADAS = registrar("/preguntas_privadas", f"""
+    SELECT {COLUMNAS_BANCO}
+    FROM PREGUNTA P
+    WHERE P.ID_PROFESOR = :id_profe AND P.TEMA = :tema
+    ORDER BY P.TEXTO
+""", MUCHAS)
+
+CONSULTA_MIS_PREGUNTAS = registrar("/mis_preguntas", f"""
+    SELECT {COLUMNAS_BANCO}
+    FROM PREGUNTA P
+    WHERE P.ID_PROFESOR = :id_profe
+    ORDER BY P.TEXTO
+""", MUCHAS)
+
 @app.get("/banco_preguntas/{id_profe}", tags=['Banco Preguntas'])
-def get_banco_preguntas(id_profe: int, tema: str = None, user_id: int = Depends(verificar_token)):
+def get_banco_preguntas(id_profe: int, tema: str = None, user_id: int = Depends(verificar_token), connection: oracledb.Connection = Depends(get_connection)):
     if tema is None:
         tema = "No definido"  # Valor predeterminado si no se proporciona un tema en la URL
 
-    with get_cursor() as cursor:
-        cursor.execute("""
-            SELECT
-                P.ID_PREGUNTA,
-                P.TEXTO,
-                P.OPCIONES,
-                P.RESPUESTAS_CORRECTAS,
-                P.ID_TIPO,
-                P.TEMA,
-                CASE
-                    WHEN P.PRIVACIDAD = 0 THEN 'PUBLICA'
-                    WHEN P.PRIVACIDAD = 1 THEN 'PRIVADA'
-                    ELSE 'DESCONOCIDA'
-                END AS PRIVACIDAD
-            FROM PREGUNTA P
-            INNER JOIN EXAMEN_PREGUNTA EP ON P.ID_PREGUNTA = EP.ID_PREGUNTA
-            INNER JOIN EXAMEN E ON EP.ID_EXAMEN = E.ID_EXAMEN
-            WHERE (P.TEMA = :tema AND P.PRIVACIDAD = 0)
-            OR (P.TEMA = :tema AND E.ID_PROFESOR = :id_profe )
-            ORDER BY P.TEXTO
-        """, tema=tema, id_profe=id_profe)
-        result = cursor.fetchall()
-        return result
+    return CONSULTA_BANCO_PREGUNTAS.ejecutar(connection, {"tema": tema, "id_profe": id_profe})
 
 
 #Preguntas privadas de un profesor por tema
 @app.get("/preguntas_privadas/{id_profe}", tags=['Banco Preguntas'])
-def get_banco_preguntas(id_profe: int, tema: str = None, user_id: int = Depends(verificar_token)):
+def get_banco_preguntas(id_profe: int, tema: str = None, user_id: int = Depends(verificar_token), connection: oracledb.Connection = Depends(get_connection)):
     if tema is None:
         tema = "No definido"  # Valor predeterminado si no se proporciona un tema en la URL
 
-    with get_cursor() as cursor:
-        cursor.execute("""
-            SELECT P.ID_PREGUNTA, P.TEXTO, P.OPCIONES, P.RESPUESTAS_CORRECTAS, P.ID_TIPO, P.TEMA,
-                CASE
-                    WHEN P.PRIVACIDAD = 0 THEN 'PUBLICA'
-                    WHEN P.PRIVACIDAD = 1 THEN 'PRIVADA'
-                    ELSE 'DESCONOCIDA'
-                END AS PRIVACIDAD
-            FROM PREGUNTA P
-            INNER JOIN EXAMEN_PREGUNTA EP ON P.ID_PREGUNTA = EP.ID_PREGUNTA
-            INNER JOIN EXAMEN E ON EP.ID_EXAMEN = E.ID_EXAMEN
-            WHERE (P.TEMA = :tema AND E.ID_PROFESOR = :id_profe )
-            ORDER BY P.TEXTO
-        """, tema=tema, id_profe=id_profe)
-        result = cursor.fetchall()
-        return result
+    return CONSULTA_PREGUNTAS_PRIVADAS.ejecutar(connection, {"tema": tema, "id_profe": id_profe})
 
 #Todas las preguntas privadas de un profesor
 @app.get("/mis_preguntas/{id_profe}", tags=['Banco Preguntas'])
-def get_banco_preguntas(id_profe: int, user_id: int = Depends(verificar_token)):
-
-    with get_cursor() as cursor:
-        cursor.execute("""
-            SELECT P.ID_PREGUNTA, P.TEXTO, P.OPCIONES, P.RESPUESTAS_CORRECTAS, P.ID_TIPO, P.TEMA,
-                CASE
-                    WHEN P.PRIVACIDAD = 0 THEN 'PUBLICA'
-                    WHEN P.PRIVACIDAD = 1 THEN 'PRIVADA'
-                    ELSE 'DESCONOCIDA'
-                END AS PRIVACIDAD
-            FROM PREGUNTA P
-            INNER JOIN EXAMEN_PREGUNTA EP ON P.ID_PREGUNTA = EP.ID_PREGUNTA
-            INNER JOIN EXAMEN E ON EP.ID_EXAMEN = E.ID_EXAMEN
-            WHERE E.ID_PROFESOR = :id_profe
-            ORDER BY P.TEXTO
-        """, id_profe=id_profe)
-        result = cursor.fetchall()
-        return result
+def get_banco_preguntas(id_profe: int, user_id: int = Depends(verificar_token), connection: oracledb.Connection = Depends(get_connection)):
+    return CONSULTA_MIS_PREGUNTAS.ejecutar(connection, {"id_profe": id_profe})
+
+# Búsqueda de texto en el banco de preguntas (TEXTO, OPCIONES y TEMA), ordenada por relevancia.
+# alcance: banco (públicas y las del profesor), mias o publicas. Las filas tienen la forma de
+# /banco_preguntas y el total de resultados va en el encabezado X-Total-Resultados.
+CONSULTA_PREGUNTAS_POR_ID = f"""
+    SELECT {COLUMNAS_BANCO}
+    FROM PREGUNTA P
+    WHERE P.ID_PREGUNTA IN (SELECT COLUMN_VALUE FROM TABLE(:ids))
+"""
+
+@app.get("/preguntas/buscar", tags=['Banco Preguntas'])
+def buscar_preguntas(response: Response, q: str, alcance: str = "banco", privacidad: int = None, tema: str = None, desde: int = 0, limite: int = 20, user_info: Tuple[int, bool] = Depends(verificar_token), connection: oracledb.Connection = Depends(get_connection)):
+    user_id, is_professor = user_info
+    # Las filas llevan RESPUESTAS_CORRECTAS: el banco no se muestra a estudiantes
+    if not is_professor:
+        raise HTTPException(status_code=403, detail="Solo los profesores pueden buscar en el banco de preguntas")
+    if alcance not in ALCANCES:
+        raise HTTPException(status_code=400, detail="alcance debe ser banco, mias o publicas")
+    if desde < 0 or not 1 <= limite <= LIMITE_BUSQUEDA:
+        raise HTTPException(status_code=400, detail=f"desde debe ser >= 0 y limite entre 1 y {LIMITE_BUSQUEDA}")
+    if not indice_preguntas.listo:
+        raise HTTPException(status_code=503, detail="El índice de búsqueda se está construyendo", headers={"Retry-After": "30"})
+    total, ids = indice_preguntas.buscar(q, user_id, alcance, privacidad, tema, desde, limite)
+    response.headers["X-Total-Resultados"] = str(total)
+    if not ids:
+        return []
+    with connection.cursor() as cursor:
+        cursor.execute(CONSULTA_PREGUNTAS_POR_ID, ids=connection.gettype("SYS.ODCINUMBERLIST").newobject(ids))
+        filas = {fila[0]: fila for fila in cursor.fetchall()}
+    # Mismo orden que el índice (por relevancia)
+    return [filas[i] for i in ids if i in filas]
 
 # Endpoint para almacenar la presentación del examen
+# (en modo diario responde 202 con la clave de idempotencia; el estado se consulta en /presentaciones/{clave})
 @app.post("/almacenar_presentacion_examen/", tags=['Presentación del Examen'])
-def almacenar_presentacion_examen(
+async def almacenar_presentacion_examen(
+    response: Response,
     p_id_estudiante: int,
     p_id_examen: int,
     p_fecha_presentacion: str,
     p_tiempo_tomado: str,
-    p_respuestas: str,
+    p_respuestas: str = None,
     p_direccion_ip: str = None,
+    p_respuestas_dadas: str = None,
+    idempotency_key: str = Header(None),
     user_info: Tuple[int, bool] = Depends(verificar_token)
 ):
     user_id, is_professor = user_info
     if is_professor:
         raise HTTPException(status_code=403, detail="Solo los estudiantes pueden presentar un examen")
+    if p_id_estudiante != user_id:
+        raise HTTPException(status_code=403, detail="Solo puedes presentar tus propios exámenes")
     try:
-        cursor = get_cursor()
-        v_id_presentacion_examen = cursor.callfunc('almacenar_presentacion_examen', int, [
-            p_id_estudiante,
-            p_id_examen,
-            p_fecha_presentacion,
-            p_tiempo_tomado,
-            p_direccion_ip,
-            p_respuestas
-        ])
-        connection.commit()
-        return {"message": "Presentación de examen almacenada correctamente", "id_presentacion_examen": v_id_presentacion_examen}
-    except cx_Oracle.Error as error:
-        return {"message": f"Error al almacenar la presentación del examen: {error}"}
-    finally:
-        cursor.close()
+        fecha_presentacion = datetime.fromisoformat(p_fecha_presentacion)
+        tiempo_tomado = leer_tiempo_tomado(p_tiempo_tomado)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="p_fecha_presentacion debe ser AAAA-MM-DD HH:MM:SS y p_tiempo_tomado HH:MM:SS o segundos")
+    if p_respuestas_dadas is not None:
+        try:
+            p_respuestas_dadas = normalizar_respuestas_dadas(p_respuestas_dadas)
+        except ValueError:
+            raise HTTPException(status_code=400, detail='p_respuestas_dadas debe ser un objeto JSON {"<id_pregunta>": "respuesta"}')
+
+    # El puntaje lo calcula siempre el servidor con las respuestas correctas actuales del examen
+    # (aquí en modo directo, en el despachador en modo diario); el cliente no lo envía
+    p_puntaje = None
+    if diario_presentaciones is None:
+        if p_respuestas_dadas:
+            examen = await cache_preguntas.obtener_async(p_id_examen, adquirir_conexion_async, liberar_conexion_async)
+            if examen.por_id:
+                puntajes, acertadas = examen.clave.calificar([p_respuestas_dadas], [p_id_estudiante])
+                p_puntaje, p_respuestas = float(puntajes[0]), acertadas[0]
+        connection = await adquirir_conexion_async()
+        cursor = connection.cursor()
+        try:
+            v_id_presentacion_examen = await cursor.callfunc('almacenar_presentacion_examen', int, [
+                p_id_estudiante,
+                p_id_examen,
+                fecha_presentacion,
+                p_puntaje,
+                tiempo_tomado,
+                p_direccion_ip,
+                p_respuestas,
+                p_respuestas_dadas
+            ])
+            await connection.commit()
+            cache_panel.invalidar([p_id_estudiante])
+            return {"message": "Presentación de examen almacenada correctamente", "id_presentacion_examen": v_id_presentacion_examen, "puntaje": p_puntaje}
+        except oracledb.Error as error:
+            return {"message": f"Error al almacenar la presentación del examen: {error}"}
+        finally:
+            cursor.close()
+            await liberar_conexion_async(connection)
+
+    clave = clave_idempotencia(p_id_estudiante, p_id_examen, fecha_presentacion.isoformat(), idempotency_key)
+    resultado = await diario_presentaciones.registrar(clave, {
+        "id_estudiante": p_id_estudiante,
+        "id_examen": p_id_examen,
+        "fecha_presentacion": fecha_presentacion.isoformat(),
+        "puntaje": p_puntaje,
+        "tiempo_tomado_s": tiempo_tomado.total_seconds(),
+        "direccion_ip": p_direccion_ip,
+        "respuestas": p_respuestas,
+        "respuestas_dadas": p_respuestas_dadas,
+    })
+    # El despachador vuelve a invalidar el panel cuando la guarda en Oracle
+    cache_panel.invalidar([p_id_estudiante])
+    if resultado["estado"] == "pendiente":
+        response.status_code = 202
+    return {"message": "Presentación de examen recibida correctamente", **resultado}
+
+# Estado de una presentación enviada en modo diario
+@app.get("/presentaciones/{clave}", tags=['Presentación del Examen'])
+def consultar_presentacion(clave: str, user_info: Tuple[int, bool] = Depends(verificar_token)):
+    if diario_presentaciones is None:
+        raise HTTPException(status_code=404, detail="La ingesta por diario no está activa")
+    user_id, is_professor = user_info
+    # Un estudiante solo ve las suyas; la de otro responde igual que una clave inexistente
+    resultado = diario_presentaciones.consultar(clave, None if is_professor else user_id)
+    if resultado is None:
+        raise HTTPException(status_code=404, detail="Presentación no encontrada")
+    return resultado
+
+# Lotes guardados por el despachador y presentaciones del diario por estado
+@app.get("/ingesta/estadisticas", tags=['home'])
+def obtener_estadisticas_ingesta(user_info: Tuple[int, bool] = Depends(verificar_token)):
+    if despachador_presentaciones is None:
+        return {"modo": INGESTA_MODO}
+    return {"modo": INGESTA_MODO, **despachador_presentaciones.estadisticas()}
 
 
 # Endpoint para crear un examen
@@ -690,18 +913,32 @@ def crear_examen(
     id_curso: int = Body(...),
     orden: str = Body(...),
     horario: str = Body(...),
-    user_info: Tuple[int, bool] = Depends(verificar_token)
+    permitir_conflictos: bool = Body(False),
+    user_info: Tuple[int, bool] = Depends(verificar_token),
+    connection: oracledb.Connection = Depends(get_connection)
 ):
     user_id, is_professor = user_info
     if not is_professor:
         raise HTTPException(status_code=403, detail="Solo los profesores pueden acceder a esta consulta.")
-    cursor = get_cursor()
+    try:
+        id_horario = int(horario)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="horario debe ser el ID de un horario")
+    # Grupos o estudiantes que ya tienen otro examen a esa hora (se lee el semestre de nuevo, no de la cache)
+    semestre = cache_horarios.semestre_de(connection, id_horario)
+    if semestre is None:
+        raise HTTPException(status_code=404, detail="El horario no existe")
+    conflictos = cache_horarios.cargar(connection, semestre, refrescar=True).conflictos(id_horario, tiempo_limite)
+    if conflictos["examenes"] and not permitir_conflictos:
+        raise HTTPException(status_code=409, detail={"mensaje": "El horario se cruza con otros exámenes", **conflictos})
+    cursor = connection.cursor()
     try:
         if is_professor:
             result = cursor.callfunc("agregar_examen", int, [nombre, descripcion, cantidad_preguntas, tiempo_limite, id_curso, user_id, orden])
-            cursor.execute("INSERT INTO EXAMEN_HORARIO (ID_EXAMEN, ID_HORARIO) VALUES (:id_examen, :id_horario)", id_examen=result, id_horario=horario)
+            cursor.execute("INSERT INTO EXAMEN_HORARIO (ID_EXAMEN, ID_HORARIO) VALUES (:id_examen, :id_horario)", id_examen=result, id_horario=id_horario)
             connection.commit()
-            return {"id_examen": result}
+            cache_horarios.invalidar(semestre)
+            return {"id_examen": result, "conflictos": conflictos}
         else :
             return {"ERROR": "Debes ser un profesor"}
     finally:
@@ -718,11 +955,14 @@ def actualizar_examen(
     id_curso: int = Body(...),
     id_profesor: int = Body(...),
     orden: str = Body(...),
-    user_id: int = Depends(verificar_token)
+    user_id: int = Depends(verificar_token),
+    connection: oracledb.Connection = Depends(get_connection)
 ):
-    cursor = get_cursor()
+    cursor = connection.cursor()
     try:
         result = cursor.callfunc("actualizar_examen", int, [id_examen, nombre, descripcion, cantidad_preguntas, tiempo_limite, id_curso, id_profesor, orden])
+        connection.commit()
+        cache_preguntas.invalidar_examen(id_examen)
         return {"filas_afectadas": result}
     finally:
         cursor.close()
@@ -731,14 +971,17 @@ def actualizar_examen(
 @app.delete("/examen/eliminar", tags=['Exámenes'])
 def eliminar_examen(
     id_examen: str = Body(...),
-    user_id: int = Depends(verificar_token)
+    user_id: int = Depends(verificar_token),
+    connection: oracledb.Connection = Depends(get_connection)
 ):
-    cursor = get_cursor()
+    cursor = connection.cursor()
     try:
         result = cursor.callfunc("eliminar_examen", int, [id_examen])
         if result == 0:
             raise HTTPException(status_code=400, detail="El examen no se puede eliminar porque ha sido presentado por un estudiante")
         else:
+            connection.commit()
+            cache_preguntas.invalidar_examen(int(id_examen))
             return {"mensaje": "Examen eliminado exitosamente"}
     finally:
         cursor.close()
@@ -752,18 +995,60 @@ def crear_pregunta(
     id_tipo: int = Body(...),
     tema: str = Body(None),
     privacidad: int = Body(0),
-    id_examen: int = Body(...), user_id: int = Depends(verificar_token)
+    id_examen: int = Body(...), user_info: Tuple[int, bool] = Depends(verificar_token),
+    connection: oracledb.Connection = Depends(get_connection)
 ):
-    cursor = get_cursor()
+    user_id, is_professor = user_info
+    # Quien la crea queda como dueño (PREGUNTA.ID_PROFESOR)
+    id_profesor = user_id if is_professor else None
+    cursor = connection.cursor()
     try:
-        id_pregunta = cursor.callfunc("insertar_pregunta", int, [texto, opciones, respuestas_correctas, id_tipo, tema, privacidad])
+        id_pregunta = cursor.callfunc("insertar_pregunta", int, [texto, opciones, respuestas_correctas, id_tipo, tema, privacidad, id_profesor])
         cursor.execute("INSERT INTO EXAMEN_PREGUNTA (ID_EXAMEN, ID_PREGUNTA) VALUES (:id_examen, :id_pregunta)", id_examen=id_examen, id_pregunta=id_pregunta)
         connection.commit()
+        cache_preguntas.invalidar_examen(id_examen)
+        indice_preguntas.actualizar(connection, [id_pregunta])
         return {"message": "Pregunta agregada exitosamente"}
     finally:
         cursor.close()
 
+# El índice de búsqueda lee con una conexión sincrónica
+def actualizar_indice_examen(id_examen: int):
+    connection = adquirir_conexion()
+    try:
+        indice_preguntas.actualizar_examen(connection, id_examen)
+    finally:
+        liberar_conexion(connection)
+
+# Endpoint para importar muchas preguntas a un examen (cuerpo CSV o JSON Lines, una pregunta por fila)
+CONSULTA_EXISTE_EXAMEN = registrar("/preguntas/importar (examen)", "SELECT COUNT(*) FROM EXAMEN WHERE ID_EXAMEN = :id_examen", FILA)
+
+@app.post("/preguntas/importar", tags=['Preguntas'])
+async def importar_preguntas_examen(
+    request: Request,
+    id_examen: int,
+    formato: str = "csv",
+    user_info: Tuple[int, bool] = Depends(verificar_token),
+    connection: oracledb.AsyncConnection = Depends(get_async_connection)
+):
+    user_id, is_professor = user_info
+    if not is_professor:
+        raise HTTPException(status_code=403, detail="Solo los profesores pueden importar preguntas")
+    if formato not in ("csv", "jsonl"):
+        raise HTTPException(status_code=400, detail="formato debe ser csv o jsonl")
+    (existe,) = await CONSULTA_EXISTE_EXAMEN.ejecutar_async(connection, {"id_examen": id_examen})
+    if existe == 0:
+        raise HTTPException(status_code=404, detail="El examen no existe")
+    resultado = await importar_preguntas(connection, request.stream(), formato, id_examen, user_id)
+    await connection.commit()
+    cache_preguntas.invalidar_examen(id_examen)
+    await run_in_threadpool(actualizar_indice_examen, id_examen)
+    return resultado
+
 # Endpoint para actualizar una pregunta
+CONSULTA_EXISTE_RELACION = registrar("/preguntas/actualizar (relación)",
+    "SELECT COUNT(*) FROM EXAMEN_PREGUNTA WHERE ID_EXAMEN = :id_examen AND ID_PREGUNTA = :id_pregunta", FILA)
+
 @app.put("/preguntas/actualizar/{id_pregunta}", tags=['Preguntas'])
 def actualizar_pregunta(
     id_pregunta: int,
@@ -774,35 +1059,40 @@ def actualizar_pregunta(
     tema: str = Body(None),
     privacidad: int = Body(0),
     id_examen: int = Body(...),
-    user_id: int = Depends(verificar_token)
+    user_id: int = Depends(verificar_token),
+    connection: oracledb.Connection = Depends(get_connection)
 ):
-    cursor = get_cursor()
+    cursor = connection.cursor()
     try:
         # Actualizar la pregunta
         cursor.callfunc("actualizar_pregunta", int, [id_pregunta, texto, opciones, respuestas_correctas, id_tipo, tema, privacidad])
-        connection.commit()
 
         # Verificar si la relación examen-pregunta ya existe
-        cursor.execute("SELECT COUNT(*) FROM EXAMEN_PREGUNTA WHERE ID_EXAMEN = :id_examen AND ID_PREGUNTA = :id_pregunta", id_examen=id_examen, id_pregunta=id_pregunta)
-        relacion_existente = cursor.fetchone()[0]
+        (relacion_existente,) = CONSULTA_EXISTE_RELACION.ejecutar(connection, {"id_examen": id_examen, "id_pregunta": id_pregunta})
 
         # Si la relación no existe, insertarla
         if relacion_existente == 0:
             cursor.execute("INSERT INTO EXAMEN_PREGUNTA (ID_EXAMEN, ID_PREGUNTA) VALUES (:id_examen, :id_pregunta)", id_examen=id_examen, id_pregunta=id_pregunta)
-            connection.commit()
 
+        # Los exámenes en cache que tienen la pregunta dejan de ser válidos (cuando ya se vea el cambio)
+        connection.commit()
+        cache_preguntas.invalidar_pregunta(id_pregunta)
+        cache_preguntas.invalidar_examen(id_examen)
+        indice_preguntas.actualizar(connection, [id_pregunta])
         return {"message": "Pregunta actualizada exitosamente"}
     finally:
         cursor.close()
 
 # Endpoint para actualizar la privacidad de una pregunta
 @app.put("/preguntas/actualizar-privacidad/{id_pregunta}", tags=['Preguntas'])
-def actualizar_privacidad_pregunta(id_pregunta: int, id_profesor: int, privacidad: int, user_id: int = Depends(verificar_token)):
-    cursor = get_cursor()
+def actualizar_privacidad_pregunta(id_pregunta: int, id_profesor: int, privacidad: int, user_id: int = Depends(verificar_token), connection: oracledb.Connection = Depends(get_connection)):
+    cursor = connection.cursor()
     try:
         result = cursor.callfunc("actualizar_privacidad_pregunta", int, [id_pregunta, id_profesor, privacidad])
         if result == 1:
             connection.commit()
+            cache_preguntas.invalidar_pregunta(id_pregunta)
+            indice_preguntas.actualizar(connection, [id_pregunta])
             return {"message": "Privacidad de la pregunta actualizada exitosamente"}
         else:
             return {"message": "No se puede cambiar la privacidad de la pregunta"}
@@ -811,12 +1101,14 @@ def actualizar_privacidad_pregunta(id_pregunta: int, id_profesor: int, privacida
 
 # Endpoint para eliminar una pregunta
 @app.delete("/preguntas/eliminar/{id_pregunta}", tags=['Preguntas'])
-def eliminar_pregunta(id_pregunta: int, user_id: int = Depends(verificar_token)):
-    cursor = get_cursor()
+def eliminar_pregunta(id_pregunta: int, user_id: int = Depends(verificar_token), connection: oracledb.Connection = Depends(get_connection)):
+    cursor = connection.cursor()
     try:
         result = cursor.callfunc("eliminar_pregunta", int, [id_pregunta])
         if result == 1:
             connection.commit()
+            cache_preguntas.invalidar_pregunta(id_pregunta)
+            indice_preguntas.actualizar(connection, [id_pregunta])
             return {"message": "Pregunta eliminada exitosamente"}
         else:
             return {"message": "No se puede eliminar la pregunta porque está asignada a uno o más exámenes"}
@@ -828,13 +1120,13 @@ def eliminar_pregunta(id_pregunta: int, user_id: int = Depends(verificar_token))
 def crear_estudiante(
     cedula: int = Body(...),
     p_nombre: str = Body(...),
-    clave: str = Body(...), user_id: int = Depends(verificar_token)
+    clave: str = Body(...), user_id: int = Depends(verificar_token),
+    connection: oracledb.Connection = Depends(get_connection)
 ):
-    cursor = get_cursor()
+    cursor = connection.cursor()
     try:
         result = cursor.callfunc("CREAR_ESTUDIANTE", bool, [cedula, p_nombre, clave])
         if result:
-            connection.commit()
             return {"message": "Estudiante creado exitosamente"}
         else:
             return {"message": "Ya existe un estudiante con la cédula proporcionada"}
@@ -846,13 +1138,13 @@ def crear_estudiante(
 def actualizar_estudiante(
     cedula: int,
     p_nombre: str = Body(...),
-    clave: str = Body(...), user_id: int = Depends(verificar_token)
+    clave: str = Body(...), user_id: int = Depends(verificar_token),
+    connection: oracledb.Connection = Depends(get_connection)
 ):
-    cursor = get_cursor()
+    cursor = connection.cursor()
     try:
         result = cursor.callfunc("ACTUALIZAR_ESTUDIANTE", bool, [cedula, p_nombre, clave])
         if result:
-            connection.commit()
             return {"message": "Estudiante actualizado exitosamente"}
         else:
             return {"message": "No se encontró el estudiante con la cédula proporcionada"}
@@ -863,13 +1155,13 @@ def actualizar_estudiante(
 @app.delete("/estudiantes/eliminar/{cedula}", tags=['Estudiantes'])
 def eliminar_estudiante(
     cedula: int,
-    user_id: int = Depends(verificar_token)
+    user_id: int = Depends(verificar_token),
+    connection: oracledb.Connection = Depends(get_connection)
 ):
-    cursor = get_cursor()
+    cursor = connection.cursor()
     try:
         result = cursor.callfunc("ELIMINAR_ESTUDIANTE", bool, [cedula])
         if result:
-            connection.commit()
             return {"message": "Estudiante eliminado exitosamente"}
         else:
             return {"message": "No se encontró el estudiante con la cédula proporcionada"}
@@ -881,13 +1173,13 @@ def eliminar_estudiante(
 def crear_grupo(
     grupo: int = Body(...),
     nombre_grupo: str = Body(...),
-    user_id: int = Depends(verificar_token)
+    user_id: int = Depends(verificar_token),
+    connection: oracledb.Connection = Depends(get_connection)
 ):
-    cursor = get_cursor()
+    cursor = connection.cursor()
     try:
         result = cursor.callfunc("CREAR_GRUPO", bool, [grupo, nombre_grupo])
         if result:
-            connection.commit()
             return {"message": "Grupo creado exitosamente"}
         else:
             return {"message": "Ya existe un grupo con el ID proporcionado"}
@@ -899,34 +1191,29 @@ def crear_grupo(
 def crear_estudiantes_a_grupo(
     grupo_id: int,
     estudiante_ids: List[int],
-    user_id: int = Depends(verificar_token)
+    user_id: int = Depends(verificar_token),
+    connection: oracledb.Connection = Depends(get_connection)
 ):
-    cursor = get_cursor()
-    try:
-        estudiantes_no_agregados = []
-        for estudiante_id in estudiante_ids:
-            result = cursor.callfunc("crear_ESTUDIANTES_GRUPO", str, [estudiante_id, grupo_id])
-            if result != 'Estudiante Agregado':
-                estudiantes_no_agregados.append(f"ID Estudiante: {estudiante_id} - {result}")
-
-        if len(estudiantes_no_agregados) == 0:
-            connection.commit()
-            return {"message": "Todos los estudiantes fueron agregados correctamente"}
-        else:
-            return {"message": "Algunos estudiantes no pudieron ser agregados", "estudiantes_no_agregados": estudiantes_no_agregados}
-    finally:
-        cursor.close()
+    estudiantes_no_agregados = inscribir_estudiantes(connection, grupo_id, estudiante_ids)
+    connection.commit()
+    cache_horarios.invalidar()
+    if len(estudiantes_no_agregados) == 0:
+        return {"message": "Todos los estudiantes fueron agregados correctamente"}
+    else:
+        return {"message": "Algunos estudiantes no pudieron ser agregados", "estudiantes_no_agregados": estudiantes_no_agregados}
 
 # Endpoint para crear estudiante a un grupo
 @app.post("/grupos/crear-estudiante", tags=['Grupos'])
 def crear_estudiantes_grupo(
     estudiante_id: int = Body(...),
-    grupo_id: int = Body(...), user_id: int = Depends(verificar_token)
+    grupo_id: int = Body(...), user_id: int = Depends(verificar_token),
+    connection: oracledb.Connection = Depends(get_connection)
 ):
-    cursor = get_cursor()
+    cursor = connection.cursor()
     try:
         message = cursor.callfunc("crear_ESTUDIANTES_GRUPO", str, [estudiante_id, grupo_id])
         connection.commit()
+        cache_horarios.invalidar()
         return {"message": message}
     finally:
         cursor.close()
@@ -935,13 +1222,13 @@ def crear_estudiantes_grupo(
 @app.put("/grupos/actualizar/{grupo}", tags=['Grupos'])
 def actualizar_grupo(
     grupo: int,
-    nombre_grupo: str = Body(...), user_id: int = Depends(verificar_token)
+    nombre_grupo: str = Body(...), user_id: int = Depends(verificar_token),
+    connection: oracledb.Connection = Depends(get_connection)
 ):
-    cursor = get_cursor()
+    cursor = connection.cursor()
     try:
         result = cursor.callfunc("ACTUALIZAR_GRUPO", bool, [grupo, nombre_grupo])
         if result:
-            connection.commit()
             return {"message": "Grupo actualizado exitosamente"}
         else:
             return {"message": "No se encontró el grupo con el ID proporcionado"}
@@ -952,13 +1239,15 @@ def actualizar_grupo(
 @app.delete("/grupos/eliminar/{grupo}", tags=['Grupos'])
 def eliminar_grupo(
     grupo: int,
-    user_id: int = Depends(verificar_token)
+    user_id: int = Depends(verificar_token),
+    connection: oracledb.Connection = Depends(get_connection)
 ):
-    cursor = get_cursor()
+    cursor = connection.cursor()
     try:
         result = cursor.callfunc("ELIMINAR_GRUPO", bool, [grupo])
         if result:
             connection.commit()
+            cache_horarios.invalidar()
             return {"message": "Grupo eliminado exitosamente"}
         else:
             return {"message": "No se encontró el grupo con el ID proporcionado"}
@@ -971,13 +1260,13 @@ def crear_profesor(
     cedula: int = Body(...),
     p_nombre: str = Body(...),
     clave: str = Body(...),
-    user_id: int = Depends(verificar_token)
+    user_id: int = Depends(verificar_token),
+    connection: oracledb.Connection = Depends(get_connection)
 ):
-    cursor = get_cursor()
+    cursor = connection.cursor()
     try:
         result = cursor.callfunc("CREAR_PROFESOR", bool, [cedula, p_nombre, clave])
         if result:
-            connection.commit()
             return {"message": "Profesor creado exitosamente"}
         else:
             return {"message": "Ya existe un profesor con la cédula proporcionada"}
@@ -989,13 +1278,13 @@ def crear_profesor(
 def actualizar_profesor(
     cedula: int,
     p_nombre: str = Body(...),
-    clave: str = Body(...), user_id: int = Depends(verificar_token)
+    clave: str = Body(...), user_id: int = Depends(verificar_token),
+    connection: oracledb.Connection = Depends(get_connection)
 ):
-    cursor = get_cursor()
+    cursor = connection.cursor()
     try:
         result = cursor.callfunc("ACTUALIZAR_PROFESOR", bool, [cedula, p_nombre, clave])
         if result:
-            connection.commit()
             return {"message": "Profesor actualizado exitosamente"}
         else:
             return {"message": "No se encontró el profesor con la cédula proporcionada"}
@@ -1006,13 +1295,13 @@ def actualizar_profesor(
 @app.delete("/profesores/eliminar/{cedula}", tags=['Profesores'])
 def eliminar_profesor(
     cedula: int,
-    user_id: int = Depends(verificar_token)
+    user_id: int = Depends(verificar_token),
+    connection: oracledb.Connection = Depends(get_connection)
 ):
-    cursor = get_cursor()
+    cursor = connection.cursor()
     try:
         result = cursor.callfunc("ELIMINAR_PROFESOR", bool, [cedula])
         if result:
-            connection.commit()
             return {"message": "Profesor eliminado exitosamente"}
         else:
             return {"message": "No se encontró el profesor con la cédula proporcionada"}
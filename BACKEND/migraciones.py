@@ -0,0 +1,220 @@
+import argparse
+import hashlib
+import logging
+import os
+import re
+import sys
+from fastapi import HTTPException
+from db import adquirir_conexion, liberar_conexion
+
+# Migraciones versionadas del esquema (BD/migraciones/V<numero>__<descripcion>.sql) y
+# verificación de los índices que necesitan las consultas frecuentes.
+#
+#   python migraciones.py            aplica las migraciones pendientes
+#   python migraciones.py --estado   muestra las aplicadas y las pendientes
+
+logger = logging.getLogger("uvicorn.error")
+
+DIRECTORIO = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "BD", "migraciones")
+PATRON_ARCHIVO = re.compile(r"^V(\d+)__(.+)\.sql$")
+
+CREAR_TABLA_MIGRACIONES = """
+    BEGIN
+        EXECUTE IMMEDIATE 'CREATE TABLE SCHEMA_MIGRACIONES (
+            VERSION NUMBER PRIMARY KEY,
+            DESCRIPCION VARCHAR2(200),
+            CHECKSUM VARCHAR2(64),
+            APLICADA DATE DEFAULT SYSDATE)';
+    EXCEPTION
+        WHEN OTHERS THEN
+            IF SQLCODE != -955 THEN
+                RAISE;
+            END IF;
+    END;
+"""
+
+# Sentencias que terminan con "/" en una línea sola en lugar de ";"
+INICIO_PLSQL = re.compile(
+    r"^(BEGIN|DECLARE|CREATE\s+(OR\s+REPLACE\s+)?(PROCEDURE|FUNCTION|TRIGGER|PACKAGE|TYPE))\b", re.IGNORECASE
+)
+
+# (tabla, columnas iniciales) que debe cubrir un índice válido para que la app atienda con buen rendimiento
+INDICES_REQUERIDOS = [
+    ("ESTUDIANTE", ("ID_ESTUDIANTE",)),
+    ("PROFESOR", ("ID_PROFESOR",)),
+    ("PRESENTACION_EXAMEN", ("ID_PRESENTACION_EXAMEN",)),
+    ("PRESENTACION_EXAMEN", ("ID_ESTUDIANTE", "ID_EXAMEN")),
+    ("ESTUDIANTE_GRUPO", ("ID_GRUPO",)),
+    ("EXAMEN_HORARIO", ("ID_HORARIO",)),
+    ("EXAMEN", ("ID_PROFESOR",)),
+    ("HORARIO", ("SEMESTRE", "SEMANA")),
+    ("PREGUNTA", ("TEMA", "PRIVACIDAD")),
+    ("PREGUNTA", ("ID_PROFESOR", "TEMA", "PRIVACIDAD")),
+    ("EXAMEN", ("ID_CURSO",)),
+    ("UNIDAD_DE_CURSO", ("ID_CURSO",)),
+    ("CONTENIDO_DE_UNIDAD", ("ID_UNIDAD",)),
+]
+
+CONSULTA_INDICES = """
+    SELECT i.TABLE_NAME,
+        i.INDEX_NAME,
+        i.STATUS,
+        LISTAGG(c.COLUMN_NAME, ',') WITHIN GROUP (ORDER BY c.COLUMN_POSITION) AS COLUMNAS,
+        (SELECT COUNT(*) FROM USER_IND_PARTITIONS p
+         WHERE p.INDEX_NAME = i.INDEX_NAME AND p.STATUS = 'UNUSABLE') AS PARTICIONES_INUTILIZABLES
+    FROM USER_INDEXES i
+    JOIN USER_IND_COLUMNS c ON c.INDEX_NAME = i.INDEX_NAME
+    WHERE i.TABLE_NAME IN (SELECT COLUMN_VALUE FROM TABLE(:tablas))
+    GROUP BY i.TABLE_NAME, i.INDEX_NAME, i.STATUS
+"""
+
+
+def leer_migraciones(directorio: str = DIRECTORIO) -> list:
+    migraciones = []
+    for archivo in os.listdir(directorio):
+        coincidencia = PATRON_ARCHIVO.match(archivo)
+        if coincidencia is None:
+            continue
+        with open(os.path.join(directorio, archivo), encoding="utf-8") as f:
+            texto = f.read()
+        migraciones.append({
+            "version": int(coincidencia.group(1)),
+            "descripcion": coincidencia.group(2).replace("_", " "),
+            "checksum": hashlib.sha256(texto.encode()).hexdigest(),
+            "texto": texto,
+        })
+    migraciones.sort(key=lambda m: m["version"])
+    versiones = [m["version"] for m in migraciones]
+    if len(versiones) != len(set(versiones)):
+        raise ValueError("Hay dos migraciones con la misma versión")
+    return migraciones
+
+
+# Divide un script al estilo SQL*Plus: SQL termina en ";" y los bloques PL/SQL en "/"
+def dividir_sentencias(texto: str) -> list:
+    sentencias, actual, plsql = [], [], False
+    for linea in texto.splitlines():
+        limpia = linea.strip()
+        if not actual:
+            if not limpia or limpia.startswith("--"):
+                continue
+            plsql = bool(INICIO_PLSQL.match(limpia))
+        if plsql:
+            if limpia == "/":
+                sentencias.append("\n".join(actual))
+                actual = []
+            else:
+                actual.append(linea)
+        elif limpia.endswith(";"):
+            actual.append(linea.rstrip()[:-1])
+            sentencias.append("\n".join(actual))
+            actual = []
+        else:
+            actual.append(linea)
+    if any(l.strip() for l in actual):
+        sentencias.append("\n".join(actual))
+    return sentencias
+
+
+def migraciones_aplicadas(connection) -> dict:
+    with connection.cursor() as cursor:
+        cursor.execute(CREAR_TABLA_MIGRACIONES)
+        cursor.execute("SELECT VERSION, CHECKSUM FROM SCHEMA_MIGRACIONES")
+        return dict(cursor.fetchall())
+
+
+def aplicar_pendientes(connection, directorio: str = DIRECTORIO) -> list:
+    aplicadas = migraciones_aplicadas(connection)
+    nuevas = []
+    for migracion in leer_migraciones(directorio):
+        version = migracion["version"]
+        if version in aplicadas:
+            if aplicadas[version] != migracion["checksum"]:
+                logger.warning("La migración V%03d cambió después de aplicarse", version)
+            continue
+        with connection.cursor() as cursor:
+            for sentencia in dividir_sentencias(migracion["texto"]):
+                cursor.execute(sentencia)
+            cursor.execute(
+                "INSERT INTO SCHEMA_MIGRACIONES (VERSION, DESCRIPCION, CHECKSUM) VALUES (:1, :2, :3)",
+                [version, migracion["descripcion"], migracion["checksum"]],
+            )
+        connection.commit()
+        nuevas.append(version)
+    return nuevas
+
+
+# Devuelve la lista de problemas (vacía si todos los índices requeridos existen y están utilizables)
+def verificar_indices(connection) -> list:
+    tablas = sorted({tabla for tabla, _ in INDICES_REQUERIDOS})
+    lista = connection.gettype("SYS.ODCIVARCHAR2LIST").newobject(tablas)
+    with connection.cursor() as cursor:
+        cursor.execute(CONSULTA_INDICES, tablas=lista)
+        indices = cursor.fetchall()
+
+    problemas = []
+    for tabla, nombre, estado, columnas, particiones in indices:
+        if estado == "UNUSABLE" or particiones:
+            problemas.append(f"El índice {nombre} de {tabla} está UNUSABLE")
+    for tabla, requeridas in INDICES_REQUERIDOS:
+        candidatos = [
+            (nombre, estado == "UNUSABLE" or particiones > 0)
+            for t, nombre, estado, columnas, particiones in indices
+            if t == tabla and tuple(columnas.split(","))[:len(requeridas)] == requeridas
+        ]
+        if not candidatos:
+            problemas.append(f"Falta un índice en {tabla} ({', '.join(requeridas)})")
+        elif all(inutilizable for _, inutilizable in candidatos):
+            problemas.append(f"Ningún índice utilizable cubre {tabla} ({', '.join(requeridas)})")
+    return problemas
+
+
+# Verificación al arrancar la app según INDICES_AL_INICIAR:
+#   advertir (por defecto) registra los problemas y sigue, exigir no deja arrancar, omitir no verifica
+def comprobar_indices_al_iniciar():
+    modo = os.getenv("INDICES_AL_INICIAR", "advertir")
+    if modo == "omitir":
+        return
+    try:
+        connection = adquirir_conexion()
+    except HTTPException:
+        if modo == "exigir":
+            raise RuntimeError("No se pudo verificar los índices: la base de datos no responde")
+        logger.warning("No se pudo verificar los índices: la base de datos no responde")
+        return
+    try:
+        problemas = verificar_indices(connection)
+    finally:
+        liberar_conexion(connection)
+    for problema in problemas:
+        logger.warning(problema)
+    if problemas and modo == "exigir":
+        raise RuntimeError("Índices requeridos ausentes o UNUSABLE; ejecute python migraciones.py")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--estado", action="store_true")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+
+    connection = adquirir_conexion()
+    try:
+        if args.estado:
+            aplicadas = migraciones_aplicadas(connection)
+            for migracion in leer_migraciones():
+                marca = "aplicada" if migracion["version"] in aplicadas else "pendiente"
+                print(f"V{migracion['version']:03d} {migracion['descripcion']}: {marca}")
+        else:
+            nuevas = aplicar_pendientes(connection)
+            print(f"Migraciones aplicadas: {', '.join(f'V{v:03d}' for v in nuevas) or 'ninguna'}")
+        problemas = verificar_indices(connection)
+        for problema in problemas:
+            print(problema)
+    finally:
+        liberar_conexion(connection)
+    sys.exit(1 if problemas else 0)
+
+
+if __name__ == "__main__":
+    main()
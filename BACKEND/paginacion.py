@@ -0,0 +1,161 @@
+import base64
+import binascii
+import json
+import time
+from functools import partial
+from fastapi import HTTPException
+from db import adquirir_conexion, liberar_conexion
+from serializacion import RespuestaStream, a_ndjson, manejador_tipos, responder_json
+from consultas import REPORTE, registrar
+
+# Paginación por clave (keyset) y modo streaming para los reportes.
+# Cada reporte declara su consulta base, las columnas que devuelve y las columnas clave que
+# definen un orden total; la página siguiente se pide con el cursor de la última fila vista,
+# así Oracle no tiene que recorrer ni descartar las filas de las páginas anteriores.
+# Las filas se escriben en JSON con serializacion.py directamente desde las tuplas del cursor.
+
+LIMITE_MAXIMO = 10000
+
+
+class ConsultaPaginada:
+    # Con nombre se registra en consultas.py para llevar sus contadores (perfil REPORTE sin límite)
+    def __init__(self, sql: str, columnas: list, claves: list, nombre: str = None):
+        self.sql = sql
+        self.columnas = columnas
+        self.claves = claves
+        # Las claves que no son columnas del reporte se agregan al final del SELECT
+        self.seleccion = columnas + [c for c in claves if c not in columnas]
+        self.posiciones_clave = [self.seleccion.index(c) for c in claves]
+        # Sin claves extra las filas del cursor ya son las del reporte
+        self.recortar = len(self.seleccion) != len(columnas)
+        self.encabezado_columnas = ",".join(columnas)
+        self.registro = registrar(nombre, sql, REPORTE) if nombre else None
+
+    def contar(self, filas: int, segundos: float, viajes: int = None):
+        if self.registro is not None:
+            self.registro.contar(filas, segundos, viajes=viajes)
+
+
+def codificar_cursor(valores) -> str:
+    return base64.urlsafe_b64encode(json.dumps(list(valores)).encode()).decode()
+
+
+def decodificar_cursor(token: str, cantidad: int) -> list:
+    try:
+        valores = json.loads(base64.urlsafe_b64decode(token.encode()))
+    except (binascii.Error, ValueError):
+        raise HTTPException(status_code=400, detail="Cursor de paginación inválido")
+    if not isinstance(valores, list) or len(valores) != cantidad:
+        raise HTTPException(status_code=400, detail="Cursor de paginación inválido")
+    return valores
+
+
+# (k0 > :k0) OR (k0 = :k0 AND k1 > :k1) OR ...  (Oracle no compara tuplas con >)
+# Las claves se ordenan con NULLS LAST: después de un valor vienen los mayores y los NULL, y después
+# de un NULL solo los que empatan en las claves anteriores. Un NULL del cursor no se envía como bind.
+def _despues_de(claves: list, valores: list) -> str:
+    condiciones = []
+    for i, clave in enumerate(claves):
+        if valores[i] is None:
+            continue
+        iguales = [f"{claves[j]} IS NULL" if valores[j] is None else f"{claves[j]} = :k{j}" for j in range(i)]
+        condiciones.append("(" + " AND ".join(iguales + [f"({clave} > :k{i} OR {clave} IS NULL)"]) + ")")
+    return " OR ".join(condiciones) or "1 = 0"
+
+
+def _orden(claves: list) -> str:
+    return ", ".join(f"{clave} NULLS LAST" for clave in claves)
+
+
+def _armar_sql(consulta: ConsultaPaginada, params: dict, cursor: str = None, limite: int = None):
+    params = dict(params)
+    sql = f"SELECT {', '.join(consulta.seleccion)} FROM ({consulta.sql})"
+    if cursor is not None:
+        valores = decodificar_cursor(cursor, len(consulta.claves))
+        for i, valor in enumerate(valores):
+            if valor is not None:
+                params[f"k{i}"] = valor
+        sql += f" WHERE {_despues_de(consulta.claves, valores)}"
+    sql += f" ORDER BY {_orden(consulta.claves)}"
+    if limite is not None:
+        sql += " FETCH FIRST :limite ROWS ONLY"
+        params["limite"] = limite
+    return sql, params
+
+
+# Devuelve (filas, cursor_siguiente); sin límite devuelve todo el reporte y cursor None
+def paginar(connection, consulta: ConsultaPaginada, params: dict, limite: int = None, cursor: str = None):
+    if limite is not None and not 1 <= limite <= LIMITE_MAXIMO:
+        raise HTTPException(status_code=400, detail=f"limite debe estar entre 1 y {LIMITE_MAXIMO}")
+    sql, params = _armar_sql(consulta, params, cursor, limite)
+    n = len(consulta.columnas)
+    inicio = time.perf_counter()
+    with connection.cursor() as cur:
+        cur.outputtypehandler = manejador_tipos
+        if limite is not None:
+            # La página completa llega en el viaje del execute
+            cur.arraysize = limite
+            cur.prefetchrows = limite + 1
+        else:
+            cur.arraysize = REPORTE.arraysize
+            cur.prefetchrows = REPORTE.prefetchrows
+        cur.execute(sql, params)
+        filas = cur.fetchall()
+    consulta.contar(len(filas), time.perf_counter() - inicio, 1 if limite is not None else None)
+    siguiente = None
+    if limite is not None and len(filas) == limite:
+        siguiente = codificar_cursor([filas[-1][i] for i in consulta.posiciones_clave])
+    if consulta.recortar:
+        filas = [fila[:n] for fila in filas]
+    return filas, siguiente
+
+
+def _ndjson(connection, consulta: ConsultaPaginada, sql: str, params: dict):
+    n = len(consulta.columnas)
+    inicio = time.perf_counter()
+    total = 0
+    with connection.cursor() as cur:
+        cur.outputtypehandler = manejador_tipos
+        cur.arraysize = REPORTE.arraysize
+        cur.prefetchrows = REPORTE.prefetchrows
+        cur.execute(sql, params)
+        while True:
+            filas = cur.fetchmany()
+            if not filas:
+                break
+            total += len(filas)
+            yield a_ndjson([fila[:n] for fila in filas] if consulta.recortar else filas)
+    consulta.contar(total, time.perf_counter() - inicio)
+
+
+# Escribe las filas como NDJSON a medida que llegan de Oracle, con su propia conexión del pool
+# (RespuestaStream la devuelve al terminar el envío)
+def stream_reporte(consulta: ConsultaPaginada, params: dict, cursor: str = None) -> RespuestaStream:
+    sql, params = _armar_sql(consulta, params, cursor)
+    connection = adquirir_conexion()
+    return RespuestaStream(
+        _ndjson(connection, consulta, sql, params),
+        partial(liberar_conexion, connection),
+        media_type="application/x-ndjson",
+        headers={"X-Columnas": consulta.encabezado_columnas},
+    )
+
+
+# Respuesta común de los reportes: completo (como antes), por páginas o en streaming.
+# El cursor de la página siguiente va en el encabezado X-Siguiente-Cursor y los nombres de las columnas
+# en X-Columnas, para no cambiar el cuerpo (el frontend lee las filas por posición).
+# Los reportes no toman la conexión de la petición: la página se lee con una conexión que se devuelve
+# al terminar la consulta y el streaming usa la suya hasta terminar el envío.
+def responder_reporte(consulta: ConsultaPaginada, params: dict,
+                      limite: int = None, cursor: str = None, stream: bool = False):
+    if stream:
+        return stream_reporte(consulta, params, cursor)
+    connection = adquirir_conexion()
+    try:
+        filas, siguiente = paginar(connection, consulta, params, limite, cursor)
+    finally:
+        liberar_conexion(connection)
+    headers = {"X-Columnas": consulta.encabezado_columnas}
+    if siguiente is not None:
+        headers["X-Siguiente-Cursor"] = siguiente
+    return responder_json(filas, headers)
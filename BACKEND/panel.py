@@ -0,0 +1,171 @@
+import asyncio
+import os
+import threading
+import time
+from collections import OrderedDict
+from contenidos import CONSULTA_CONTENIDOS_GRUPOS, CONSULTA_EXAMENES_GRUPOS, armar_arbol
+
+# Panel del estudiante (/mi-panel): lo que la página de inicio pedía en cuatro peticiones
+# (/examenes-asignados, /obtener-notas, /contenidos-estudiante-notas, /estudiante_horarios).
+# Los grupos del estudiante se leen una vez y las consultas que dependen de ellos van en paralelo,
+# cada una con su conexión del pool asíncrono, junto con las notas. El resultado se guarda unos
+# segundos por estudiante (PANEL_TTL_S) y se invalida cuando el estudiante envía una presentación.
+
+TTL_S = float(os.getenv("PANEL_TTL_S", "30"))
+CAPACIDAD = int(os.getenv("PANEL_CAPACIDAD", "5000"))
+
+CONSULTA_GRUPOS = "SELECT EG.ID_GRUPO FROM ESTUDIANTE_GRUPO EG WHERE EG.ID_ESTUDIANTE = :p_id"
+
+# Mismas filas que CONSULTA_EXAMENES_ASIGNADOS de main.py, desde los grupos ya leídos
+CONSULTA_EXAMENES_ASIGNADOS = """
+    SELECT
+        E.ID_EXAMEN,
+        E.NOMBRE,
+        E.DESCRIPCION,
+        E.CANTIDAD_DE_PREGUNTAS,
+        E.TIEMPO_LIMITE,
+        E.ID_CURSO,
+        E.ORDEN
+    FROM
+        EXAMEN E
+    INNER JOIN
+        EXAMEN_HORARIO EH ON E.ID_EXAMEN = EH.ID_EXAMEN
+    INNER JOIN
+        GRUPO_HORARIO GH ON GH.ID_HORARIO = EH.ID_HORARIO
+    WHERE
+        GH.ID_GRUPO IN (SELECT COLUMN_VALUE FROM TABLE(:grupos))
+        AND NOT EXISTS (
+            SELECT 1 FROM PRESENTACION_EXAMEN PE WHERE PE.ID_EXAMEN = E.ID_EXAMEN AND PE.ID_ESTUDIANTE = :p_id
+        )
+"""
+
+CONSULTA_NOTAS = """
+    SELECT
+        PE.PUNTAJE,
+        E.NOMBRE,
+        E.DESCRIPCION,
+        E.CANTIDAD_DE_PREGUNTAS,
+        C.NOMBRE,
+        P.NOMBRE
+    FROM
+        PRESENTACION_EXAMEN PE
+    INNER JOIN
+        EXAMEN E ON E.ID_EXAMEN = PE.ID_EXAMEN
+    INNER JOIN
+        PROFESOR P ON E.ID_PROFESOR = P.ID_PROFESOR
+    LEFT JOIN
+        CURSO C ON C.ID_CURSO = E.ID_CURSO
+    WHERE
+        ID_ESTUDIANTE = :p_id
+"""
+
+
+class PanelEstudiante:
+    __slots__ = ("grupos", "examenes_asignados", "notas", "contenidos", "vence")
+
+    def __init__(self, grupos, examenes_asignados, notas, contenidos, vence: float):
+        self.grupos = grupos
+        self.examenes_asignados = examenes_asignados
+        self.notas = notas
+        self.contenidos = contenidos
+        self.vence = vence
+
+    def respuesta(self) -> dict:
+        return {
+            "grupos": self.grupos,
+            "examenes_asignados": self.examenes_asignados,
+            "notas": self.notas,
+            "contenidos": self.contenidos,
+        }
+
+
+# Una consulta con su propia conexión, para correr varias a la vez
+async def _consultar(adquirir, liberar, sql: str, parametros: dict, lista=None) -> list:
+    connection = await adquirir()
+    try:
+        if lista is not None:
+            tipo = await connection.gettype("SYS.ODCINUMBERLIST")
+            parametros = {**parametros, "grupos": tipo.newobject(lista)}
+        with connection.cursor() as cursor:
+            await cursor.execute(sql, parametros)
+            return await cursor.fetchall()
+    finally:
+        await liberar(connection)
+
+
+async def _segun_grupos(adquirir, liberar, id_estudiante: int):
+    grupos = [fila[0] for fila in await _consultar(adquirir, liberar, CONSULTA_GRUPOS, {"p_id": id_estudiante})]
+    if not grupos:
+        return grupos, [], []
+    examenes, contenidos, examenes_curso = await asyncio.gather(
+        _consultar(adquirir, liberar, CONSULTA_EXAMENES_ASIGNADOS, {"p_id": id_estudiante}, grupos),
+        _consultar(adquirir, liberar, CONSULTA_CONTENIDOS_GRUPOS, {}, grupos),
+        _consultar(adquirir, liberar, CONSULTA_EXAMENES_GRUPOS, {}, grupos),
+    )
+    return grupos, examenes, armar_arbol(contenidos, examenes_curso)
+
+
+class CachePanel:
+    def __init__(self, capacidad: int, ttl_s: float):
+        self._capacidad = capacidad
+        self._ttl_s = ttl_s
+        self._entradas = OrderedDict()
+        self._lock = threading.Lock()
+        # Invalidaciones por estudiante: una lectura que empezó antes no se guarda
+        self._generaciones = {}
+        self.aciertos = 0
+        self.fallos = 0
+        self.lecturas = 0
+
+    def obtener(self, id_estudiante: int):
+        with self._lock:
+            entrada = self._entradas.get(id_estudiante)
+            if entrada is not None and entrada.vence <= time.monotonic():
+                del self._entradas[id_estudiante]
+                entrada = None
+            if entrada is None:
+                self.fallos += 1
+                return None
+            self._entradas.move_to_end(id_estudiante)
+            self.aciertos += 1
+            return entrada
+
+    async def obtener_async(self, id_estudiante: int, adquirir, liberar) -> PanelEstudiante:
+        entrada = self.obtener(id_estudiante)
+        if entrada is not None:
+            return entrada
+        generacion = self._generaciones.get(id_estudiante, 0)
+        (grupos, examenes, contenidos), notas = await asyncio.gather(
+            _segun_grupos(adquirir, liberar, id_estudiante),
+            _consultar(adquirir, liberar, CONSULTA_NOTAS, {"p_id": id_estudiante}),
+        )
+        entrada = PanelEstudiante(grupos, examenes, notas, contenidos, time.monotonic() + self._ttl_s)
+        with self._lock:
+            self.lecturas += 1
+            if generacion == self._generaciones.get(id_estudiante, 0):
+                self._entradas[id_estudiante] = entrada
+                self._entradas.move_to_end(id_estudiante)
+                while len(self._entradas) > self._capacidad:
+                    self._entradas.popitem(last=False)
+        return entrada
+
+    def invalidar(self, estudiantes):
+        with self._lock:
+            for id_estudiante in estudiantes:
+                self._generaciones[id_estudiante] = self._generaciones.get(id_estudiante, 0) + 1
+                self._entradas.pop(id_estudiante, None)
+
+    def estadisticas(self):
+        with self._lock:
+            consultas = self.aciertos + self.fallos
+            return {
+                "entradas": len(self._entradas),
+                "capacidad": self._capacidad,
+                "aciertos": self.aciertos,
+                "fallos": self.fallos,
+                "lecturas": self.lecturas,
+                "tasa_aciertos": self.aciertos / consultas if consultas else 0.0,
+            }
+
+
+cache_panel = CachePanel(CAPACIDAD, TTL_S)
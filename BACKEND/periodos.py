@@ -0,0 +1,34 @@
+import re
+from datetime import date, datetime
+from fastapi import HTTPException
+
+# Semestres académicos (AAAA-1: enero a junio, AAAA-2: julio a diciembre), iguales a las particiones
+# de PRESENTACION_EXAMEN (BD/migraciones/V006). Filtrar por el rango de fechas del semestre deja que
+# Oracle lea solo la partición de ese semestre.
+
+TODOS = "todos"
+PATRON_SEMESTRE = re.compile(r"^(\d{4})-([12])$")
+
+
+def semestre_actual(hoy: date = None) -> str:
+    hoy = hoy or date.today()
+    return f"{hoy.year}-{1 if hoy.month <= 6 else 2}"
+
+
+# [desde, hasta) del semestre
+def rango_semestre(semestre: str):
+    coincidencia = PATRON_SEMESTRE.match(semestre)
+    if coincidencia is None:
+        raise HTTPException(status_code=400, detail="semestre debe tener la forma AAAA-1 o AAAA-2")
+    anio, mitad = int(coincidencia.group(1)), int(coincidencia.group(2))
+    if mitad == 1:
+        return datetime(anio, 1, 1), datetime(anio, 7, 1)
+    return datetime(anio, 7, 1), datetime(anio + 1, 1, 1)
+
+
+# Condición sobre la columna de fecha y sus parámetros; None es el semestre actual y "todos" no filtra
+def filtro_semestre(columna: str, semestre: str = None):
+    if semestre == TODOS:
+        return "1 = 1", {}
+    desde, hasta = rango_semestre(semestre or semestre_actual())
+    return f"{columna} >= :desde AND {columna} < :hasta", {"desde": desde, "hasta": hasta}
@@ -0,0 +1,271 @@
+import asyncio
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+import numpy as np
+from calificacion import ClaveExamen
+from ensamblaje import armar
+
+# Preguntas de cada examen ya leídas de Oracle, en memoria.
+# Cuando un grupo presenta un examen todos los estudiantes piden las mismas preguntas casi a la vez:
+# la primera petición lee las filas (las demás esperan esa misma lectura) y las siguientes reciben el
+# JSON ya serializado. Cada entrada guarda también la clave de calificación del examen, las preguntas
+# del banco público que pueden completarlo (ensamblaje.py) y el JSON ya armado de cada estudiante.
+# Se invalida al modificar o eliminar una pregunta o el examen; el vencimiento (CACHE_PREGUNTAS_TTL_S)
+# acota lo que puede tardar otro worker de uvicorn en ver el cambio.
+
+# Mismas columnas y orden que SELECT P.* sobre PREGUNTA (el frontend lee las filas por posición).
+# RESPUESTAS_CORRECTAS se lee para la clave de calificación y el cuerpo del profesor; en el del
+# estudiante esa posición va vacía.
+COLUMNAS = "P.ID_PREGUNTA, P.TEXTO, P.OPCIONES, P.RESPUESTAS_CORRECTAS, P.ID_TIPO, P.TEMA, P.PRIVACIDAD"
+
+CONSULTA_PREGUNTAS_EXAMEN = f"""
+    SELECT {COLUMNAS}
+    FROM PREGUNTA P
+    INNER JOIN EXAMEN_PREGUNTA EP ON EP.ID_PREGUNTA = P.ID_PREGUNTA
+    WHERE EP.ID_EXAMEN = :p_id
+    ORDER BY P.ID_PREGUNTA
+"""
+
+CONSULTA_EXAMEN = "SELECT CANTIDAD_DE_PREGUNTAS, ORDEN FROM EXAMEN WHERE ID_EXAMEN = :p_id"
+
+# Preguntas públicas de los temas del examen que no están ya en el examen
+CONSULTA_BANCO = f"""
+    SELECT {COLUMNAS}
+    FROM PREGUNTA P
+    WHERE P.PRIVACIDAD = 0
+    AND P.TEMA IN (SELECT COLUMN_VALUE FROM TABLE(:temas))
+    AND NOT EXISTS (
+        SELECT 1 FROM EXAMEN_PREGUNTA EP WHERE EP.ID_EXAMEN = :p_id AND EP.ID_PREGUNTA = P.ID_PREGUNTA
+    )
+    ORDER BY P.TEMA, P.ID_PREGUNTA
+"""
+
+
+def _partir(texto):
+    return None if texto is None else tuple(texto.split(","))
+
+
+def _unir(partes):
+    return None if partes is None else ",".join(partes)
+
+
+# Fila de PREGUNTA como la ve el estudiante: con las opciones ya separadas y sin las respuestas correctas
+class Pregunta:
+    __slots__ = ("id_pregunta", "texto", "opciones", "id_tipo", "tema", "privacidad")
+
+    def __init__(self, fila):
+        self.id_pregunta, self.texto, opciones, _, self.id_tipo, self.tema, self.privacidad = fila
+        self.opciones = _partir(opciones)
+
+    # "" en lugar de las respuestas correctas: el frontend hace split(",") sobre esa posición
+    def fila(self) -> list:
+        return [
+            self.id_pregunta, self.texto, _unir(self.opciones), "",
+            self.id_tipo, self.tema, self.privacidad,
+        ]
+
+
+# Igual que el JSONResponse de FastAPI
+def _serializar(filas) -> bytes:
+    return json.dumps(
+        list(filas), ensure_ascii=False, allow_nan=False, separators=(",", ":")
+    ).encode("utf-8")
+
+
+# Hay que leer el banco solo si las preguntas del examen no alcanzan para CANTIDAD_DE_PREGUNTAS
+def _falta_banco(filas: list, examen) -> bool:
+    return examen is not None and examen[0] is not None and examen[0] > len(filas)
+
+
+def _temas(filas: list) -> list:
+    return sorted({fila[5] for fila in filas if fila[5] is not None})
+
+
+class PreguntasExamen:
+    __slots__ = (
+        "id_examen", "preguntas", "cuerpo", "cantidad", "orden", "propias", "banco", "por_id", "clave",
+        "armados", "vence",
+    )
+
+    def __init__(self, id_examen: int, filas: list, examen, banco: list, vence: float):
+        self.id_examen = id_examen
+        self.preguntas = tuple(Pregunta(fila) for fila in filas)
+        # Cuerpo del profesor, con las respuestas correctas
+        self.cuerpo = _serializar(list(fila) for fila in filas)
+        self.cantidad, self.orden = examen if examen is not None else (None, None)
+        banco_preguntas = [Pregunta(fila) for fila in banco]
+        self.por_id = {p.id_pregunta: p for p in self.preguntas + tuple(banco_preguntas)}
+        self.propias = np.array([p.id_pregunta for p in self.preguntas], dtype=np.int64)
+        # Un arreglo de IDs por tema (el banco viene ordenado por tema)
+        por_tema = {}
+        for p in banco_preguntas:
+            por_tema.setdefault(p.tema, []).append(p.id_pregunta)
+        self.banco = [np.array(ids, dtype=np.int64) for ids in por_tema.values()]
+        # Cada estudiante responde cantidad preguntas, aunque el examen o el banco tengan más
+        disponibles = len(self.por_id)
+        cantidad = min(self.cantidad, disponibles) if self.cantidad else len(self.preguntas)
+        # Las respuestas correctas solo quedan en la clave
+        correctas = {fila[0]: (fila[4], fila[3]) for fila in list(filas) + list(banco)}
+        self.clave = ClaveExamen(id_examen, [
+            (id_pregunta, *correctas[id_pregunta]) for id_pregunta in self.por_id
+        ], cantidad, self.asignadas)
+        self.armados = {}
+        self.vence = vence
+
+    # IDs de las preguntas que le tocan al estudiante (también los usa la calificación)
+    def asignadas(self, id_estudiante: int) -> np.ndarray:
+        return armar(self.id_examen, id_estudiante, self.propias, self.banco, self.cantidad, self.orden)
+
+    # JSON con las preguntas que le tocan al estudiante (misma forma que el cuerpo completo)
+    def cuerpo_estudiante(self, id_estudiante: int) -> bytes:
+        cuerpo = self.armados.get(id_estudiante)
+        if cuerpo is None:
+            ids = self.asignadas(id_estudiante)
+            cuerpo = self.armados[id_estudiante] = _serializar(self.por_id[int(i)].fila() for i in ids)
+        return cuerpo
+
+
+class CachePreguntas:
+    def __init__(self, capacidad: int, ttl_s: float):
+        self._capacidad = capacidad
+        self._ttl_s = ttl_s
+        self._entradas = OrderedDict()
+        self._lock = threading.Lock()
+        # Lecturas en curso por examen: las peticiones simultáneas esperan la misma
+        self._cargando = {}
+        # Aumenta con cada invalidación; una lectura que empezó antes no se guarda
+        self._generacion = 0
+        self.aciertos = 0
+        self.fallos = 0
+        self.lecturas = 0
+
+    def obtener(self, id_examen: int):
+        with self._lock:
+            entrada = self._entradas.get(id_examen)
+            if entrada is not None and entrada.vence <= time.monotonic():
+                del self._entradas[id_examen]
+                entrada = None
+            if entrada is None:
+                self.fallos += 1
+                return None
+            self._entradas.move_to_end(id_examen)
+            self.aciertos += 1
+            return entrada
+
+    def _guardar(self, id_examen: int, filas: list, examen, banco: list, generacion: int) -> PreguntasExamen:
+        entrada = PreguntasExamen(id_examen, filas, examen, banco, time.monotonic() + self._ttl_s)
+        with self._lock:
+            self.lecturas += 1
+            if generacion == self._generacion:
+                self._entradas[id_examen] = entrada
+                self._entradas.move_to_end(id_examen)
+                while len(self._entradas) > self._capacidad:
+                    self._entradas.popitem(last=False)
+        return entrada
+
+    async def obtener_async(self, id_examen: int, adquirir, liberar) -> PreguntasExamen:
+        entrada = self.obtener(id_examen)
+        if entrada is not None:
+            return entrada
+        cargando = self._cargando.get(id_examen)
+        if cargando is not None:
+            try:
+                return await asyncio.shield(cargando)
+            except asyncio.CancelledError:
+                # Se canceló la petición que estaba leyendo, no esta: se lee de nuevo
+                if not cargando.cancelled():
+                    raise
+                return await self.obtener_async(id_examen, adquirir, liberar)
+        cargando = asyncio.get_running_loop().create_future()
+        self._cargando[id_examen] = cargando
+        try:
+            generacion = self._generacion
+            connection = await adquirir()
+            try:
+                with connection.cursor() as cursor:
+                    await cursor.execute(CONSULTA_PREGUNTAS_EXAMEN, {"p_id": id_examen})
+                    filas = await cursor.fetchall()
+                    await cursor.execute(CONSULTA_EXAMEN, {"p_id": id_examen})
+                    examen = await cursor.fetchone()
+                    banco = []
+                    if _falta_banco(filas, examen):
+                        tipo = await connection.gettype("SYS.ODCIVARCHAR2LIST")
+                        await cursor.execute(CONSULTA_BANCO, {"p_id": id_examen, "temas": tipo.newobject(_temas(filas))})
+                        banco = await cursor.fetchall()
+            finally:
+                await liberar(connection)
+            entrada = self._guardar(id_examen, filas, examen, banco, generacion)
+            cargando.set_result(entrada)
+            return entrada
+        except asyncio.CancelledError:
+            cargando.cancel()
+            raise
+        except Exception as error:
+            cargando.set_exception(error)
+            cargando.exception()  # sin esperas pendientes no se registra como no recuperada
+            raise
+        finally:
+            del self._cargando[id_examen]
+
+    # Misma lectura que obtener_async con una conexión sincrónica (hilo despachador, línea de comandos)
+    def obtener_sincrono(self, connection, id_examen: int) -> PreguntasExamen:
+        entrada = self.obtener(id_examen)
+        if entrada is not None:
+            return entrada
+        generacion = self._generacion
+        with connection.cursor() as cursor:
+            cursor.execute(CONSULTA_PREGUNTAS_EXAMEN, p_id=id_examen)
+            filas = cursor.fetchall()
+            cursor.execute(CONSULTA_EXAMEN, p_id=id_examen)
+            examen = cursor.fetchone()
+            banco = []
+            if _falta_banco(filas, examen):
+                temas = connection.gettype("SYS.ODCIVARCHAR2LIST").newobject(_temas(filas))
+                cursor.execute(CONSULTA_BANCO, p_id=id_examen, temas=temas)
+                banco = cursor.fetchall()
+        return self._guardar(id_examen, filas, examen, banco, generacion)
+
+    # {id_examen: ClaveExamen} de los exámenes que tienen preguntas
+    def claves(self, connection, examenes) -> dict:
+        claves = {}
+        for id_examen in set(examenes):
+            entrada = self.obtener_sincrono(connection, id_examen)
+            if entrada.por_id:
+                claves[id_examen] = entrada.clave
+        return claves
+
+    def invalidar_examen(self, id_examen: int):
+        with self._lock:
+            self._generacion += 1
+            self._entradas.pop(id_examen, None)
+
+    # La pregunta puede estar en varios exámenes (o en su banco): se descartan todos los que la tienen
+    def invalidar_pregunta(self, id_pregunta: int):
+        with self._lock:
+            self._generacion += 1
+            for id_examen in [
+                id_examen for id_examen, entrada in self._entradas.items()
+                if id_pregunta in entrada.por_id
+            ]:
+                del self._entradas[id_examen]
+
+    def estadisticas(self):
+        with self._lock:
+            consultas = self.aciertos + self.fallos
+            return {
+                "entradas": len(self._entradas),
+                "capacidad": self._capacidad,
+                "aciertos": self.aciertos,
+                "fallos": self.fallos,
+                "lecturas": self.lecturas,
+                "tasa_aciertos": self.aciertos / consultas if consultas else 0.0,
+            }
+
+
+cache_preguntas = CachePreguntas(
+    int(os.getenv("CACHE_PREGUNTAS_CAPACIDAD", "500")),
+    float(os.getenv("CACHE_PREGUNTAS_TTL_S", "300")),
+)
@@ -0,0 +1,219 @@
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from email.utils import formatdate, parsedate_to_datetime
+import oracledb
+from fastapi import Response
+
+# Datos de referencia (/cursos, /semestres y la grilla de /horarios) ya serializados en memoria.
+# Cambian unas pocas veces por semestre y el frontend los pide en cada carga de página: cada respuesta
+# lleva ETag y Last-Modified, y si el navegador ya tiene esa versión (If-None-Match / If-Modified-Since)
+# se responde 304 sin cuerpo. La cache se invalida desde los endpoints que escriben esas tablas, con
+# POST /cache/referencias/invalidar (cambios hechos directamente en la base de datos) y, con
+# REFERENCIAS_CQN=1, con Continuous Query Notification de Oracle; el vencimiento (REFERENCIAS_TTL_S)
+# acota lo que tarda en verse un cambio que no pasó por ninguno de esos caminos.
+
+logger = logging.getLogger("uvicorn.error")
+
+TTL_S = float(os.getenv("REFERENCIAS_TTL_S", "300"))
+CQN = os.getenv("REFERENCIAS_CQN", "0") == "1"
+
+CONSULTAS = {
+    "cursos": """
+        SELECT
+            C.*
+        FROM
+            "CURSO" C
+    """,
+    "semestres": """
+        SELECT SEMESTRE, count(DISTINCT SEMANA)
+        FROM "HORARIO"
+        GROUP BY SEMESTRE
+        ORDER BY SEMESTRE  ASC
+    """,
+}
+
+# Tabla -> claves que dependen de ella (para las notificaciones de Oracle)
+TABLAS = {
+    "CURSO": ("cursos",),
+    "HORARIO": ("semestres",),
+}
+
+# Sin caché del navegador: siempre pregunta, pero con If-None-Match y recibe 304 si no cambió
+CACHE_CONTROL = "private, no-cache"
+
+
+# Igual que el JSONResponse de FastAPI
+def serializar(filas) -> bytes:
+    return json.dumps(filas, ensure_ascii=False, allow_nan=False, separators=(",", ":")).encode("utf-8")
+
+
+# Respuesta ya serializada con su versión; origen es el objeto del que se armó (se rearma si cambia)
+class Referencia:
+    __slots__ = ("cuerpo", "etag", "modificado", "vence", "origen")
+
+    def __init__(self, cuerpo: bytes, vence: float = float("inf"), anterior=None, origen=None):
+        self.cuerpo = cuerpo
+        self.etag = '"' + hashlib.blake2b(cuerpo, digest_size=16).hexdigest() + '"'
+        # Si se volvió a leer lo mismo se conserva la fecha, así If-Modified-Since sigue valiendo
+        if anterior is not None and anterior.etag == self.etag:
+            self.modificado = anterior.modificado
+        else:
+            self.modificado = int(time.time())
+        self.vence = vence
+        self.origen = origen
+
+    # ¿El navegador ya tiene esta versión? If-None-Match manda sobre If-Modified-Since
+    def vigente_para(self, headers) -> bool:
+        etags = headers.get("if-none-match")
+        if etags is not None:
+            return etags.strip() == "*" or self.etag in (e.strip().removeprefix("W/") for e in etags.split(","))
+        fecha = headers.get("if-modified-since")
+        if fecha is not None:
+            try:
+                return self.modificado <= parsedate_to_datetime(fecha).timestamp()
+            except (TypeError, ValueError):
+                return False
+        return False
+
+
+class CacheReferencias:
+    def __init__(self, ttl_s: float):
+        self._ttl_s = ttl_s
+        self._entradas = {}
+        self._lock = threading.Lock()
+        # Una lectura por clave a la vez; las demás peticiones esperan esa misma
+        self._cargando = {}
+        self._generacion = 0
+        self._suscripcion = None
+        self._al_cambiar = None
+        self.aciertos = 0
+        self.fallos = 0
+        self.lecturas = 0
+        self.no_modificadas = 0
+        self.notificaciones = 0
+
+    def obtener(self, clave):
+        with self._lock:
+            entrada = self._entradas.get(clave)
+            if entrada is not None and entrada.vence > time.monotonic():
+                self.aciertos += 1
+                return entrada
+            self.fallos += 1
+            return None
+
+    # Guarda filas ya leídas (la grilla de horarios sale de horarios.py, no de CONSULTAS)
+    def guardar(self, clave, filas, vence: float = float("inf"), origen=None, generacion=None) -> Referencia:
+        with self._lock:
+            anterior = self._entradas.get(clave)
+        entrada = Referencia(serializar(filas), vence, anterior, origen)
+        with self._lock:
+            if generacion is None or generacion == self._generacion:
+                self._entradas[clave] = entrada
+        return entrada
+
+    # Lee una de CONSULTAS; las peticiones que esperaban reciben lo que leyó la primera
+    def cargar(self, connection, clave: str) -> Referencia:
+        with self._lock:
+            anterior = self._entradas.get(clave)
+            cargando = self._cargando.setdefault(clave, threading.Lock())
+        with cargando:
+            with self._lock:
+                actual = self._entradas.get(clave)
+                generacion = self._generacion
+            if actual is not None and actual is not anterior and actual.vence > time.monotonic():
+                return actual
+            with connection.cursor() as cursor:
+                cursor.execute(CONSULTAS[clave])
+                filas = cursor.fetchall()
+            with self._lock:
+                self.lecturas += 1
+            return self.guardar(clave, filas, time.monotonic() + self._ttl_s, generacion=generacion)
+
+    def invalidar(self, clave=None):
+        with self._lock:
+            self._generacion += 1
+            if clave is None:
+                self._entradas.clear()
+            else:
+                self._entradas.pop(clave, None)
+
+    # 304 si el navegador ya tiene la versión; si no, el cuerpo con ETag y Last-Modified
+    def responder(self, request, entrada: Referencia) -> Response:
+        headers = {
+            "ETag": entrada.etag,
+            "Last-Modified": formatdate(entrada.modificado, usegmt=True),
+            "Cache-Control": CACHE_CONTROL,
+        }
+        if entrada.vigente_para(request.headers):
+            with self._lock:
+                self.no_modificadas += 1
+            return Response(status_code=304, headers=headers)
+        return Response(content=entrada.cuerpo, media_type="application/json", headers=headers)
+
+    def _notificacion(self, mensaje):
+        tablas = {
+            tabla.name.rsplit(".", 1)[-1].upper()
+            for consulta in (mensaje.queries or ())
+            for tabla in consulta.tables
+        }
+        with self._lock:
+            self.notificaciones += 1
+        for tabla in tablas:
+            for clave in TABLAS.get(tabla, ()):
+                self.invalidar(clave)
+            if self._al_cambiar is not None:
+                self._al_cambiar(tabla)
+
+    # Registra las tablas de TABLAS en Continuous Query Notification. Necesita el modo thick de
+    # python-oracledb y GRANT CHANGE NOTIFICATION; si no se puede, queda el vencimiento por TTL
+    def suscribir(self, conectar, al_cambiar=None) -> bool:
+        self._al_cambiar = al_cambiar
+        connection = None
+        try:
+            connection = conectar()
+            suscripcion = connection.subscribe(
+                callback=self._notificacion,
+                operations=oracledb.OPCODE_ALLOPS,
+                qos=oracledb.SUBSCR_QOS_QUERY | oracledb.SUBSCR_QOS_RELIABLE,
+            )
+            for tabla in TABLAS:
+                suscripcion.registerquery(f'SELECT 1 FROM "{tabla}"')
+        except oracledb.Error as e:
+            logger.warning("Sin notificaciones de cambios para los datos de referencia (queda REFERENCIAS_TTL_S): %s", e)
+            if connection is not None:
+                connection.close()
+            return False
+        self._suscripcion = (connection, suscripcion)
+        return True
+
+    def detener(self):
+        if self._suscripcion is None:
+            return
+        connection, suscripcion = self._suscripcion
+        self._suscripcion = None
+        try:
+            connection.unsubscribe(suscripcion)
+            connection.close()
+        except oracledb.Error:
+            pass
+
+    def estadisticas(self):
+        with self._lock:
+            consultas = self.aciertos + self.fallos
+            return {
+                "entradas": len(self._entradas),
+                "aciertos": self.aciertos,
+                "fallos": self.fallos,
+                "lecturas": self.lecturas,
+                "tasa_aciertos": self.aciertos / consultas if consultas else 0.0,
+                "no_modificadas": self.no_modificadas,
+                "notificaciones": self.notificaciones,
+                "cqn": self._suscripcion is not None,
+            }
+
+
+cache_referencias = CacheReferencias(TTL_S)
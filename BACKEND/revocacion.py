@@ -0,0 +1,98 @@
+import heapq
+import os
+import sqlite3
+import threading
+import time
+
+# Almacenes de tokens revocados (logout), indexados por el jti del token.
+# Cada entrada se descarta cuando pasa el exp del token: un token vencido ya es rechazado por la firma.
+
+
+# Un solo worker de uvicorn: diccionario en memoria + heap de expiraciones para purgar
+class RevocacionMemoria:
+    # esta_revocado no hace E/S: se puede llamar desde el event loop
+    bloqueante = False
+
+    def __init__(self):
+        self._revocados = {}
+        self._expiraciones = []
+        self._lock = threading.Lock()
+
+    def revocar(self, jti: str, exp: int):
+        with self._lock:
+            self._revocados[jti] = exp
+            heapq.heappush(self._expiraciones, (exp, jti))
+            self._purgar(time.time())
+
+    def esta_revocado(self, jti: str) -> bool:
+        exp = self._revocados.get(jti)
+        return exp is not None and exp > time.time()
+
+    def _purgar(self, ahora: float):
+        while self._expiraciones and self._expiraciones[0][0] <= ahora:
+            exp, jti = heapq.heappop(self._expiraciones)
+            if self._revocados.get(jti) == exp:
+                del self._revocados[jti]
+
+    def __len__(self):
+        return len(self._revocados)
+
+
+# Varios workers en la misma máquina: archivo SQLite compartido en modo WAL
+class RevocacionSqlite:
+    # Cada cuántas revocaciones se borran las entradas vencidas
+    PURGAR_CADA = 1000
+    # Lee el archivo: las rutas asíncronas lo consultan en el threadpool
+    bloqueante = True
+
+    def __init__(self, ruta: str):
+        self._ruta = ruta
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._revocaciones = 0
+        with self._conexion() as con:
+            con.execute("""
+                CREATE TABLE IF NOT EXISTS tokens_revocados (
+                    jti TEXT PRIMARY KEY,
+                    exp INTEGER NOT NULL
+                ) WITHOUT ROWID
+            """)
+            con.execute("CREATE INDEX IF NOT EXISTS tokens_revocados_exp ON tokens_revocados (exp)")
+
+    def _conexion(self) -> sqlite3.Connection:
+        con = getattr(self._local, "con", None)
+        if con is None:
+            con = sqlite3.connect(self._ruta, timeout=5)
+            con.execute("PRAGMA journal_mode=WAL")
+            con.execute("PRAGMA synchronous=NORMAL")
+            self._local.con = con
+        return con
+
+    def revocar(self, jti: str, exp: int):
+        con = self._conexion()
+        with con:
+            con.execute("INSERT OR REPLACE INTO tokens_revocados (jti, exp) VALUES (?, ?)", (jti, int(exp)))
+            with self._lock:
+                self._revocaciones += 1
+                purgar = self._revocaciones % self.PURGAR_CADA == 0
+            if purgar:
+                con.execute("DELETE FROM tokens_revocados WHERE exp <= ?", (int(time.time()),))
+
+    def esta_revocado(self, jti: str) -> bool:
+        fila = self._conexion().execute(
+            "SELECT 1 FROM tokens_revocados WHERE jti = ? AND exp > ?", (jti, time.time())
+        ).fetchone()
+        return fila is not None
+
+    def __len__(self):
+        return self._conexion().execute("SELECT COUNT(*) FROM tokens_revocados").fetchone()[0]
+
+
+# REVOCACION_BACKEND=memoria (por defecto) o sqlite; REVOCACION_SQLITE_RUTA para el archivo compartido
+def crear_almacen_revocacion():
+    backend = os.getenv("REVOCACION_BACKEND", "memoria").lower()
+    if backend == "memoria":
+        return RevocacionMemoria()
+    if backend == "sqlite":
+        return RevocacionSqlite(os.getenv("REVOCACION_SQLITE_RUTA", "tokens_revocados.db"))
+    raise ValueError(f"REVOCACION_BACKEND desconocido: {backend}")
@@ -0,0 +1,97 @@
+import json
+import threading
+from datetime import date, datetime
+import oracledb
+from fastapi import Response
+from fastapi.responses import StreamingResponse
+from starlette.concurrency import run_in_threadpool
+
+try:
+    import orjson
+except ImportError:  # pip install orjson para serializar los reportes grandes más rápido
+    orjson = None
+
+# Filas de Oracle directo a JSON, sin pasar por jsonable_encoder de FastAPI (que revisa valor por valor).
+# El manejador de tipos deja cada columna ya lista para JSON al leerla: INTERVAL DAY TO SECOND en
+# segundos (igual que jsonable_encoder con timedelta) y CLOB como texto; DATE y TIMESTAMP quedan como
+# datetime, que orjson escribe en ISO 8601 igual que antes. Las tuplas se codifican como arreglos.
+
+
+def _segundos(intervalo):
+    return None if intervalo is None else intervalo.total_seconds()
+
+
+def manejador_tipos(cursor, metadata):
+    if metadata.type_code is oracledb.DB_TYPE_INTERVAL_DS:
+        return cursor.var(metadata.type_code, arraysize=cursor.arraysize, outconverter=_segundos)
+    if metadata.type_code is oracledb.DB_TYPE_CLOB:
+        return cursor.var(oracledb.DB_TYPE_LONG, arraysize=cursor.arraysize)
+    if metadata.type_code is oracledb.DB_TYPE_NCLOB:
+        return cursor.var(oracledb.DB_TYPE_LONG_NVARCHAR, arraysize=cursor.arraysize)
+
+
+def _por_defecto(valor):
+    if isinstance(valor, (datetime, date)):
+        return valor.isoformat()
+    raise TypeError(f"{type(valor).__name__} no se puede escribir en JSON")
+
+
+# Igual que el JSONResponse de FastAPI
+def a_json(datos) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(datos)
+    return json.dumps(
+        datos, ensure_ascii=False, allow_nan=False, separators=(",", ":"), default=_por_defecto
+    ).encode("utf-8")
+
+
+# Un bloque de filas como NDJSON (una fila por línea)
+def a_ndjson(filas) -> bytes:
+    if orjson is not None:
+        return b"".join(orjson.dumps(fila) + b"\n" for fila in filas)
+    return "".join(
+        json.dumps(fila, ensure_ascii=False, default=_por_defecto) + "\n" for fila in filas
+    ).encode("utf-8")
+
+
+def responder_json(datos, headers: dict = None) -> Response:
+    return Response(content=a_json(datos), media_type="application/json", headers=headers)
+
+
+# Un generador que solo avanza o se cierra en un hilo a la vez. Si el cliente se desconecta mientras un
+# hilo del pool está en fetchmany, close espera a que ese bloque termine (en vez de fallar con
+# "generator already executing" y dejar el cursor abierto sobre la conexión que se va a devolver).
+class _GeneradorExclusivo:
+    def __init__(self, generador):
+        self._generador = generador
+        self._candado = threading.Lock()
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        with self._candado:
+            return next(self._generador)
+
+    def close(self):
+        with self._candado:
+            self._generador.close()
+
+
+# Streaming con una conexión propia del pool (no la de la petición, que FastAPI devuelve recién después
+# de enviar la respuesta). Al terminar el envío, también si el cliente se desconecta o si el generador
+# nunca empezó, se cierra el generador (y su cursor) y recién entonces se llama a liberar.
+class RespuestaStream(StreamingResponse):
+    def __init__(self, generador, liberar, **kwargs):
+        self._generador = _GeneradorExclusivo(generador)
+        self._liberar = liberar
+        super().__init__(self._generador, **kwargs)
+
+    async def __call__(self, scope, receive, send):
+        try:
+            await super().__call__(scope, receive, send)
+        finally:
+            try:
+                await run_in_threadpool(self._generador.close)
+            finally:
+                await run_in_threadpool(self._liberar)
@@ -0,0 +1,7 @@
+import os
+import sys
+
+# Los módulos del backend se importan por nombre, como los importa main.py
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# ensamblaje se niega a armar exámenes sin el secreto
+os.environ.setdefault("ENSAMBLAJE_SEMILLA", "pruebas")
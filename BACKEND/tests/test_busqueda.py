@@ -0,0 +1,77 @@
+from fastapi.testclient import TestClient
+import main
+from busqueda import _Estado, leer_consulta
+
+PROFESOR, OTRO = 7, 8
+
+
+def _estado():
+    estado = _Estado()
+    estado.agregar(1, "Derivada de una función", "a,b", "Cálculo", 0, OTRO)
+    estado.agregar(2, "Derivada parcial", "a,b", "Cálculo", 1, OTRO)
+    estado.agregar(3, "Derivada implícita", "a,b", "Cálculo", 1, PROFESOR)
+    estado.agregar(4, "Integral definida", "a,b", "Cálculo", 0, None)
+    return estado
+
+
+def _buscar(estado, texto, propietario=PROFESOR, alcance="banco", privacidad=None, tema=None, desde=0, limite=20):
+    return estado.buscar(leer_consulta(texto), propietario, alcance, privacidad, tema, desde, limite)
+
+
+def test_banco_incluye_publicas_y_propias():
+    total, ids = _buscar(_estado(), "derivada")
+    assert total == 2
+    assert sorted(ids) == [1, 3]
+
+
+def test_mias_solo_del_profesor():
+    assert _buscar(_estado(), "derivada", alcance="mias") == (1, [3])
+
+
+def test_publicas_no_expone_privadas_de_otros():
+    estado = _estado()
+    assert _buscar(estado, "derivada", alcance="publicas", privacidad=1) == (0, [])
+    assert _buscar(estado, "derivada", propietario=None, alcance="publicas", privacidad=1) == (0, [])
+    assert _buscar(estado, "derivada", alcance="publicas") == (1, [1])
+
+
+def test_privacidad_en_banco_solo_propias():
+    assert _buscar(_estado(), "derivada", privacidad=1) == (1, [3])
+
+
+def test_estudiante_no_ve_privadas():
+    total, ids = _buscar(_estado(), "derivada", propietario=None, privacidad=1)
+    assert (total, ids) == (0, [])
+
+
+def test_prefijo_y_tema():
+    estado = _estado()
+    assert _buscar(estado, "integ*") == (1, [4])
+    assert _buscar(estado, "derivada", tema="calculo")[0] == 2
+    assert _buscar(estado, "derivada", tema="Álgebra") == (0, [])
+
+
+def test_quitar_y_reemplazar():
+    estado = _estado()
+    estado.agregar(1, "Límite de una sucesión", "a,b", "Cálculo", 0, OTRO)
+    assert _buscar(estado, "derivada") == (1, [3])
+    assert _buscar(estado, "limite") == (1, [1])
+
+
+def test_paginacion():
+    estado = _estado()
+    total, primera = _buscar(estado, "derivada", limite=1)
+    _, segunda = _buscar(estado, "derivada", desde=1, limite=1)
+    assert total == 2
+    assert sorted(primera + segunda) == [1, 3]
+    assert _buscar(estado, "derivada", desde=5) == (2, [])
+
+
+def test_estudiante_no_busca_en_el_banco():
+    main.app.dependency_overrides[main.verificar_token] = lambda: (7, False)
+    main.app.dependency_overrides[main.get_connection] = lambda: None
+    try:
+        respuesta = TestClient(main.app).get("/preguntas/buscar", params={"q": "derivada", "alcance": "publicas"})
+    finally:
+        main.app.dependency_overrides.clear()
+    assert respuesta.status_code == 403
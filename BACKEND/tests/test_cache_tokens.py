@@ -0,0 +1,43 @@
+import time
+from cache_tokens import CacheTokens
+
+
+def test_guardar_y_obtener():
+    cache = CacheTokens(10)
+    clave = CacheTokens.digest("token")
+    datos = (7, True, "jti", time.time() + 60)
+    cache.guardar(clave, datos)
+    assert cache.obtener(clave) == datos
+    assert cache.obtener(CacheTokens.digest("otro")) is None
+    assert cache.estadisticas()["aciertos"] == 1
+    assert cache.estadisticas()["fallos"] == 1
+
+
+def test_vencido_se_descarta():
+    cache = CacheTokens(10)
+    clave = CacheTokens.digest("token")
+    cache.guardar(clave, (7, True, "jti", time.time() - 1))
+    assert cache.obtener(clave) is None
+    assert cache.estadisticas()["entradas"] == 0
+
+
+def test_lru_descarta_el_menos_usado():
+    cache = CacheTokens(2)
+    exp = time.time() + 60
+    a, b, c = (CacheTokens.digest(t) for t in "abc")
+    cache.guardar(a, (1, False, "a", exp))
+    cache.guardar(b, (2, False, "b", exp))
+    cache.obtener(a)
+    cache.guardar(c, (3, False, "c", exp))
+    assert cache.obtener(b) is None
+    assert cache.obtener(a) is not None
+    assert cache.obtener(c) is not None
+
+
+def test_invalidar():
+    cache = CacheTokens(10)
+    clave = CacheTokens.digest("token")
+    cache.guardar(clave, (7, True, "jti", time.time() + 60))
+    cache.invalidar(clave)
+    cache.invalidar(clave)
+    assert cache.obtener(clave) is None
@@ -0,0 +1,87 @@
+import json
+import numpy as np
+import pytest
+from calificacion import (
+    COMPLETA, MULTIPLE, UNICA, UNIR, ClaveExamen, armar_claves, calificar_pendientes, canonizar,
+    normalizar_respuestas_dadas,
+)
+
+
+def _dadas(**respuestas):
+    return json.dumps({k.lstrip("p"): v for k, v in respuestas.items()})
+
+
+def test_canonizar_multiple_no_depende_del_orden():
+    assert canonizar(MULTIPLE, "B, a ,c") == canonizar(MULTIPLE, "c,A,b")
+
+
+def test_canonizar_unir_depende_del_orden():
+    assert canonizar(UNIR, "a-1,b-2") != canonizar(UNIR, "b-2,a-1")
+
+
+def test_canonizar_espacios_y_mayusculas():
+    assert canonizar(COMPLETA, "  Ciudad   de\tMéxico ") == canonizar(COMPLETA, "ciudad de méxico")
+
+
+def test_normalizar_respuestas_dadas():
+    assert json.loads(normalizar_respuestas_dadas('{"3": ["a", "b"], "4": 1, "5": null}')) == {
+        "3": "a,b", "4": "1", "5": "",
+    }
+    with pytest.raises(ValueError):
+        normalizar_respuestas_dadas("[1, 2]")
+
+
+def test_calificar_examen_fijo():
+    clave = ClaveExamen(1, [(1, UNICA, "a"), (2, MULTIPLE, "a,b"), (3, COMPLETA, "Sol")])
+    puntajes, acertadas = clave.calificar([
+        _dadas(p1="a", p2="b,a", p3="sol"),
+        _dadas(p1="b", p2="a"),
+        None,
+    ])
+    assert puntajes.tolist() == [100.0, 0.0, 0.0]
+    assert acertadas == ["1,2,3", "", ""]
+
+
+def test_puntaje_sin_asignadas_no_pasa_de_100():
+    clave = ClaveExamen(1, [(1, UNICA, "a"), (2, UNICA, "b"), (3, UNICA, "c"), (4, UNICA, "d")], 2)
+    puntajes, _ = clave.calificar([_dadas(p1="a", p2="b", p3="c", p4="d")])
+    assert puntajes.tolist() == [100.0]
+
+
+def test_solo_cuentan_las_preguntas_asignadas():
+    asignadas = {10: [1, 3], 11: [2, 4]}
+    clave = ClaveExamen(
+        1, [(1, UNICA, "a"), (2, UNICA, "b"), (3, UNICA, "c"), (4, UNICA, "d")], 2, asignadas.__getitem__
+    )
+    todas = _dadas(p1="a", p2="b", p3="c", p4="d")
+    puntajes, acertadas = clave.calificar([todas, todas, _dadas(p1="a", p2="b")], [10, 11, 10])
+    assert puntajes.tolist() == [100.0, 100.0, 50.0]
+    assert acertadas == ["1,3", "2,4", "1"]
+
+
+def test_armar_claves_por_examen():
+    claves = armar_claves([(1, 10, UNICA, "a"), (1, 11, UNICA, "b"), (2, 20, UNICA, "c")])
+    assert sorted(claves) == [1, 2]
+    assert claves[1].cantidad == 2
+    assert np.array_equal(claves[2].preguntas, [20])
+
+
+def test_calificar_pendientes():
+    claves = {1: ClaveExamen(1, [(1, UNICA, "a"), (2, UNICA, "b")])}
+    presentaciones = [
+        {"id_estudiante": 5, "id_examen": 1, "puntaje": None, "respuestas_dadas": _dadas(p1="a", p2="x")},
+        {"id_estudiante": 6, "id_examen": 1, "puntaje": 80.0, "respuestas_dadas": _dadas(p1="x")},
+        {"id_estudiante": 7, "id_examen": 2, "puntaje": None, "respuestas_dadas": _dadas(p1="a")},
+    ]
+    pedidos = []
+
+    def cargar(connection, examenes):
+        pedidos.append(sorted(examenes))
+        return claves
+
+    calificar_pendientes(None, presentaciones, cargar)
+    assert pedidos == [[1, 2]]
+    assert presentaciones[0]["puntaje"] == 50.0 and presentaciones[0]["respuestas"] == "1"
+    # El puntaje que envió el cliente no cuenta
+    assert presentaciones[1]["puntaje"] == 0.0
+    assert presentaciones[2]["puntaje"] is None
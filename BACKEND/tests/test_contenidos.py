@@ -0,0 +1,23 @@
+from contenidos import armar_arbol
+
+
+def test_arbol_curso_unidad_contenido():
+    contenidos = [
+        (1, "Cálculo", 10, "Límites", 100, "Definición"),
+        (1, "Cálculo", 10, "Límites", 101, "Continuidad"),
+        (1, "Cálculo", 11, "Derivadas", 102, "Regla de la cadena"),
+        (2, "Física", 20, "Cinemática", 200, "MRU"),
+    ]
+    examenes = [(1, 5, "Parcial"), (1, 6, "Final"), (3, 7, "Sin contenidos")]
+    arbol = armar_arbol(contenidos, examenes)
+    assert [c["id_curso"] for c in arbol] == [1, 2]
+    calculo, fisica = arbol
+    assert calculo["examenes"] == [{"id_examen": 5, "nombre": "Parcial"}, {"id_examen": 6, "nombre": "Final"}]
+    assert [u["unidad"] for u in calculo["unidades"]] == ["Límites", "Derivadas"]
+    assert [c["id_contenido"] for c in calculo["unidades"][0]["contenidos"]] == [100, 101]
+    assert fisica["examenes"] == []
+    assert fisica["unidades"][0]["contenidos"] == [{"id_contenido": 200, "contenido": "MRU"}]
+
+
+def test_sin_contenidos():
+    assert armar_arbol([], [(1, 5, "Parcial")]) == []
@@ -0,0 +1,52 @@
+import numpy as np
+import pytest
+import ensamblaje
+from ensamblaje import ALEATORIO, armar, muestrear
+
+PROPIAS = np.array([1, 2, 3], dtype=np.int64)
+BANCO = [np.arange(100, 140, dtype=np.int64), np.arange(200, 205, dtype=np.int64)]
+
+
+def test_mismo_estudiante_mismas_preguntas():
+    primera = armar(1, 7, PROPIAS, BANCO, 10, ALEATORIO)
+    assert np.array_equal(primera, armar(1, 7, PROPIAS, BANCO, 10, ALEATORIO))
+    assert not np.array_equal(primera, armar(1, 8, PROPIAS, BANCO, 10, ALEATORIO))
+
+
+def test_completa_con_el_banco_sin_repetir():
+    ids = armar(1, 7, PROPIAS, BANCO, 10, None)
+    assert len(ids) == 10
+    assert len(set(ids.tolist())) == 10
+    assert set(PROPIAS.tolist()) <= set(ids.tolist())
+    assert ids.tolist() == sorted(ids.tolist())
+
+
+def test_cantidad_menor_que_las_propias():
+    ids = armar(1, 7, PROPIAS, BANCO, 2, None)
+    assert len(ids) == 2
+    assert set(ids.tolist()) <= set(PROPIAS.tolist())
+
+
+def test_sin_cantidad_usa_las_propias():
+    assert armar(1, 7, PROPIAS, BANCO, None, None).tolist() == [1, 2, 3]
+
+
+def test_muestrear_no_pide_mas_de_las_que_hay():
+    azar = np.random.default_rng(0)
+    elegidas = muestrear(azar, BANCO, 1000)
+    assert sorted(elegidas.tolist()) == sorted(np.concatenate(BANCO).tolist())
+    assert len(muestrear(azar, [], 3)) == 0
+
+
+def test_muestrear_floyd_sin_repetidos():
+    azar = np.random.default_rng(1)
+    for _ in range(50):
+        elegidas = muestrear(azar, BANCO, 5).tolist()
+        assert len(set(elegidas)) == 5
+        assert set(elegidas) <= set(np.concatenate(BANCO).tolist())
+
+
+def test_sin_semilla_no_arma(monkeypatch):
+    monkeypatch.setattr(ensamblaje, "SEMILLA", "")
+    with pytest.raises(RuntimeError):
+        ensamblaje.generador(1, 1)
@@ -0,0 +1,54 @@
+from migraciones import dividir_sentencias, leer_migraciones
+
+SCRIPT = """
+-- Comentario inicial
+CREATE TABLE T (
+    ID NUMBER
+);
+
+INSERT INTO T VALUES (1);
+
+CREATE OR REPLACE TRIGGER TR_T
+BEFORE INSERT ON T
+FOR EACH ROW
+BEGIN
+    :NEW.ID := :NEW.ID + 1;
+END;
+/
+
+begin
+    DBMS_STATS.GATHER_TABLE_STATS(USER, 'T');
+end;
+/
+COMMIT
+"""
+
+
+def test_dividir_sql_y_plsql():
+    sentencias = dividir_sentencias(SCRIPT)
+    assert len(sentencias) == 5
+    assert sentencias[0].strip().startswith("CREATE TABLE T")
+    assert not sentencias[0].rstrip().endswith(";")
+    assert sentencias[1] == "INSERT INTO T VALUES (1)"
+    # El PL/SQL conserva el ";" de sus sentencias internas y no incluye la "/"
+    assert sentencias[2].rstrip().endswith("END;")
+    assert "/" not in sentencias[2].splitlines()
+    assert sentencias[3].strip().lower().startswith("begin")
+    assert sentencias[4].strip() == "COMMIT"
+
+
+def test_vacio_y_solo_comentarios():
+    assert dividir_sentencias("") == []
+    assert dividir_sentencias("-- nada\n\n   \n") == []
+
+
+def test_migraciones_del_repositorio():
+    migraciones = leer_migraciones()
+    versiones = [m["version"] for m in migraciones]
+    assert versiones == list(range(1, len(versiones) + 1))
+    for migracion in migraciones:
+        sentencias = dividir_sentencias(migracion["texto"])
+        assert sentencias, migracion["descripcion"]
+        # Una "/" suelta dentro de una sentencia indica un bloque PL/SQL que no se reconoció
+        for sentencia in sentencias:
+            assert "/" not in [linea.strip() for linea in sentencia.splitlines()], migracion["descripcion"]
@@ -0,0 +1,94 @@
+import json
+import pytest
+from fastapi.testclient import TestClient
+import main
+from calificacion import UNICA, ClaveExamen
+
+ESTUDIANTE, EXAMEN = 7, 3
+
+PARAMS = {
+    "p_id_estudiante": ESTUDIANTE,
+    "p_id_examen": EXAMEN,
+    "p_fecha_presentacion": "2024-05-10 10:00:00",
+    "p_tiempo_tomado": "00:30:00",
+    "p_puntaje": 100,
+    "p_respuestas_dadas": json.dumps({"1": "a", "2": "x"}),
+}
+
+
+class _Examen:
+    por_id = {1: None, 2: None}
+    clave = ClaveExamen(EXAMEN, [(1, UNICA, "a"), (2, UNICA, "b")])
+
+
+class _Cursor:
+    def __init__(self, llamadas):
+        self._llamadas = llamadas
+
+    async def callfunc(self, nombre, tipo, argumentos):
+        self._llamadas.append(argumentos)
+        return 99
+
+    def close(self):
+        pass
+
+
+class _Conexion:
+    def __init__(self, llamadas):
+        self._llamadas = llamadas
+
+    def cursor(self):
+        return _Cursor(self._llamadas)
+
+    async def commit(self):
+        pass
+
+
+class _Diario:
+    def __init__(self):
+        self.registradas = []
+
+    async def registrar(self, clave, datos):
+        self.registradas.append(datos)
+        return {"clave": clave, "estado": "pendiente", "id_presentacion_examen": None, "repetida": False}
+
+
+@pytest.fixture
+def cliente(monkeypatch):
+    main.app.dependency_overrides[main.verificar_token] = lambda: (ESTUDIANTE, False)
+    monkeypatch.setattr(main.cache_panel, "invalidar", lambda ids: None)
+    yield TestClient(main.app)
+    main.app.dependency_overrides.clear()
+
+
+def test_modo_directo_ignora_el_puntaje_del_cliente(cliente, monkeypatch):
+    llamadas = []
+
+    async def obtener(id_examen, adquirir, liberar):
+        return _Examen()
+
+    async def adquirir():
+        return _Conexion(llamadas)
+
+    async def liberar(connection):
+        pass
+
+    monkeypatch.setattr(main, "diario_presentaciones", None)
+    monkeypatch.setattr(main.cache_preguntas, "obtener_async", obtener)
+    monkeypatch.setattr(main, "adquirir_conexion_async", adquirir)
+    monkeypatch.setattr(main, "liberar_conexion_async", liberar)
+    respuesta = cliente.post("/almacenar_presentacion_examen/", params=PARAMS)
+    assert respuesta.status_code == 200
+    assert respuesta.json()["puntaje"] == 50.0
+    # (estudiante, examen, fecha, puntaje, tiempo, ip, respuestas, respuestas dadas)
+    assert llamadas[0][3] == 50.0
+    assert llamadas[0][6] == "1"
+
+
+def test_modo_diario_no_guarda_el_puntaje_del_cliente(cliente, monkeypatch):
+    diario = _Diario()
+    monkeypatch.setattr(main, "diario_presentaciones", diario)
+    respuesta = cliente.post("/almacenar_presentacion_examen/", params=PARAMS)
+    assert respuesta.status_code == 202
+    assert diario.registradas[0]["puntaje"] is None
+    assert diario.registradas[0]["respuestas_dadas"]
@@ -0,0 +1,33 @@
+import time
+from revocacion import RevocacionMemoria, RevocacionSqlite
+
+
+def test_memoria_revoca_hasta_el_exp():
+    almacen = RevocacionMemoria()
+    almacen.revocar("a", time.time() + 60)
+    almacen.revocar("b", time.time() - 1)
+    assert almacen.esta_revocado("a")
+    assert not almacen.esta_revocado("b")
+    assert not almacen.esta_revocado("c")
+    # La vencida se purgó al revocar
+    assert len(almacen) == 1
+    assert not almacen.bloqueante
+
+
+def test_sqlite_compartido_entre_instancias(tmp_path):
+    ruta = str(tmp_path / "revocados.db")
+    almacen = RevocacionSqlite(ruta)
+    almacen.revocar("a", time.time() + 60)
+    almacen.revocar("b", time.time() - 1)
+    otro = RevocacionSqlite(ruta)
+    assert otro.esta_revocado("a")
+    assert not otro.esta_revocado("b")
+    assert almacen.bloqueante
+
+
+def test_sqlite_purga_vencidas(tmp_path):
+    almacen = RevocacionSqlite(str(tmp_path / "revocados.db"))
+    almacen.PURGAR_CADA = 2
+    almacen.revocar("vieja", time.time() - 1)
+    almacen.revocar("nueva", time.time() + 60)
+    assert len(almacen) == 1
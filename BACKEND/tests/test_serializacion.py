@@ -0,0 +1,55 @@
+import threading
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from serializacion import RespuestaStream, _GeneradorExclusivo
+
+
+def test_close_espera_al_bloque_en_curso():
+    leyendo = threading.Event()
+    seguir = threading.Event()
+    eventos = []
+
+    def lotes():
+        try:
+            leyendo.set()
+            seguir.wait(5)
+            eventos.append("bloque")
+            yield b"a"
+            yield b"b"
+        finally:
+            eventos.append("cerrado")
+
+    generador = _GeneradorExclusivo(lotes())
+    hilo = threading.Thread(target=next, args=(generador,))
+    hilo.start()
+    leyendo.wait(5)
+    cierre = threading.Thread(target=generador.close)
+    cierre.start()
+    cierre.join(0.1)
+    # close no puede cerrar el generador mientras otro hilo lo está avanzando
+    assert cierre.is_alive()
+    seguir.set()
+    hilo.join(5)
+    cierre.join(5)
+    assert eventos == ["bloque", "cerrado"]
+
+
+def test_libera_despues_de_cerrar_el_generador():
+    eventos = []
+
+    def lotes():
+        try:
+            yield b"1\n"
+            yield b"2\n"
+        finally:
+            eventos.append("cerrado")
+
+    app = FastAPI()
+
+    @app.get("/")
+    def stream():
+        return RespuestaStream(lotes(), lambda: eventos.append("liberada"), media_type="application/x-ndjson")
+
+    respuesta = TestClient(app).get("/")
+    assert respuesta.content == b"1\n2\n"
+    assert eventos == ["cerrado", "liberada"]
@@ -0,0 +1,78 @@
+import sys
+import uuid
+from db import adquirir_conexion, liberar_conexion
+import horarios
+import contenidos
+import main
+import panel
+
+# Verificación de planes de ejecución de las consultas frecuentes (regresión de índices).
+# Para cada consulta se hace EXPLAIN PLAN y se revisa que no recorra completas las tablas grandes
+# y que use el índice esperado. Conviene correrlo con estadísticas representativas (V002 las recolecta):
+#
+#   python verificar_planes.py
+
+# (nombre, sql, tablas que no pueden tener TABLE ACCESS FULL, índices que deben aparecer en el plan)
+CONSULTAS = [
+    ("/examenes-asignados", main.CONSULTA_EXAMENES_ASIGNADOS.sql,
+     ["PRESENTACION_EXAMEN", "ESTUDIANTE_GRUPO"], ["IX_PE_ESTUDIANTE_EXAMEN"]),
+    ("/obtener-notas", main.CONSULTA_NOTAS_ESTUDIANTE.sql,
+     ["PRESENTACION_EXAMEN"], ["IX_PE_ESTUDIANTE_EXAMEN"]),
+    ("/mi-panel (panel.py)", panel.CONSULTA_GRUPOS,
+     ["ESTUDIANTE_GRUPO"], []),
+    ("/contenidos-estudiante-notas (contenidos.py)", contenidos.CONSULTA_CONTENIDOS,
+     ["UNIDAD_DE_CURSO", "CONTENIDO_DE_UNIDAD"], ["IX_UNIDAD_CURSO", "IX_CONTENIDO_UNIDAD"]),
+    ("/contenidos-estudiante-notas, exámenes (contenidos.py)", contenidos.CONSULTA_EXAMENES,
+     ["ESTUDIANTE_GRUPO", "EXAMEN_HORARIO"], []),
+    ("/horarios (horarios.py)", horarios.CONSULTA_HORARIOS,
+     ["HORARIO"], ["IX_HORARIO_SEMESTRE_SEMANA"]),
+    ("/estudiante_horarios (horarios.py)", horarios.CONSULTA_ESTUDIANTES,
+     ["ESTUDIANTE_GRUPO"], ["IX_ESTUDIANTE_GRUPO_GRUPO"]),
+    ("/examenes", main.CONSULTA_EXAMENES_PROFESOR.sql,
+     ["EXAMEN"], ["IX_EXAMEN_PROFESOR"]),
+    ("/banco_preguntas", main.CONSULTA_BANCO_PREGUNTAS.sql,
+     ["PREGUNTA"], ["IX_PREGUNTA_TEMA_PRIVACIDAD", "IX_PREGUNTA_PROFESOR_TEMA"]),
+    ("/preguntas_privadas", main.CONSULTA_PREGUNTAS_PRIVADAS.sql,
+     ["PREGUNTA"], ["IX_PREGUNTA_PROFESOR_TEMA"]),
+    ("/mis_preguntas", main.CONSULTA_MIS_PREGUNTAS.sql,
+     ["PREGUNTA"], ["IX_PREGUNTA_PROFESOR_TEMA"]),
+]
+
+PASOS_PLAN = """
+    SELECT OPERATION, OPTIONS, OBJECT_NAME
+    FROM PLAN_TABLE
+    WHERE STATEMENT_ID = :id
+    ORDER BY ID
+"""
+
+
+def revisar_plan(connection, sql: str, sin_full: list, indices: list) -> list:
+    identificador = uuid.uuid4().hex[:30]
+    with connection.cursor() as cursor:
+        cursor.execute(f"EXPLAIN PLAN SET STATEMENT_ID = '{identificador}' FOR {sql}")
+        cursor.execute(PASOS_PLAN, id=identificador)
+        pasos = cursor.fetchall()
+        cursor.execute("DELETE FROM PLAN_TABLE WHERE STATEMENT_ID = :id", id=identificador)
+    usados = {objeto for _, _, objeto in pasos}
+    errores = [f"TABLE ACCESS FULL en {objeto}" for operacion, opciones, objeto in pasos
+               if operacion == "TABLE ACCESS" and opciones == "FULL" and objeto in sin_full]
+    errores += [f"no usa {indice}" for indice in indices if indice not in usados]
+    return errores
+
+
+def main_planes():
+    connection = adquirir_conexion()
+    fallidas = 0
+    try:
+        for nombre, sql, sin_full, indices in CONSULTAS:
+            errores = revisar_plan(connection, sql, sin_full, indices)
+            print(f"{nombre}: {'ok' if not errores else '; '.join(errores)}")
+            fallidas += bool(errores)
+        connection.rollback()
+    finally:
+        liberar_conexion(connection)
+    sys.exit(1 if fallidas else 0)
+
+
+if __name__ == "__main__":
+    main_planes()
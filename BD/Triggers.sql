@@ -1,3 +1,6 @@
+-- Reemplazados por los compound triggers TR_AUD_<TABLA> de migraciones/V010__auditoria_por_lotes.sql
+-- (la migración borra estos triggers al aplicarse)
+
 -- Trigger para insertar acciones realizadas en estudiantes en la tabla REGISTRO
 CREATE OR REPLACE TRIGGER TR_INSERT_ESTUDIANTES
 AFTER INSERT ON ESTUDIANTE
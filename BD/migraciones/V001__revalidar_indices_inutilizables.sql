@@ -0,0 +1,16 @@
+--------------------------------------------------------
+--  Reconstruye los índices marcados UNUSABLE en el esquema
+--  (SYS_C008458 en PROFESOR, SYS_C008460 en ESTUDIANTE y SYS_C008504 en
+--  PRESENTACION_EXAMEN en el script original, ver "Reapir index.sql")
+--  y las particiones de índice que hayan quedado inutilizables.
+--------------------------------------------------------
+
+BEGIN
+    FOR i IN (SELECT INDEX_NAME FROM USER_INDEXES WHERE STATUS = 'UNUSABLE') LOOP
+        EXECUTE IMMEDIATE 'ALTER INDEX "' || i.INDEX_NAME || '" REBUILD ONLINE';
+    END LOOP;
+    FOR p IN (SELECT INDEX_NAME, PARTITION_NAME FROM USER_IND_PARTITIONS WHERE STATUS = 'UNUSABLE') LOOP
+        EXECUTE IMMEDIATE 'ALTER INDEX "' || p.INDEX_NAME || '" REBUILD PARTITION "' || p.PARTITION_NAME || '" ONLINE';
+    END LOOP;
+END;
+/
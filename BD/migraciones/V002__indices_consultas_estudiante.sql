@@ -0,0 +1,41 @@
+--------------------------------------------------------
+--  Índices compuestos para las consultas más frecuentes de estudiantes y profesores
+--    /examenes-asignados, /obtener-notas:  PRESENTACION_EXAMEN (ID_ESTUDIANTE, ID_EXAMEN)
+--    /examenes-asignados:                  ESTUDIANTE_GRUPO (ID_GRUPO), EXAMEN_HORARIO (ID_HORARIO)
+--    /examenes, banco de preguntas:        EXAMEN (ID_PROFESOR)
+--    /estudiante_horarios:                 HORARIO (SEMESTRE, SEMANA)
+--    /banco_preguntas:                     PREGUNTA (TEMA, PRIVACIDAD)
+--  Si el índice ya existe (por ejemplo creado por AgregadosPuntaje.sql) no se hace nada.
+--------------------------------------------------------
+
+CREATE OR REPLACE PROCEDURE CREAR_INDICE_SI_FALTA (p_ddl IN VARCHAR2)
+IS
+    e_nombre_usado EXCEPTION;
+    e_columnas_indexadas EXCEPTION;
+    PRAGMA EXCEPTION_INIT(e_nombre_usado, -955);
+    PRAGMA EXCEPTION_INIT(e_columnas_indexadas, -1408);
+BEGIN
+    EXECUTE IMMEDIATE p_ddl;
+EXCEPTION
+    WHEN e_nombre_usado OR e_columnas_indexadas THEN
+        NULL;
+END;
+/
+
+BEGIN
+    CREAR_INDICE_SI_FALTA('CREATE INDEX IX_PE_ESTUDIANTE_EXAMEN ON PRESENTACION_EXAMEN (ID_ESTUDIANTE, ID_EXAMEN) ONLINE');
+    CREAR_INDICE_SI_FALTA('CREATE INDEX IX_ESTUDIANTE_GRUPO_GRUPO ON ESTUDIANTE_GRUPO (ID_GRUPO, ID_ESTUDIANTE) ONLINE');
+    CREAR_INDICE_SI_FALTA('CREATE INDEX IX_EXAMEN_HORARIO_HORARIO ON EXAMEN_HORARIO (ID_HORARIO, ID_EXAMEN) ONLINE');
+    CREAR_INDICE_SI_FALTA('CREATE INDEX IX_EXAMEN_PROFESOR ON EXAMEN (ID_PROFESOR) ONLINE');
+    CREAR_INDICE_SI_FALTA('CREATE INDEX IX_HORARIO_SEMESTRE_SEMANA ON HORARIO (SEMESTRE, SEMANA) ONLINE');
+    CREAR_INDICE_SI_FALTA('CREATE INDEX IX_PREGUNTA_TEMA_PRIVACIDAD ON PREGUNTA (TEMA, PRIVACIDAD) ONLINE');
+END;
+/
+
+BEGIN
+    FOR t IN (SELECT COLUMN_VALUE AS TABLA FROM TABLE(SYS.ODCIVARCHAR2LIST(
+        'PRESENTACION_EXAMEN', 'ESTUDIANTE_GRUPO', 'EXAMEN_HORARIO', 'EXAMEN', 'HORARIO', 'PREGUNTA'))) LOOP
+        DBMS_STATS.GATHER_TABLE_STATS(USER, t.TABLA, cascade => TRUE);
+    END LOOP;
+END;
+/
@@ -0,0 +1,7 @@
+--------------------------------------------------------
+--  Tipo colección para enviar listas de IDs en un solo bind
+--  (inscripción masiva de estudiantes a un grupo; antes BD/InscripcionMasiva.sql)
+--------------------------------------------------------
+
+CREATE OR REPLACE TYPE T_NUMEROS AS TABLE OF NUMBER;
+/
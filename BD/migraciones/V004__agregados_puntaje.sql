@@ -0,0 +1,493 @@
+--------------------------------------------------------
+--  Agregados de puntaje por estudiante, grupo y examen
+--  (tableros de profesores sin recorrer todo PRESENTACION_EXAMEN)
+--
+--  Cada fila guarda cantidad de presentaciones, cantidad con puntaje,
+--  suma, mínimo, máximo y suma de cuadrados (para la varianza).
+--  Se mantienen con el trigger TR_AGG_PRESENTACION_EXAMEN y se verifican
+--  cada noche con el job JOB_AGG_VERIFICAR.
+--  Antes era BD/AgregadosPuntaje.sql, que se ejecutaba a mano: las tablas, el
+--  índice y el job se crean solo si faltan, así la migración también pasa en una
+--  base donde ya se había ejecutado ese script.
+--------------------------------------------------------
+
+-- Crea una tabla solo si no existe (el equivalente de CREAR_INDICE_SI_FALTA de V002)
+CREATE OR REPLACE PROCEDURE CREAR_TABLA_SI_FALTA (p_tabla IN VARCHAR2, p_ddl IN VARCHAR2)
+IS
+    v_existe NUMBER;
+BEGIN
+    SELECT COUNT(*) INTO v_existe FROM USER_TABLES WHERE TABLE_NAME = UPPER(p_tabla);
+    IF v_existe = 0 THEN
+        EXECUTE IMMEDIATE p_ddl;
+    END IF;
+END;
+/
+
+BEGIN
+    CREAR_TABLA_SI_FALTA('AGG_PUNTAJE_ESTUDIANTE', 'CREATE TABLE AGG_PUNTAJE_ESTUDIANTE (
+        ID_ESTUDIANTE NUMBER PRIMARY KEY,
+        CANTIDAD NUMBER DEFAULT 0 NOT NULL,
+        CANTIDAD_PUNTAJE NUMBER DEFAULT 0 NOT NULL,
+        SUMA NUMBER DEFAULT 0 NOT NULL,
+        MINIMO NUMBER,
+        MAXIMO NUMBER,
+        SUMA_CUADRADOS NUMBER DEFAULT 0 NOT NULL,
+        ACTUALIZADO DATE DEFAULT SYSDATE
+    )');
+END;
+/
+
+BEGIN
+    CREAR_TABLA_SI_FALTA('AGG_PUNTAJE_EXAMEN', 'CREATE TABLE AGG_PUNTAJE_EXAMEN (
+        ID_EXAMEN NUMBER PRIMARY KEY,
+        CANTIDAD NUMBER DEFAULT 0 NOT NULL,
+        CANTIDAD_PUNTAJE NUMBER DEFAULT 0 NOT NULL,
+        SUMA NUMBER DEFAULT 0 NOT NULL,
+        MINIMO NUMBER,
+        MAXIMO NUMBER,
+        SUMA_CUADRADOS NUMBER DEFAULT 0 NOT NULL,
+        ACTUALIZADO DATE DEFAULT SYSDATE
+    )');
+END;
+/
+
+-- Presentaciones de los estudiantes inscritos en el grupo (igual que el join de /reporte/examenes-grupo)
+BEGIN
+    CREAR_TABLA_SI_FALTA('AGG_PUNTAJE_GRUPO', 'CREATE TABLE AGG_PUNTAJE_GRUPO (
+        ID_GRUPO NUMBER PRIMARY KEY,
+        CANTIDAD NUMBER DEFAULT 0 NOT NULL,
+        CANTIDAD_PUNTAJE NUMBER DEFAULT 0 NOT NULL,
+        SUMA NUMBER DEFAULT 0 NOT NULL,
+        MINIMO NUMBER,
+        MAXIMO NUMBER,
+        SUMA_CUADRADOS NUMBER DEFAULT 0 NOT NULL,
+        ACTUALIZADO DATE DEFAULT SYSDATE
+    )');
+END;
+/
+
+-- Diferencias encontradas por AGG_VERIFICAR
+BEGIN
+    CREAR_TABLA_SI_FALTA('AGG_DESVIOS', 'CREATE TABLE AGG_DESVIOS (
+        TABLA VARCHAR2(30),
+        CLAVE NUMBER,
+        CANTIDAD_AGREGADO NUMBER,
+        CANTIDAD_REAL NUMBER,
+        SUMA_AGREGADO NUMBER,
+        SUMA_REAL NUMBER,
+        FECHA DATE DEFAULT SYSDATE
+    )');
+END;
+/
+
+-- Los recálculos por clave leen solo las presentaciones de esa clave
+-- (por estudiante con IX_PE_ESTUDIANTE_EXAMEN de V002)
+BEGIN
+    CREAR_INDICE_SI_FALTA('CREATE INDEX IX_PRESENTACION_EXAMEN_PUNTAJE ON PRESENTACION_EXAMEN (ID_EXAMEN, PUNTAJE) ONLINE');
+END;
+/
+
+--------------------------------------------------------
+--  Vistas con los agregados calculados desde cero
+--  (usadas para reconstruir y para verificar)
+--------------------------------------------------------
+
+CREATE OR REPLACE VIEW V_AGG_REAL_ESTUDIANTE AS
+    SELECT ID_ESTUDIANTE AS CLAVE,
+        COUNT(*) AS CANTIDAD,
+        COUNT(PUNTAJE) AS CANTIDAD_PUNTAJE,
+        NVL(SUM(PUNTAJE), 0) AS SUMA,
+        MIN(PUNTAJE) AS MINIMO,
+        MAX(PUNTAJE) AS MAXIMO,
+        NVL(SUM(PUNTAJE * PUNTAJE), 0) AS SUMA_CUADRADOS
+    FROM PRESENTACION_EXAMEN
+    GROUP BY ID_ESTUDIANTE;
+
+CREATE OR REPLACE VIEW V_AGG_REAL_EXAMEN AS
+    SELECT ID_EXAMEN AS CLAVE,
+        COUNT(*) AS CANTIDAD,
+        COUNT(PUNTAJE) AS CANTIDAD_PUNTAJE,
+        NVL(SUM(PUNTAJE), 0) AS SUMA,
+        MIN(PUNTAJE) AS MINIMO,
+        MAX(PUNTAJE) AS MAXIMO,
+        NVL(SUM(PUNTAJE * PUNTAJE), 0) AS SUMA_CUADRADOS
+    FROM PRESENTACION_EXAMEN
+    GROUP BY ID_EXAMEN;
+
+CREATE OR REPLACE VIEW V_AGG_REAL_GRUPO AS
+    SELECT eg.ID_GRUPO AS CLAVE,
+        COUNT(*) AS CANTIDAD,
+        COUNT(pe.PUNTAJE) AS CANTIDAD_PUNTAJE,
+        NVL(SUM(pe.PUNTAJE), 0) AS SUMA,
+        MIN(pe.PUNTAJE) AS MINIMO,
+        MAX(pe.PUNTAJE) AS MAXIMO,
+        NVL(SUM(pe.PUNTAJE * pe.PUNTAJE), 0) AS SUMA_CUADRADOS
+    FROM ESTUDIANTE_GRUPO eg
+    JOIN PRESENTACION_EXAMEN pe ON pe.ID_ESTUDIANTE = eg.ID_ESTUDIANTE
+    GROUP BY eg.ID_GRUPO;
+
+--------------------------------------------------------
+--  Suma a la fila de una clave (p_nivel: ESTUDIANTE, EXAMEN o GRUPO) lo que
+--  aportan las presentaciones nuevas de una sentencia. Si dos sesiones crean la
+--  misma clave a la vez, el MERGE que pierde recibe ORA-00001 y se repite: la
+--  segunda vez encuentra la fila y la actualiza.
+--------------------------------------------------------
+
+CREATE OR REPLACE PROCEDURE AGG_SUMAR (
+    p_nivel IN VARCHAR2,
+    p_clave IN NUMBER,
+    p_cantidad IN NUMBER,
+    p_cantidad_puntaje IN NUMBER,
+    p_suma IN NUMBER,
+    p_minimo IN NUMBER,
+    p_maximo IN NUMBER,
+    p_suma_cuadrados IN NUMBER
+)
+IS
+BEGIN
+    FOR v_intento IN 1 .. 2 LOOP
+        BEGIN
+            IF p_nivel = 'ESTUDIANTE' THEN
+                MERGE INTO AGG_PUNTAJE_ESTUDIANTE a
+                USING (SELECT p_clave AS CLAVE FROM DUAL) n ON (a.ID_ESTUDIANTE = n.CLAVE)
+                WHEN MATCHED THEN UPDATE SET
+                    a.CANTIDAD = a.CANTIDAD + p_cantidad,
+                    a.CANTIDAD_PUNTAJE = a.CANTIDAD_PUNTAJE + p_cantidad_puntaje,
+                    a.SUMA = a.SUMA + p_suma,
+                    a.MINIMO = CASE WHEN p_minimo IS NULL THEN a.MINIMO ELSE LEAST(NVL(a.MINIMO, p_minimo), p_minimo) END,
+                    a.MAXIMO = CASE WHEN p_maximo IS NULL THEN a.MAXIMO ELSE GREATEST(NVL(a.MAXIMO, p_maximo), p_maximo) END,
+                    a.SUMA_CUADRADOS = a.SUMA_CUADRADOS + p_suma_cuadrados,
+                    a.ACTUALIZADO = SYSDATE
+                WHEN NOT MATCHED THEN INSERT (ID_ESTUDIANTE, CANTIDAD, CANTIDAD_PUNTAJE, SUMA, MINIMO, MAXIMO, SUMA_CUADRADOS)
+                    VALUES (n.CLAVE, p_cantidad, p_cantidad_puntaje, p_suma, p_minimo, p_maximo, p_suma_cuadrados);
+            ELSIF p_nivel = 'EXAMEN' THEN
+                MERGE INTO AGG_PUNTAJE_EXAMEN a
+                USING (SELECT p_clave AS CLAVE FROM DUAL) n ON (a.ID_EXAMEN = n.CLAVE)
+                WHEN MATCHED THEN UPDATE SET
+                    a.CANTIDAD = a.CANTIDAD + p_cantidad,
+                    a.CANTIDAD_PUNTAJE = a.CANTIDAD_PUNTAJE + p_cantidad_puntaje,
+                    a.SUMA = a.SUMA + p_suma,
+                    a.MINIMO = CASE WHEN p_minimo IS NULL THEN a.MINIMO ELSE LEAST(NVL(a.MINIMO, p_minimo), p_minimo) END,
+                    a.MAXIMO = CASE WHEN p_maximo IS NULL THEN a.MAXIMO ELSE GREATEST(NVL(a.MAXIMO, p_maximo), p_maximo) END,
+                    a.SUMA_CUADRADOS = a.SUMA_CUADRADOS + p_suma_cuadrados,
+                    a.ACTUALIZADO = SYSDATE
+                WHEN NOT MATCHED THEN INSERT (ID_EXAMEN, CANTIDAD, CANTIDAD_PUNTAJE, SUMA, MINIMO, MAXIMO, SUMA_CUADRADOS)
+                    VALUES (n.CLAVE, p_cantidad, p_cantidad_puntaje, p_suma, p_minimo, p_maximo, p_suma_cuadrados);
+            ELSE
+                MERGE INTO AGG_PUNTAJE_GRUPO a
+                USING (SELECT p_clave AS CLAVE FROM DUAL) n ON (a.ID_GRUPO = n.CLAVE)
+                WHEN MATCHED THEN UPDATE SET
+                    a.CANTIDAD = a.CANTIDAD + p_cantidad,
+                    a.CANTIDAD_PUNTAJE = a.CANTIDAD_PUNTAJE + p_cantidad_puntaje,
+                    a.SUMA = a.SUMA + p_suma,
+                    a.MINIMO = CASE WHEN p_minimo IS NULL THEN a.MINIMO ELSE LEAST(NVL(a.MINIMO, p_minimo), p_minimo) END,
+                    a.MAXIMO = CASE WHEN p_maximo IS NULL THEN a.MAXIMO ELSE GREATEST(NVL(a.MAXIMO, p_maximo), p_maximo) END,
+                    a.SUMA_CUADRADOS = a.SUMA_CUADRADOS + p_suma_cuadrados,
+                    a.ACTUALIZADO = SYSDATE
+                WHEN NOT MATCHED THEN INSERT (ID_GRUPO, CANTIDAD, CANTIDAD_PUNTAJE, SUMA, MINIMO, MAXIMO, SUMA_CUADRADOS)
+                    VALUES (n.CLAVE, p_cantidad, p_cantidad_puntaje, p_suma, p_minimo, p_maximo, p_suma_cuadrados);
+            END IF;
+            EXIT;
+        EXCEPTION
+            WHEN DUP_VAL_ON_INDEX THEN
+                IF v_intento = 2 THEN
+                    RAISE;
+                END IF;
+        END;
+    END LOOP;
+END;
+/
+
+--------------------------------------------------------
+--  Recálculo de una clave desde PRESENTACION_EXAMEN
+--  (cambios de puntaje, borrados e inscripciones retiradas: el mínimo
+--  y el máximo no se pueden "restar")
+--------------------------------------------------------
+
+CREATE OR REPLACE PROCEDURE AGG_RECALCULAR_ESTUDIANTE (p_id_estudiante IN NUMBER)
+IS
+BEGIN
+    DELETE FROM AGG_PUNTAJE_ESTUDIANTE WHERE ID_ESTUDIANTE = p_id_estudiante;
+    INSERT INTO AGG_PUNTAJE_ESTUDIANTE (ID_ESTUDIANTE, CANTIDAD, CANTIDAD_PUNTAJE, SUMA, MINIMO, MAXIMO, SUMA_CUADRADOS)
+    SELECT p_id_estudiante, COUNT(*), COUNT(PUNTAJE), NVL(SUM(PUNTAJE), 0), MIN(PUNTAJE), MAX(PUNTAJE), NVL(SUM(PUNTAJE * PUNTAJE), 0)
+    FROM PRESENTACION_EXAMEN
+    WHERE ID_ESTUDIANTE = p_id_estudiante
+    HAVING COUNT(*) > 0;
+END;
+/
+
+CREATE OR REPLACE PROCEDURE AGG_RECALCULAR_EXAMEN (p_id_examen IN NUMBER)
+IS
+BEGIN
+    DELETE FROM AGG_PUNTAJE_EXAMEN WHERE ID_EXAMEN = p_id_examen;
+    INSERT INTO AGG_PUNTAJE_EXAMEN (ID_EXAMEN, CANTIDAD, CANTIDAD_PUNTAJE, SUMA, MINIMO, MAXIMO, SUMA_CUADRADOS)
+    SELECT p_id_examen, COUNT(*), COUNT(PUNTAJE), NVL(SUM(PUNTAJE), 0), MIN(PUNTAJE), MAX(PUNTAJE), NVL(SUM(PUNTAJE * PUNTAJE), 0)
+    FROM PRESENTACION_EXAMEN
+    WHERE ID_EXAMEN = p_id_examen
+    HAVING COUNT(*) > 0;
+END;
+/
+
+CREATE OR REPLACE PROCEDURE AGG_RECALCULAR_GRUPO (p_id_grupo IN NUMBER)
+IS
+BEGIN
+    DELETE FROM AGG_PUNTAJE_GRUPO WHERE ID_GRUPO = p_id_grupo;
+    INSERT INTO AGG_PUNTAJE_GRUPO (ID_GRUPO, CANTIDAD, CANTIDAD_PUNTAJE, SUMA, MINIMO, MAXIMO, SUMA_CUADRADOS)
+    SELECT p_id_grupo, COUNT(*), COUNT(pe.PUNTAJE), NVL(SUM(pe.PUNTAJE), 0), MIN(pe.PUNTAJE), MAX(pe.PUNTAJE), NVL(SUM(pe.PUNTAJE * pe.PUNTAJE), 0)
+    FROM ESTUDIANTE_GRUPO eg
+    JOIN PRESENTACION_EXAMEN pe ON pe.ID_ESTUDIANTE = eg.ID_ESTUDIANTE
+    WHERE eg.ID_GRUPO = p_id_grupo
+    HAVING COUNT(*) > 0;
+END;
+/
+
+--------------------------------------------------------
+--  Mantenimiento automático
+--  Las inserciones se acumulan en memoria por clave durante la sentencia y al
+--  final se suma una vez por estudiante, grupo y examen (como los triggers de
+--  auditoría de V010): un lote de la ingesta con cientos de presentaciones del
+--  mismo examen toca su fila una sola vez. Las claves se recorren en orden para
+--  que dos sesiones no se bloqueen en orden inverso.
+--  Las actualizaciones y borrados anotan las claves y las recalculan al
+--  final de la sentencia, cuando ya se puede leer PRESENTACION_EXAMEN.
+--------------------------------------------------------
+
+CREATE OR REPLACE TRIGGER TR_AGG_PRESENTACION_EXAMEN
+FOR INSERT OR UPDATE OF ID_ESTUDIANTE, ID_EXAMEN, PUNTAJE OR DELETE ON PRESENTACION_EXAMEN
+COMPOUND TRIGGER
+    TYPE t_claves IS TABLE OF BOOLEAN INDEX BY PLS_INTEGER;
+    TYPE t_suma IS RECORD (
+        CANTIDAD NUMBER := 0,
+        CANTIDAD_PUNTAJE NUMBER := 0,
+        SUMA NUMBER := 0,
+        MINIMO NUMBER,
+        MAXIMO NUMBER,
+        SUMA_CUADRADOS NUMBER := 0
+    );
+    TYPE t_sumas IS TABLE OF t_suma INDEX BY PLS_INTEGER;
+    v_estudiantes t_claves;
+    v_examenes t_claves;
+    v_sumas_estudiante t_sumas;
+    v_sumas_examen t_sumas;
+
+    PROCEDURE acumular (p_sumas IN OUT NOCOPY t_sumas, p_clave IN PLS_INTEGER, p_suma IN t_suma) IS
+        v t_suma;
+    BEGIN
+        IF p_sumas.EXISTS(p_clave) THEN
+            v := p_sumas(p_clave);
+        END IF;
+        v.CANTIDAD := v.CANTIDAD + p_suma.CANTIDAD;
+        v.CANTIDAD_PUNTAJE := v.CANTIDAD_PUNTAJE + p_suma.CANTIDAD_PUNTAJE;
+        v.SUMA := v.SUMA + p_suma.SUMA;
+        v.MINIMO := CASE WHEN p_suma.MINIMO IS NULL THEN v.MINIMO ELSE LEAST(NVL(v.MINIMO, p_suma.MINIMO), p_suma.MINIMO) END;
+        v.MAXIMO := CASE WHEN p_suma.MAXIMO IS NULL THEN v.MAXIMO ELSE GREATEST(NVL(v.MAXIMO, p_suma.MAXIMO), p_suma.MAXIMO) END;
+        v.SUMA_CUADRADOS := v.SUMA_CUADRADOS + p_suma.SUMA_CUADRADOS;
+        p_sumas(p_clave) := v;
+    END acumular;
+
+    PROCEDURE aplicar (p_nivel IN VARCHAR2, p_sumas IN t_sumas) IS
+        v_id PLS_INTEGER := p_sumas.FIRST;
+    BEGIN
+        WHILE v_id IS NOT NULL LOOP
+            AGG_SUMAR(p_nivel, v_id, p_sumas(v_id).CANTIDAD, p_sumas(v_id).CANTIDAD_PUNTAJE, p_sumas(v_id).SUMA,
+                      p_sumas(v_id).MINIMO, p_sumas(v_id).MAXIMO, p_sumas(v_id).SUMA_CUADRADOS);
+            v_id := p_sumas.NEXT(v_id);
+        END LOOP;
+    END aplicar;
+
+    AFTER EACH ROW IS
+        v_fila t_suma;
+    BEGIN
+        IF INSERTING THEN
+            v_fila.CANTIDAD := 1;
+            v_fila.CANTIDAD_PUNTAJE := CASE WHEN :NEW.PUNTAJE IS NULL THEN 0 ELSE 1 END;
+            v_fila.SUMA := NVL(:NEW.PUNTAJE, 0);
+            v_fila.MINIMO := :NEW.PUNTAJE;
+            v_fila.MAXIMO := :NEW.PUNTAJE;
+            v_fila.SUMA_CUADRADOS := NVL(:NEW.PUNTAJE * :NEW.PUNTAJE, 0);
+            acumular(v_sumas_estudiante, :NEW.ID_ESTUDIANTE, v_fila);
+            acumular(v_sumas_examen, :NEW.ID_EXAMEN, v_fila);
+        ELSE
+            v_estudiantes(:OLD.ID_ESTUDIANTE) := TRUE;
+            v_examenes(:OLD.ID_EXAMEN) := TRUE;
+            IF UPDATING THEN
+                v_estudiantes(:NEW.ID_ESTUDIANTE) := TRUE;
+                v_examenes(:NEW.ID_EXAMEN) := TRUE;
+            END IF;
+        END IF;
+    END AFTER EACH ROW;
+
+    AFTER STATEMENT IS
+        v_id PLS_INTEGER;
+        v_sumas_grupo t_sumas;
+    BEGIN
+        -- Cada grupo suma las presentaciones de sus estudiantes inscritos
+        v_id := v_sumas_estudiante.FIRST;
+        WHILE v_id IS NOT NULL LOOP
+            FOR g IN (SELECT ID_GRUPO FROM ESTUDIANTE_GRUPO WHERE ID_ESTUDIANTE = v_id) LOOP
+                acumular(v_sumas_grupo, g.ID_GRUPO, v_sumas_estudiante(v_id));
+            END LOOP;
+            v_id := v_sumas_estudiante.NEXT(v_id);
+        END LOOP;
+        aplicar('ESTUDIANTE', v_sumas_estudiante);
+        aplicar('GRUPO', v_sumas_grupo);
+        aplicar('EXAMEN', v_sumas_examen);
+
+        v_id := v_estudiantes.FIRST;
+        WHILE v_id IS NOT NULL LOOP
+            AGG_RECALCULAR_ESTUDIANTE(v_id);
+            FOR g IN (SELECT ID_GRUPO FROM ESTUDIANTE_GRUPO WHERE ID_ESTUDIANTE = v_id) LOOP
+                AGG_RECALCULAR_GRUPO(g.ID_GRUPO);
+            END LOOP;
+            v_id := v_estudiantes.NEXT(v_id);
+        END LOOP;
+
+        v_id := v_examenes.FIRST;
+        WHILE v_id IS NOT NULL LOOP
+            AGG_RECALCULAR_EXAMEN(v_id);
+            v_id := v_examenes.NEXT(v_id);
+        END LOOP;
+    END AFTER STATEMENT;
+END TR_AGG_PRESENTACION_EXAMEN;
+/
+
+-- Inscribir o retirar a un estudiante cambia qué presentaciones cuentan para el grupo
+CREATE OR REPLACE TRIGGER TR_AGG_ESTUDIANTE_GRUPO
+FOR INSERT OR UPDATE OR DELETE ON ESTUDIANTE_GRUPO
+COMPOUND TRIGGER
+    TYPE t_claves IS TABLE OF BOOLEAN INDEX BY PLS_INTEGER;
+    v_grupos t_claves;
+
+    AFTER EACH ROW IS
+    BEGIN
+        IF DELETING OR UPDATING THEN
+            v_grupos(:OLD.ID_GRUPO) := TRUE;
+        END IF;
+        IF INSERTING OR UPDATING THEN
+            v_grupos(:NEW.ID_GRUPO) := TRUE;
+        END IF;
+    END AFTER EACH ROW;
+
+    AFTER STATEMENT IS
+        v_id PLS_INTEGER;
+    BEGIN
+        v_id := v_grupos.FIRST;
+        WHILE v_id IS NOT NULL LOOP
+            AGG_RECALCULAR_GRUPO(v_id);
+            v_id := v_grupos.NEXT(v_id);
+        END LOOP;
+    END AFTER STATEMENT;
+END TR_AGG_ESTUDIANTE_GRUPO;
+/
+
+--------------------------------------------------------
+--  Reconstrucción completa (carga inicial o después de reparar desvíos)
+--------------------------------------------------------
+
+CREATE OR REPLACE PROCEDURE AGG_RECONSTRUIR
+IS
+BEGIN
+    DELETE FROM AGG_PUNTAJE_ESTUDIANTE;
+    INSERT INTO AGG_PUNTAJE_ESTUDIANTE (ID_ESTUDIANTE, CANTIDAD, CANTIDAD_PUNTAJE, SUMA, MINIMO, MAXIMO, SUMA_CUADRADOS)
+    SELECT CLAVE, CANTIDAD, CANTIDAD_PUNTAJE, SUMA, MINIMO, MAXIMO, SUMA_CUADRADOS FROM V_AGG_REAL_ESTUDIANTE;
+
+    DELETE FROM AGG_PUNTAJE_EXAMEN;
+    INSERT INTO AGG_PUNTAJE_EXAMEN (ID_EXAMEN, CANTIDAD, CANTIDAD_PUNTAJE, SUMA, MINIMO, MAXIMO, SUMA_CUADRADOS)
+    SELECT CLAVE, CANTIDAD, CANTIDAD_PUNTAJE, SUMA, MINIMO, MAXIMO, SUMA_CUADRADOS FROM V_AGG_REAL_EXAMEN;
+
+    DELETE FROM AGG_PUNTAJE_GRUPO;
+    INSERT INTO AGG_PUNTAJE_GRUPO (ID_GRUPO, CANTIDAD, CANTIDAD_PUNTAJE, SUMA, MINIMO, MAXIMO, SUMA_CUADRADOS)
+    SELECT CLAVE, CANTIDAD, CANTIDAD_PUNTAJE, SUMA, MINIMO, MAXIMO, SUMA_CUADRADOS FROM V_AGG_REAL_GRUPO;
+    COMMIT;
+END;
+/
+
+--------------------------------------------------------
+--  Verificación de consistencia: compara cada agregado con el cálculo
+--  desde cero, guarda las diferencias en AGG_DESVIOS y, si p_reparar = 1,
+--  recalcula las claves con diferencias. p_desvios devuelve la cantidad de
+--  desvíos. Es un procedimiento (escribe y hace COMMIT): no se puede llamar
+--  desde un SELECT.
+--------------------------------------------------------
+
+-- Bases donde ya se había ejecutado BD/AgregadosPuntaje.sql: ahí era una función
+BEGIN
+    FOR f IN (SELECT 1 FROM USER_OBJECTS WHERE OBJECT_NAME = 'AGG_VERIFICAR' AND OBJECT_TYPE = 'FUNCTION') LOOP
+        EXECUTE IMMEDIATE 'DROP FUNCTION AGG_VERIFICAR';
+    END LOOP;
+END;
+/
+
+CREATE OR REPLACE PROCEDURE AGG_VERIFICAR (p_reparar IN NUMBER DEFAULT 1, p_desvios OUT NUMBER)
+IS
+    v_desvios NUMBER := 0;
+BEGIN
+    FOR d IN (
+        SELECT 'AGG_PUNTAJE_ESTUDIANTE' AS TABLA, NVL(a.ID_ESTUDIANTE, r.CLAVE) AS CLAVE,
+            a.CANTIDAD AS CANTIDAD_AGREGADO, r.CANTIDAD AS CANTIDAD_REAL, a.SUMA AS SUMA_AGREGADO, r.SUMA AS SUMA_REAL
+        FROM AGG_PUNTAJE_ESTUDIANTE a
+        FULL OUTER JOIN V_AGG_REAL_ESTUDIANTE r ON r.CLAVE = a.ID_ESTUDIANTE
+        WHERE DECODE(a.CANTIDAD, r.CANTIDAD, 0, 1) = 1 OR DECODE(a.CANTIDAD_PUNTAJE, r.CANTIDAD_PUNTAJE, 0, 1) = 1
+            OR DECODE(a.SUMA, r.SUMA, 0, 1) = 1 OR DECODE(a.MINIMO, r.MINIMO, 0, 1) = 1
+            OR DECODE(a.MAXIMO, r.MAXIMO, 0, 1) = 1 OR DECODE(a.SUMA_CUADRADOS, r.SUMA_CUADRADOS, 0, 1) = 1
+        UNION ALL
+        SELECT 'AGG_PUNTAJE_EXAMEN', NVL(a.ID_EXAMEN, r.CLAVE), a.CANTIDAD, r.CANTIDAD, a.SUMA, r.SUMA
+        FROM AGG_PUNTAJE_EXAMEN a
+        FULL OUTER JOIN V_AGG_REAL_EXAMEN r ON r.CLAVE = a.ID_EXAMEN
+        WHERE DECODE(a.CANTIDAD, r.CANTIDAD, 0, 1) = 1 OR DECODE(a.CANTIDAD_PUNTAJE, r.CANTIDAD_PUNTAJE, 0, 1) = 1
+            OR DECODE(a.SUMA, r.SUMA, 0, 1) = 1 OR DECODE(a.MINIMO, r.MINIMO, 0, 1) = 1
+            OR DECODE(a.MAXIMO, r.MAXIMO, 0, 1) = 1 OR DECODE(a.SUMA_CUADRADOS, r.SUMA_CUADRADOS, 0, 1) = 1
+        UNION ALL
+        SELECT 'AGG_PUNTAJE_GRUPO', NVL(a.ID_GRUPO, r.CLAVE), a.CANTIDAD, r.CANTIDAD, a.SUMA, r.SUMA
+        FROM AGG_PUNTAJE_GRUPO a
+        FULL OUTER JOIN V_AGG_REAL_GRUPO r ON r.CLAVE = a.ID_GRUPO
+        WHERE DECODE(a.CANTIDAD, r.CANTIDAD, 0, 1) = 1 OR DECODE(a.CANTIDAD_PUNTAJE, r.CANTIDAD_PUNTAJE, 0, 1) = 1
+            OR DECODE(a.SUMA, r.SUMA, 0, 1) = 1 OR DECODE(a.MINIMO, r.MINIMO, 0, 1) = 1
+            OR DECODE(a.MAXIMO, r.MAXIMO, 0, 1) = 1 OR DECODE(a.SUMA_CUADRADOS, r.SUMA_CUADRADOS, 0, 1) = 1
+    ) LOOP
+        v_desvios := v_desvios + 1;
+        INSERT INTO AGG_DESVIOS (TABLA, CLAVE, CANTIDAD_AGREGADO, CANTIDAD_REAL, SUMA_AGREGADO, SUMA_REAL)
+        VALUES (d.TABLA, d.CLAVE, d.CANTIDAD_AGREGADO, d.CANTIDAD_REAL, d.SUMA_AGREGADO, d.SUMA_REAL);
+        IF p_reparar = 1 THEN
+            IF d.TABLA = 'AGG_PUNTAJE_ESTUDIANTE' THEN
+                AGG_RECALCULAR_ESTUDIANTE(d.CLAVE);
+            ELSIF d.TABLA = 'AGG_PUNTAJE_EXAMEN' THEN
+                AGG_RECALCULAR_EXAMEN(d.CLAVE);
+            ELSE
+                AGG_RECALCULAR_GRUPO(d.CLAVE);
+            END IF;
+        END IF;
+    END LOOP;
+    COMMIT;
+    p_desvios := v_desvios;
+END;
+/
+
+-- Carga inicial de los agregados con el historial existente
+BEGIN
+    AGG_RECONSTRUIR;
+END;
+/
+
+-- Verificación nocturna (fuera del horario de exámenes); si el job ya existía se
+-- actualiza su acción para llamar al procedimiento
+DECLARE
+    v_existe NUMBER;
+    v_accion VARCHAR2(100) := 'DECLARE v NUMBER; BEGIN AGG_VERIFICAR(1, v); END;';
+BEGIN
+    SELECT COUNT(*) INTO v_existe FROM USER_SCHEDULER_JOBS WHERE JOB_NAME = 'JOB_AGG_VERIFICAR';
+    IF v_existe > 0 THEN
+        DBMS_SCHEDULER.SET_ATTRIBUTE('JOB_AGG_VERIFICAR', 'job_action', v_accion);
+        RETURN;
+    END IF;
+    DBMS_SCHEDULER.CREATE_JOB(
+        job_name => 'JOB_AGG_VERIFICAR',
+        job_type => 'PLSQL_BLOCK',
+        job_action => v_accion,
+        start_date => SYSTIMESTAMP,
+        repeat_interval => 'FREQ=DAILY; BYHOUR=3; BYMINUTE=0',
+        enabled => TRUE,
+        comments => 'Compara los agregados de puntaje con PRESENTACION_EXAMEN y repara desvíos'
+    );
+END;
+/
@@ -0,0 +1,111 @@
+--------------------------------------------------------
+--  Mejor puntaje de cada estudiante en cada examen
+--  (base de las clasificaciones top-N de /reporte/clasificacion)
+--
+--  Se actualiza al guardar cada presentación: un estudiante que repite un
+--  examen ocupa una sola fila, y el top-N de un examen se lee recorriendo
+--  IX_MEJOR_PUNTAJE_EXAMEN en orden hasta completar N filas.
+--  Antes era BD/MejoresPuntajes.sql; como en V004, la tabla y sus índices se
+--  crean solo si faltan y la carga inicial reemplaza lo que hubiera.
+--------------------------------------------------------
+
+BEGIN
+    CREAR_INDICE_SI_FALTA('CREATE TABLE MEJOR_PUNTAJE (
+        ID_EXAMEN NUMBER NOT NULL,
+        ID_ESTUDIANTE NUMBER NOT NULL,
+        PUNTAJE NUMBER NOT NULL,
+        FECHA_PRESENTACION DATE,
+        ID_PRESENTACION_EXAMEN NUMBER,
+        CONSTRAINT MEJOR_PUNTAJE_PK PRIMARY KEY (ID_EXAMEN, ID_ESTUDIANTE)
+    )');
+    CREAR_INDICE_SI_FALTA('CREATE INDEX IX_MEJOR_PUNTAJE_EXAMEN ON MEJOR_PUNTAJE (ID_EXAMEN, PUNTAJE DESC, FECHA_PRESENTACION)');
+    CREAR_INDICE_SI_FALTA('CREATE INDEX IX_MEJOR_PUNTAJE_ESTUDIANTE ON MEJOR_PUNTAJE (ID_ESTUDIANTE)');
+END;
+/
+
+-- Reemplaza la fila solo si el puntaje nuevo es mayor (en un empate se queda la presentación más antigua)
+CREATE OR REPLACE PROCEDURE MEJOR_PUNTAJE_REGISTRAR (
+    p_id_presentacion_examen IN NUMBER,
+    p_id_estudiante IN NUMBER,
+    p_id_examen IN NUMBER,
+    p_puntaje IN NUMBER,
+    p_fecha_presentacion IN DATE
+)
+IS
+BEGIN
+    IF p_puntaje IS NULL THEN
+        RETURN;
+    END IF;
+    MERGE INTO MEJOR_PUNTAJE m
+    USING (SELECT p_id_examen AS ID_EXAMEN, p_id_estudiante AS ID_ESTUDIANTE FROM DUAL) n
+    ON (m.ID_EXAMEN = n.ID_EXAMEN AND m.ID_ESTUDIANTE = n.ID_ESTUDIANTE)
+    WHEN MATCHED THEN UPDATE SET
+        m.PUNTAJE = p_puntaje,
+        m.FECHA_PRESENTACION = p_fecha_presentacion,
+        m.ID_PRESENTACION_EXAMEN = p_id_presentacion_examen
+        WHERE p_puntaje > m.PUNTAJE
+    WHEN NOT MATCHED THEN INSERT (ID_EXAMEN, ID_ESTUDIANTE, PUNTAJE, FECHA_PRESENTACION, ID_PRESENTACION_EXAMEN)
+        VALUES (p_id_examen, p_id_estudiante, p_puntaje, p_fecha_presentacion, p_id_presentacion_examen);
+END;
+/
+
+-- Vuelve a calcular las filas de un estudiante (cambios de puntaje y borrados)
+CREATE OR REPLACE PROCEDURE MEJOR_PUNTAJE_RECALCULAR (p_id_estudiante IN NUMBER)
+IS
+BEGIN
+    DELETE FROM MEJOR_PUNTAJE WHERE ID_ESTUDIANTE = p_id_estudiante;
+    INSERT INTO MEJOR_PUNTAJE (ID_EXAMEN, ID_ESTUDIANTE, PUNTAJE, FECHA_PRESENTACION, ID_PRESENTACION_EXAMEN)
+    SELECT ID_EXAMEN, ID_ESTUDIANTE, PUNTAJE, FECHA_PRESENTACION, ID_PRESENTACION_EXAMEN
+    FROM (
+        SELECT pe.*, ROW_NUMBER() OVER (PARTITION BY ID_EXAMEN ORDER BY PUNTAJE DESC, FECHA_PRESENTACION, ID_PRESENTACION_EXAMEN) AS n
+        FROM PRESENTACION_EXAMEN pe
+        WHERE ID_ESTUDIANTE = p_id_estudiante AND PUNTAJE IS NOT NULL
+    )
+    WHERE n = 1;
+END;
+/
+
+CREATE OR REPLACE TRIGGER TR_MEJOR_PUNTAJE
+FOR INSERT OR UPDATE OF ID_ESTUDIANTE, ID_EXAMEN, PUNTAJE, FECHA_PRESENTACION OR DELETE ON PRESENTACION_EXAMEN
+COMPOUND TRIGGER
+    TYPE t_claves IS TABLE OF BOOLEAN INDEX BY PLS_INTEGER;
+    v_estudiantes t_claves;
+
+    AFTER EACH ROW IS
+    BEGIN
+        IF INSERTING THEN
+            MEJOR_PUNTAJE_REGISTRAR(:NEW.ID_PRESENTACION_EXAMEN, :NEW.ID_ESTUDIANTE, :NEW.ID_EXAMEN,
+                                    :NEW.PUNTAJE, :NEW.FECHA_PRESENTACION);
+        ELSE
+            v_estudiantes(:OLD.ID_ESTUDIANTE) := TRUE;
+            IF UPDATING THEN
+                v_estudiantes(:NEW.ID_ESTUDIANTE) := TRUE;
+            END IF;
+        END IF;
+    END AFTER EACH ROW;
+
+    AFTER STATEMENT IS
+        v_id PLS_INTEGER;
+    BEGIN
+        v_id := v_estudiantes.FIRST;
+        WHILE v_id IS NOT NULL LOOP
+            MEJOR_PUNTAJE_RECALCULAR(v_id);
+            v_id := v_estudiantes.NEXT(v_id);
+        END LOOP;
+    END AFTER STATEMENT;
+END TR_MEJOR_PUNTAJE;
+/
+
+-- Carga inicial con el historial existente
+DELETE FROM MEJOR_PUNTAJE;
+
+INSERT INTO MEJOR_PUNTAJE (ID_EXAMEN, ID_ESTUDIANTE, PUNTAJE, FECHA_PRESENTACION, ID_PRESENTACION_EXAMEN)
+SELECT ID_EXAMEN, ID_ESTUDIANTE, PUNTAJE, FECHA_PRESENTACION, ID_PRESENTACION_EXAMEN
+FROM (
+    SELECT pe.*, ROW_NUMBER() OVER (PARTITION BY ID_EXAMEN, ID_ESTUDIANTE
+                                    ORDER BY PUNTAJE DESC, FECHA_PRESENTACION, ID_PRESENTACION_EXAMEN) AS n
+    FROM PRESENTACION_EXAMEN pe
+    WHERE PUNTAJE IS NOT NULL
+)
+WHERE n = 1;
+COMMIT;
@@ -0,0 +1,101 @@
+--------------------------------------------------------
+--  PRESENTACION_EXAMEN particionada por semestre según FECHA_PRESENTACION
+--  (intervalo de 6 meses desde el 1 de enero: la partición de enero-junio es el
+--  semestre <año>-1 y la de julio-diciembre el <año>-2).
+--
+--  Los índices que se consultan sin fecha (por estudiante o por examen) y la clave
+--  primaria siguen globales: como índices locales sin la fecha al frente cada búsqueda
+--  recorrería todas las particiones (/examenes-asignados, /mi-panel, /obtener-notas).
+--  Solo el índice de los reportes por semestre, que empieza por la fecha, es local.
+--  Las particiones de semestres cerrados se mueven
+--  comprimidas a TABLES_RESPUESTA_HIST (BD/tablespace.sql) con ARCHIVAR_SEMESTRES.
+--------------------------------------------------------
+
+-- Una tabla con partición por intervalo no admite la clave de partición nula:
+-- las presentaciones sin fecha quedan en la partición inicial (histórica)
+UPDATE PRESENTACION_EXAMEN SET FECHA_PRESENTACION = DATE '2000-01-01' WHERE FECHA_PRESENTACION IS NULL;
+COMMIT;
+
+ALTER TABLE PRESENTACION_EXAMEN MODIFY FECHA_PRESENTACION DEFAULT SYSDATE NOT NULL;
+
+ALTER TABLE PRESENTACION_EXAMEN MODIFY
+    PARTITION BY RANGE (FECHA_PRESENTACION)
+    INTERVAL (NUMTOYMINTERVAL(6, 'MONTH'))
+    (PARTITION P_HISTORICO VALUES LESS THAN (DATE '2024-01-01'))
+    ONLINE
+    UPDATE INDEXES (
+        IX_PE_ESTUDIANTE_EXAMEN GLOBAL,
+        IX_PRESENTACION_EXAMEN_PUNTAJE GLOBAL
+    );
+
+-- Reportes por semestre (periodos.filtro_semestre): rango de fechas y examen
+BEGIN
+    CREAR_INDICE_SI_FALTA('CREATE INDEX IX_PE_FECHA_EXAMEN ON PRESENTACION_EXAMEN (FECHA_PRESENTACION, ID_EXAMEN) LOCAL ONLINE');
+END;
+/
+
+-- Nombre del semestre (AAAA-S) que contiene una fecha
+CREATE OR REPLACE FUNCTION SEMESTRE_DE_FECHA (p_fecha IN DATE) RETURN VARCHAR2 DETERMINISTIC
+IS
+BEGIN
+    RETURN TO_CHAR(p_fecha, 'YYYY') || '-' || CASE WHEN EXTRACT(MONTH FROM p_fecha) <= 6 THEN '1' ELSE '2' END;
+END;
+/
+
+--------------------------------------------------------
+--  Archivo de semestres cerrados
+--  Renombra las particiones de intervalo (SYS_Pnnn) como P_AAAA_S y mueve las de
+--  semestres ya terminados hace más de p_meses_gracia meses a TABLES_RESPUESTA_HIST
+--  con compresión básica. UPDATE INDEXES mantiene la clave primaria global utilizable
+--  y ONLINE permite seguir insertando en el semestre actual mientras tanto.
+--------------------------------------------------------
+
+CREATE OR REPLACE PROCEDURE ARCHIVAR_SEMESTRES (p_meses_gracia IN NUMBER DEFAULT 1)
+IS
+    v_limite DATE;
+    v_nombre VARCHAR2(128);
+BEGIN
+    FOR p IN (
+        SELECT PARTITION_NAME, HIGH_VALUE, TABLESPACE_NAME
+        FROM USER_TAB_PARTITIONS
+        WHERE TABLE_NAME = 'PRESENTACION_EXAMEN'
+    ) LOOP
+        EXECUTE IMMEDIATE 'SELECT ' || p.HIGH_VALUE || ' FROM DUAL' INTO v_limite;
+
+        v_nombre := p.PARTITION_NAME;
+        IF v_nombre LIKE 'SYS\_P%' ESCAPE '\' THEN
+            v_nombre := 'P_' || REPLACE(SEMESTRE_DE_FECHA(v_limite - 1), '-', '_');
+            EXECUTE IMMEDIATE 'ALTER TABLE PRESENTACION_EXAMEN RENAME PARTITION "'
+                || p.PARTITION_NAME || '" TO ' || v_nombre;
+        END IF;
+
+        IF ADD_MONTHS(v_limite, p_meses_gracia) <= SYSDATE AND p.TABLESPACE_NAME != 'TABLES_RESPUESTA_HIST' THEN
+            EXECUTE IMMEDIATE 'ALTER TABLE PRESENTACION_EXAMEN MOVE PARTITION ' || v_nombre
+                || ' TABLESPACE TABLES_RESPUESTA_HIST ROW STORE COMPRESS BASIC UPDATE INDEXES ONLINE';
+            INSERT INTO REGISTRO (TABLA_ACTUALIZADA, ACCION_REALIZADA, FECHA_ACTUALIZACION)
+            VALUES ('PRESENTACION_EXAMEN', 'ARCHIVO ' || v_nombre, SYSDATE);
+            COMMIT;
+        END IF;
+    END LOOP;
+END;
+/
+
+-- Revisión mensual (los semestres cierran en junio y diciembre)
+DECLARE
+    v_existe NUMBER;
+BEGIN
+    SELECT COUNT(*) INTO v_existe FROM USER_SCHEDULER_JOBS WHERE JOB_NAME = 'JOB_ARCHIVAR_SEMESTRES';
+    IF v_existe > 0 THEN
+        RETURN;
+    END IF;
+    DBMS_SCHEDULER.CREATE_JOB(
+        job_name => 'JOB_ARCHIVAR_SEMESTRES',
+        job_type => 'PLSQL_BLOCK',
+        job_action => 'BEGIN ARCHIVAR_SEMESTRES(1); END;',
+        start_date => SYSTIMESTAMP,
+        repeat_interval => 'FREQ=MONTHLY; BYMONTHDAY=1; BYHOUR=2; BYMINUTE=0',
+        enabled => TRUE,
+        comments => 'Mueve las particiones de semestres cerrados de PRESENTACION_EXAMEN a TABLES_RESPUESTA_HIST comprimidas'
+    );
+END;
+/
@@ -0,0 +1,23 @@
+--------------------------------------------------------
+--  Soporte para la ingesta por lotes de presentaciones (BACKEND/ingesta.py)
+--    - Secuencia para ID_PRESENTACION_EXAMEN, que hasta ahora quedaba nulo
+--    - Clave de idempotencia única: un envío repetido o reprocesado tras una
+--      caída no se guarda dos veces
+--------------------------------------------------------
+
+DECLARE
+    v_inicio NUMBER;
+BEGIN
+    SELECT NVL(MAX(ID_PRESENTACION_EXAMEN), 0) + 1 INTO v_inicio FROM PRESENTACION_EXAMEN;
+    EXECUTE IMMEDIATE 'CREATE SEQUENCE secuencia_presentacion START WITH ' || v_inicio || ' INCREMENT BY 1 CACHE 1000';
+END;
+/
+
+UPDATE PRESENTACION_EXAMEN SET ID_PRESENTACION_EXAMEN = secuencia_presentacion.NEXTVAL WHERE ID_PRESENTACION_EXAMEN IS NULL;
+COMMIT;
+
+ALTER TABLE PRESENTACION_EXAMEN MODIFY ID_PRESENTACION_EXAMEN DEFAULT secuencia_presentacion.NEXTVAL;
+
+ALTER TABLE PRESENTACION_EXAMEN ADD CLAVE_IDEMPOTENCIA VARCHAR2(64);
+
+CREATE UNIQUE INDEX UX_PRESENTACION_IDEMPOTENCIA ON PRESENTACION_EXAMEN (CLAVE_IDEMPOTENCIA) ONLINE;
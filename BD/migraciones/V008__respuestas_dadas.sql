@@ -0,0 +1,50 @@
+--------------------------------------------------------
+--  Respuestas dadas por el estudiante, para calificar en el servidor
+--  (BACKEND/calificacion.py) y recalificar cuando se corrige una respuesta
+--  correcta. JSON {"<ID_PREGUNTA>": "respuesta"}; RESPUESTAS sigue guardando
+--  los ID de las preguntas acertadas
+--------------------------------------------------------
+
+ALTER TABLE PRESENTACION_EXAMEN ADD RESPUESTAS_DADAS VARCHAR2(4000)
+    CONSTRAINT CK_PE_RESPUESTAS_DADAS CHECK (RESPUESTAS_DADAS IS JSON);
+
+-- Las presentaciones de un examen se recalifican juntas: las encuentra IX_PRESENTACION_EXAMEN_PUNTAJE
+-- (ID_EXAMEN, PUNTAJE) de V004, sin otro índice que mantener en cada inserción
+
+CREATE OR REPLACE FUNCTION almacenar_presentacion_examen (
+    p_id_estudiante IN NUMBER,
+    p_id_examen IN NUMBER,
+    p_fecha_presentacion IN DATE,
+    p_puntaje IN NUMBER,
+    p_tiempo_tomado IN INTERVAL DAY TO SECOND,
+    p_direccion_ip IN VARCHAR2,
+    p_respuestas IN VARCHAR2,
+    p_respuestas_dadas IN VARCHAR2 DEFAULT NULL
+) RETURN NUMBER
+IS
+    v_id_presentacion_examen NUMBER;
+BEGIN
+    INSERT INTO PRESENTACION_EXAMEN (
+        ID_ESTUDIANTE,
+        ID_EXAMEN,
+        FECHA_PRESENTACION,
+        PUNTAJE,
+        TIEMPO_TOMADO,
+        DIRECCION_IP,
+        RESPUESTAS,
+        RESPUESTAS_DADAS
+    ) VALUES (
+        p_id_estudiante,
+        p_id_examen,
+        p_fecha_presentacion,
+        p_puntaje,
+        p_tiempo_tomado,
+        p_direccion_ip,
+        p_respuestas,
+        p_respuestas_dadas
+    )
+    RETURNING ID_PRESENTACION_EXAMEN INTO v_id_presentacion_examen;
+
+    RETURN v_id_presentacion_examen;
+END;
+/
@@ -0,0 +1,139 @@
+--------------------------------------------------------
+--  Dueño explícito de cada pregunta y cantidad de exámenes que la usan.
+--  Antes el dueño se deducía uniendo EXAMEN_PREGUNTA y EXAMEN: el banco devolvía
+--  la pregunta una vez por cada examen en que se reutilizaba y no mostraba las
+--  preguntas que no están en ningún examen.
+--    ID_PROFESOR: profesor del primer examen al que se agregó (o quien la creó)
+--    USOS:        filas de EXAMEN_PREGUNTA de la pregunta (TR_USOS_PREGUNTA)
+--------------------------------------------------------
+
+ALTER TABLE PREGUNTA ADD (
+    ID_PROFESOR NUMBER,
+    USOS NUMBER DEFAULT 0 NOT NULL
+);
+
+ALTER TABLE PREGUNTA ADD CONSTRAINT PREGUNTA_PROFESOR_FK FOREIGN KEY (ID_PROFESOR)
+    REFERENCES PROFESOR (ID_PROFESOR) ENABLE;
+
+-- Carga de los datos existentes: el dueño es el profesor del examen más antiguo que la usa
+MERGE INTO PREGUNTA P
+USING (
+    SELECT EP.ID_PREGUNTA,
+        MIN(E.ID_PROFESOR) KEEP (DENSE_RANK FIRST ORDER BY E.ID_EXAMEN) AS ID_PROFESOR,
+        COUNT(*) AS USOS
+    FROM EXAMEN_PREGUNTA EP
+    JOIN EXAMEN E ON E.ID_EXAMEN = EP.ID_EXAMEN
+    GROUP BY EP.ID_PREGUNTA
+) U
+ON (P.ID_PREGUNTA = U.ID_PREGUNTA)
+WHEN MATCHED THEN UPDATE SET P.ID_PROFESOR = U.ID_PROFESOR, P.USOS = U.USOS;
+
+COMMIT;
+
+-- /preguntas_privadas y /mis_preguntas; la parte propia de /banco_preguntas
+CREATE INDEX IX_PREGUNTA_PROFESOR_TEMA ON PREGUNTA (ID_PROFESOR, TEMA, PRIVACIDAD) ONLINE;
+
+-- Mantiene USOS (y el dueño de las preguntas que no tienen) al agregar o quitar preguntas de
+-- exámenes, también al eliminar un examen (ON DELETE CASCADE). Se acumula por pregunta y se
+-- actualiza PREGUNTA una vez por sentencia: la importación masiva inserta miles de filas juntas.
+CREATE OR REPLACE TRIGGER TR_USOS_PREGUNTA
+FOR INSERT OR DELETE ON EXAMEN_PREGUNTA
+COMPOUND TRIGGER
+    TYPE t_cambios IS TABLE OF PLS_INTEGER INDEX BY PLS_INTEGER;
+    TYPE t_examenes IS TABLE OF NUMBER INDEX BY PLS_INTEGER;
+    v_cambios t_cambios;
+    v_primer_examen t_examenes;
+
+    AFTER EACH ROW IS
+    BEGIN
+        IF INSERTING THEN
+            v_cambios(:NEW.ID_PREGUNTA) := CASE WHEN v_cambios.EXISTS(:NEW.ID_PREGUNTA)
+                                                THEN v_cambios(:NEW.ID_PREGUNTA) ELSE 0 END + 1;
+            IF NOT v_primer_examen.EXISTS(:NEW.ID_PREGUNTA) THEN
+                v_primer_examen(:NEW.ID_PREGUNTA) := :NEW.ID_EXAMEN;
+            END IF;
+        ELSE
+            v_cambios(:OLD.ID_PREGUNTA) := CASE WHEN v_cambios.EXISTS(:OLD.ID_PREGUNTA)
+                                                THEN v_cambios(:OLD.ID_PREGUNTA) ELSE 0 END - 1;
+        END IF;
+    END AFTER EACH ROW;
+
+    AFTER STATEMENT IS
+        v_id PLS_INTEGER;
+    BEGIN
+        v_id := v_cambios.FIRST;
+        WHILE v_id IS NOT NULL LOOP
+            IF v_primer_examen.EXISTS(v_id) THEN
+                UPDATE PREGUNTA P
+                SET P.USOS = P.USOS + v_cambios(v_id),
+                    P.ID_PROFESOR = NVL(P.ID_PROFESOR,
+                        (SELECT E.ID_PROFESOR FROM EXAMEN E WHERE E.ID_EXAMEN = v_primer_examen(v_id)))
+                WHERE P.ID_PREGUNTA = v_id;
+            ELSE
+                UPDATE PREGUNTA SET USOS = USOS + v_cambios(v_id) WHERE ID_PREGUNTA = v_id;
+            END IF;
+            v_id := v_cambios.NEXT(v_id);
+        END LOOP;
+    END AFTER STATEMENT;
+END TR_USOS_PREGUNTA;
+/
+
+-- El profesor que crea la pregunta queda como dueño aunque no la agregue a un examen
+CREATE OR REPLACE FUNCTION insertar_pregunta (
+    p_texto IN VARCHAR2,
+    p_opciones IN VARCHAR2,
+    p_respuestas_correctas IN VARCHAR2,
+    p_id_tipo IN NUMBER,
+    p_tema IN VARCHAR2 DEFAULT 'No definido',
+    p_privacidad IN NUMBER DEFAULT 0,
+    p_id_profesor IN NUMBER DEFAULT NULL
+) RETURN NUMBER
+IS
+    v_id_pregunta NUMBER;
+BEGIN
+    -- Obtener el próximo valor de la secuencia para el ID_EXAMEN
+    SELECT secuencia_examen.NEXTVAL INTO v_id_pregunta FROM DUAL;
+
+    INSERT INTO "PREGUNTA" (
+        "ID_PREGUNTA",
+        "TEXTO",
+        "OPCIONES",
+        "RESPUESTAS_CORRECTAS",
+        "ID_TIPO",
+        "TEMA",
+        "PRIVACIDAD",
+        "ID_PROFESOR"
+    ) VALUES (
+        v_id_pregunta,
+        p_texto,
+        p_opciones,
+        p_respuestas_correctas,
+        p_id_tipo,
+        p_tema,
+        p_privacidad,
+        p_id_profesor
+    )
+    RETURNING "ID_PREGUNTA" INTO v_id_pregunta;
+
+    RETURN v_id_pregunta;
+END;
+/
+
+-- USOS reemplaza el conteo sobre EXAMEN_PREGUNTA
+CREATE OR REPLACE FUNCTION eliminar_pregunta (
+    p_id_pregunta IN NUMBER
+) RETURN NUMBER
+IS
+BEGIN
+    DELETE FROM "PREGUNTA"
+    WHERE "ID_PREGUNTA" = p_id_pregunta
+    AND "USOS" = 0;
+
+    RETURN SQL%ROWCOUNT; -- 1 si se eliminó, 0 si está en algún examen
+END;
+/
+
+BEGIN
+    DBMS_STATS.GATHER_TABLE_STATS(USER, 'PREGUNTA', cascade => TRUE);
+END;
+/
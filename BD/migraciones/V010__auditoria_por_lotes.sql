@@ -0,0 +1,117 @@
+--------------------------------------------------------
+--  Auditoría por fila en REGISTRO, escrita por lotes.
+--  Los 28 triggers TR_INSERT_* / TR_UPDATE_* de Triggers.sql insertaban una fila
+--  en REGISTRO por sentencia, sin decir qué fila cambió ni quién la cambió, y los
+--  DELETE se registraban aparte con GUARDAR_REGISTRO_AUD_*.
+--  Ahora cada tabla tiene un compound trigger TR_AUD_<TABLA> que junta en memoria
+--  los cambios de la sentencia (INSERT, UPDATE y DELETE, con la clave primaria de
+--  la fila) y los inserta en REGISTRO con un solo FORALL al terminar la sentencia.
+--  Si la sentencia falla no se escribe nada: lo acumulado se descarta con ella.
+--    ID_FILA: valores de la clave primaria separados por ','
+--    ACTOR:   CLIENT_IDENTIFIER de la sesión (la app envía profesor:<id>,
+--             estudiante:<id> o ingesta) o, si no hay, el usuario de la base de datos
+--------------------------------------------------------
+
+ALTER TABLE REGISTRO ADD (
+    ID_FILA VARCHAR2(200),
+    ACTOR VARCHAR2(128)
+);
+
+-- Crea (o reemplaza) el trigger de auditoría de una tabla; p_columnas es su clave primaria
+CREATE OR REPLACE PROCEDURE CREAR_TRIGGER_AUDITORIA (p_tabla IN VARCHAR2, p_columnas IN VARCHAR2)
+IS
+    v_nuevo VARCHAR2(1000);
+    v_viejo VARCHAR2(1000);
+BEGIN
+    v_nuevo := ':NEW.' || REPLACE(p_columnas, ',', ' || '','' || :NEW.');
+    v_viejo := ':OLD.' || REPLACE(p_columnas, ',', ' || '','' || :OLD.');
+    EXECUTE IMMEDIATE '
+CREATE OR REPLACE TRIGGER TR_AUD_' || p_tabla || '
+FOR INSERT OR UPDATE OR DELETE ON ' || p_tabla || '
+COMPOUND TRIGGER
+    TYPE t_textos IS TABLE OF VARCHAR2(200) INDEX BY PLS_INTEGER;
+    v_acciones t_textos;
+    v_filas t_textos;
+
+    AFTER EACH ROW IS
+        n PLS_INTEGER := v_filas.COUNT + 1;
+    BEGIN
+        IF DELETING THEN
+            v_acciones(n) := ''DELETE'';
+            v_filas(n) := ' || v_viejo || ';
+        ELSE
+            v_acciones(n) := CASE WHEN INSERTING THEN ''INSERT'' ELSE ''UPDATE'' END;
+            v_filas(n) := ' || v_nuevo || ';
+        END IF;
+    END AFTER EACH ROW;
+
+    AFTER STATEMENT IS
+        v_actor VARCHAR2(128) := NVL(SYS_CONTEXT(''USERENV'', ''CLIENT_IDENTIFIER''), SYS_CONTEXT(''USERENV'', ''SESSION_USER''));
+        v_fecha TIMESTAMP := SYSTIMESTAMP;
+    BEGIN
+        FORALL i IN 1 .. v_filas.COUNT
+            INSERT INTO REGISTRO (TABLA_ACTUALIZADA, ACCION_REALIZADA, FECHA_ACTUALIZACION, ID_FILA, ACTOR)
+            VALUES (''' || p_tabla || ''', v_acciones(i), v_fecha, v_filas(i), v_actor);
+    END AFTER STATEMENT;
+END TR_AUD_' || p_tabla || ';';
+END;
+/
+
+DECLARE
+    TYPE t_auditadas IS TABLE OF VARCHAR2(100) INDEX BY VARCHAR2(30);
+    v_tablas t_auditadas;
+    v_tabla VARCHAR2(30);
+BEGIN
+    v_tablas('CONTENIDO_DE_UNIDAD') := 'ID_CONTENIDO';
+    v_tablas('CURSO') := 'ID_CURSO';
+    v_tablas('ESTUDIANTE') := 'ID_ESTUDIANTE';
+    v_tablas('ESTUDIANTE_GRUPO') := 'ID_ESTUDIANTE,ID_GRUPO';
+    v_tablas('EXAMEN') := 'ID_EXAMEN';
+    v_tablas('EXAMEN_HORARIO') := 'ID_EXAMEN,ID_HORARIO';
+    v_tablas('EXAMEN_PREGUNTA') := 'ID_EXAMEN,ID_PREGUNTA';
+    v_tablas('GRUPO') := 'ID_GRUPO';
+    v_tablas('GRUPO_HORARIO') := 'ID_GRUPO,ID_HORARIO';
+    v_tablas('HORARIO') := 'ID_HORARIO';
+    v_tablas('PREGUNTA') := 'ID_PREGUNTA';
+    v_tablas('PRESENTACION_EXAMEN') := 'ID_PRESENTACION_EXAMEN';
+    v_tablas('PROFESOR') := 'ID_PROFESOR';
+    v_tablas('UNIDAD_DE_CURSO') := 'ID_UNIDAD';
+
+    v_tabla := v_tablas.FIRST;
+    WHILE v_tabla IS NOT NULL LOOP
+        -- Triggers por sentencia de Triggers.sql
+        FOR t IN (
+            SELECT TRIGGER_NAME FROM USER_TRIGGERS
+            WHERE TABLE_NAME = v_tabla
+            AND (TRIGGER_NAME LIKE 'TR\_INSERT\_%' ESCAPE '\' OR TRIGGER_NAME LIKE 'TR\_UPDATE\_%' ESCAPE '\')
+        ) LOOP
+            EXECUTE IMMEDIATE 'DROP TRIGGER ' || t.TRIGGER_NAME;
+        END LOOP;
+        CREAR_TRIGGER_AUDITORIA(v_tabla, v_tablas(v_tabla));
+        v_tabla := v_tablas.NEXT(v_tabla);
+    END LOOP;
+END;
+/
+
+-- Los DELETE ya los registra TR_AUD_<TABLA>: estos procedimientos quedan sin efecto para no
+-- duplicar filas (se mantienen porque ELIMINAR_ESTUDIANTE y otras funciones los llaman)
+CREATE OR REPLACE PROCEDURE GUARDAR_REGISTRO_AUD
+AS
+BEGIN
+    NULL;
+END;
+/
+
+CREATE OR REPLACE PROCEDURE GUARDAR_REGISTRO_AUD_ESTUDIANTE
+AS
+BEGIN
+    NULL;
+END;
+/
+
+CREATE OR REPLACE PROCEDURE GUARDAR_REGISTRO_AUD_PROFESOR
+AS
+BEGIN
+    NULL;
+END;
+/
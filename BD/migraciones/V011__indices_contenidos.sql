@@ -0,0 +1,21 @@
+--------------------------------------------------------
+--  Índices para el árbol de /contenidos-estudiante-notas (contenidos.py):
+--  los cursos salen de los exámenes del estudiante y de cada curso se bajan sus unidades y contenidos
+--    EXAMEN (ID_CURSO), UNIDAD_DE_CURSO (ID_CURSO), CONTENIDO_DE_UNIDAD (ID_UNIDAD)
+--  CREAR_INDICE_SI_FALTA es de V002.
+--------------------------------------------------------
+
+BEGIN
+    CREAR_INDICE_SI_FALTA('CREATE INDEX IX_EXAMEN_CURSO ON EXAMEN (ID_CURSO, ID_EXAMEN) ONLINE');
+    CREAR_INDICE_SI_FALTA('CREATE INDEX IX_UNIDAD_CURSO ON UNIDAD_DE_CURSO (ID_CURSO, ID_UNIDAD, NOMBRE) ONLINE');
+    CREAR_INDICE_SI_FALTA('CREATE INDEX IX_CONTENIDO_UNIDAD ON CONTENIDO_DE_UNIDAD (ID_UNIDAD, ID_CONTENIDO) ONLINE');
+END;
+/
+
+BEGIN
+    FOR t IN (SELECT COLUMN_VALUE AS TABLA FROM TABLE(SYS.ODCIVARCHAR2LIST(
+        'EXAMEN', 'UNIDAD_DE_CURSO', 'CONTENIDO_DE_UNIDAD'))) LOOP
+        DBMS_STATS.GATHER_TABLE_STATS(USER, t.TABLA, cascade => TRUE);
+    END LOOP;
+END;
+/
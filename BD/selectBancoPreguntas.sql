@@ -1,3 +1,5 @@
+-- Banco de preguntas del profesor 2 en el tema 'No definido': públicas más las propias.
+-- El dueño es PREGUNTA.ID_PROFESOR (migraciones/V009): cada pregunta sale una sola vez.
 SELECT P.ID_PREGUNTA, P.TEXTO, P.OPCIONES, P.RESPUESTAS_CORRECTAS, P.ID_TIPO, P.TEMA,
        CASE
            WHEN P.PRIVACIDAD = 0 THEN 'PUBLICA'
@@ -5,11 +7,16 @@ SELECT P.ID_PREGUNTA, P.TEXTO, P.OPCIONES, P.RESPUESTAS_CORRECTAS, P.ID_TIPO, P.
            ELSE 'DESCONOCIDA'
        END AS PRIVACIDAD
 FROM PREGUNTA P
-INNER JOIN EXAMEN_PREGUNTA EP ON P.ID_PREGUNTA = EP.ID_PREGUNTA
-INNER JOIN EXAMEN E ON EP.ID_EXAMEN = E.ID_EXAMEN
-WHERE (P.TEMA = 'No definido' AND P.PRIVACIDAD = 0)
-   OR (P.TEMA = 'No definido' AND E.ID_PROFESOR = 2 )
-ORDER BY P.TEXTO;
+WHERE P.TEMA = 'No definido' AND P.PRIVACIDAD = 0
+UNION ALL
+SELECT P.ID_PREGUNTA, P.TEXTO, P.OPCIONES, P.RESPUESTAS_CORRECTAS, P.ID_TIPO, P.TEMA,
+       CASE
+           WHEN P.PRIVACIDAD = 0 THEN 'PUBLICA'
+           WHEN P.PRIVACIDAD = 1 THEN 'PRIVADA'
+           ELSE 'DESCONOCIDA'
+       END AS PRIVACIDAD
+FROM PREGUNTA P
+WHERE P.ID_PROFESOR = 2 AND P.TEMA = 'No definido' AND P.PRIVACIDAD <> 0
+ORDER BY TEXTO;
 
 /
-
@@ -12,6 +12,11 @@ CREATE TABLESPACE TABLES_RESPUESTA DATAFILE
 'C:\app\Usuario\product\21c\oradata\XE\TABLES_RESPUESTA.dbf' SIZE
 700M;
 
+-- Creación Tablespace de respuestas de semestres cerrados (particiones archivadas y comprimidas)
+CREATE TABLESPACE TABLES_RESPUESTA_HIST DATAFILE
+'C:\app\Usuario\product\21c\oradata\XE\TABLES_RESPUESTA_HIST.dbf' SIZE
+700M AUTOEXTEND ON NEXT 100M;
+
 -- Creación Tablespace de profesor
 CREATE TABLESPACE TABLES_PROFESOR DATAFILE
 'C:\app\Usuario\product\21c\oradata\XE\TABLES_PROFESOR.dbf' SIZE
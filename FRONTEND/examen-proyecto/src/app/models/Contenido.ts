@@ -1,6 +1,17 @@
 export interface Contenido {
-  curso: string;
-  unidad: string;
+  id_contenido: number;
   contenido: string;
-  examen: string;
+}
+
+export interface Unidad {
+  id_unidad: number;
+  unidad: string;
+  contenidos: Contenido[];
+}
+
+export interface CursoContenidos {
+  id_curso: number;
+  curso: string;
+  examenes: { id_examen: number; nombre: string }[];
+  unidades: Unidad[];
 }
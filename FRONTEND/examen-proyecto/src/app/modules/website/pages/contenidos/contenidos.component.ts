@@ -1,6 +1,6 @@
 // src/app/components/contenidos/contenidos.component.ts
 import { Component, OnInit } from '@angular/core';
-import { Contenido } from 'src/app/models/Contenido';
+import { CursoContenidos } from 'src/app/models/Contenido';
 import { EstudiantesServicioService } from 'src/app/services/estudiantes-servicio.service';
 
 @Component({
@@ -9,7 +9,7 @@ import { EstudiantesServicioService } from 'src/app/services/estudiantes-servici
   styleUrls: ['./contenidos.component.css']
 })
 export class ContenidosComponent implements OnInit {
-  cursos: { [key: string]: Contenido[] } = {};
+  cursos: CursoContenidos[] = [];
   isLoading: boolean = true;
 
   constructor(private contenidosService: EstudiantesServicioService) { }
@@ -24,22 +24,16 @@ export class ContenidosComponent implements OnInit {
     });
   }
 
-  procesarDatos(data: any[]): void {
-    data.forEach(item => {
-      const curso = item[0];
-      const unidad = item[2];
-      const contenido = item[1];
-      const examen = item[3];
-
-      if (!this.cursos[curso]) {
-        this.cursos[curso] = [];
-      }
+  // El backend ya envía el árbol curso -> unidades -> contenidos
+  procesarDatos(data: CursoContenidos[]): void {
+    this.cursos = data;
+  }
 
-      this.cursos[curso].push({ curso, unidad, contenido, examen });
-    });
+  nombresExamenes(curso: CursoContenidos): string {
+    return curso.examenes.map(examen => examen.nombre).join(', ');
   }
 
-  toggleContenido(curso: string): void {
+  toggleContenido(curso: number): void {
     const element = document.getElementById(`curso-${curso}`);
     if (element) {
       element.classList.toggle('hidden');